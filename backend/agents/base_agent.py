@@ -1,27 +1,32 @@
 import os, joblib
+import numpy as np
 from abc import ABC, abstractmethod
 
+try:
+    from ..utils.model_artifacts import load_model, artifact_exists
+    from ..utils.model_registry import model_registry
+except ImportError:
+    from utils.model_artifacts import load_model, artifact_exists
+    from utils.model_registry import model_registry
+
+
+def registered_model_path(stem):
+    """Path of the live registered version of a model, None if it has no versions"""
+    return model_registry.resolve(stem)
+
 def load_agent_classes(models_dir):
     """
     Instantiate agent classes and return dict keyed by intent names:
       crop, market_yield, risk, finance, pest
     """
-    from .crop_agent import CropAgent
-    from .market_yield_agent import MarketYieldAgent
-    from .risk_agent import RiskAgent
-    from .finance_agent import FinanceAgent
-    from .pest_agent import PestAgent
-
-    agents = {
-        "crop": CropAgent(models_dir=models_dir),
-        "market_yield": MarketYieldAgent(models_dir=models_dir),
-        "risk": RiskAgent(models_dir=models_dir),
-        "finance": FinanceAgent(models_dir=models_dir),
-        "pest": PestAgent(models_dir=models_dir)
-    }
-    return agents
+    from .registry import AgentRegistry
+
+    return AgentRegistry(models_dir).load_all()
 
 class BaseAgent(ABC):
+    # Start of the error message of a row that could not be scored
+    error_label = "Prediction"
+
     def __init__(self, name, models_dir=None):
         self.name = name
         self.models_dir = models_dir
@@ -30,6 +35,88 @@ class BaseAgent(ABC):
     def predict(self, payload: dict) -> dict:
         pass
 
+    def predict_many(self, payloads: list) -> list:
+        """
+        Score a batch of payloads, one result per payload in the same order.
+
+        The default implementation calls ``predict`` row by row; agents backed
+        by tabular models override it to build one feature matrix per batch.
+        A failing row is reported in place without failing the rest.
+        """
+        results = []
+        for payload in payloads:
+            try:
+                results.append(self.predict(payload))
+            except Exception as e:
+                results.append(self._row_error(e))
+        return results
+
+    def heuristic_predict(self, payload: dict) -> dict:
+        """
+        Cheap model-free prediction used when the agent misses its deadline.
+
+        Agents override this with their existing heuristic path; the default
+        only reports that no degraded answer is available.
+        """
+        return {
+            "success": False,
+            "error": "Agent did not respond in time and has no heuristic fallback",
+            "agent_used": self.name
+        }
+
+    def _row_error(self, error) -> dict:
+        """Per-row failure result used by batch scoring"""
+        return {
+            "success": False,
+            "error": f"{self.error_label} failed: {str(error)}",
+            "agent_used": self.name
+        }
+
+    def _score_rows(self, results: list, rows: list, valid: list, score, build) -> list:
+        """
+        Fill results[i] for every parsed row index i in valid.
+
+        score(rows) is called once over all of those rows and returns one
+        output per row; build(i, output) assembles row i's result. If the
+        batch call raises, each row is scored on its own so a row the model
+        rejects only fails itself. A row whose scoring or build raises gets
+        the _row_error result.
+        """
+        try:
+            outputs = list(score([rows[i] for i in valid]))
+        except Exception:
+            outputs = []
+            for i in valid:
+                try:
+                    outputs.extend(score([rows[i]]))
+                except Exception as e:
+                    outputs.append(e)
+
+        for i, output in zip(valid, outputs):
+            try:
+                if isinstance(output, Exception):
+                    raise output
+                results[i] = build(i, output)
+            except Exception as e:
+                results[i] = self._row_error(e)
+        return results
+
+    @staticmethod
+    def _predict_with_proba(model, features):
+        """
+        Run a classifier once over a feature matrix.
+
+        Returns (predictions, probabilities). Predictions are taken from the
+        argmax of ``predict_proba`` so the model is only called once; models
+        without probabilities fall back to ``predict`` and return None.
+        """
+        try:
+            probabilities = model.predict_proba(features)
+        except Exception:
+            return model.predict(features), None
+        predictions = np.asarray(model.classes_)[probabilities.argmax(axis=1)]
+        return predictions, probabilities
+
     def format_result_text(self, result: dict, context: dict) -> str:
         # default simple conversion
         return str(result)
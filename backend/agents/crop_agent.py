@@ -1,7 +1,7 @@
 import joblib
 import os
 import numpy as np
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, load_model, artifact_exists, registered_model_path
 
 class CropAgent(BaseAgent):
     def __init__(self, models_dir=None):
@@ -17,11 +17,16 @@ class CropAgent(BaseAgent):
         if models_dir:
             model_paths.insert(0, os.path.join(models_dir, "crop_model.pkl"))
         
+        # The live registered version takes precedence over probed paths
+        registered = registered_model_path("crop_model")
+        if registered:
+            model_paths.insert(0, registered)
+        
         self.model = None
         for path in model_paths:
             try:
-                if os.path.exists(path):
-                    self.model = joblib.load(path)
+                if artifact_exists(path):
+                    self.model = load_model(path)
                     print(f"Loaded crop model from {path}")
                     break
             except Exception as e:
@@ -33,60 +38,68 @@ class CropAgent(BaseAgent):
 
     def predict(self, payload):
         """Main prediction method expected by orchestrator"""
-        context = payload.get("context", {})
-        text = payload.get("text", "")
+        return self.predict_many([payload])[0]
+
+    def predict_many(self, payloads):
+        """Score several payloads with a single predict_proba call over the rows that parse"""
+        rows = [None] * len(payloads)
+        results = [None] * len(payloads)
         
-        # Extract soil and climate parameters from context
-        features = self._extract_features(context, text)
+        for i, payload in enumerate(payloads):
+            try:
+                rows[i] = self._extract_inputs(payload.get("context", {}))
+            except Exception as e:
+                results[i] = self._row_error(e)
+        
+        valid = [i for i, row in enumerate(rows) if row is not None]
+        if not valid:
+            return results
         
         if self.model is None:
-            return self._get_dummy_prediction(features)
+            for i in valid:
+                results[i] = self._get_dummy_prediction(rows[i])
+            return results
         
-        try:
-            # Convert to numpy array for prediction
-            features_array = np.array([features])
-            
-            # Get prediction
-            prediction = self.model.predict(features_array)[0]
-            
-            # Get probabilities if available
-            try:
-                probabilities = self.model.predict_proba(features_array)[0]
-                # Get top 3 crops
-                top_indices = probabilities.argsort()[-3:][::-1]
-                top_crops = [self.model.classes_[i] for i in top_indices]
-                top_probs = [float(probabilities[i]) for i in top_indices]
-                
-                confidence = float(max(probabilities))
-            except:
-                top_crops = [prediction]
-                top_probs = [0.8]
-                confidence = 0.8
-            
-            return {
-                "success": True,
-                "top_crop": prediction,
-                "recommended_crops": top_crops,
-                "confidence_scores": top_probs,
-                "confidence": confidence,
-                "features_used": {
-                    "N": features[0], "P": features[1], "K": features[2],
-                    "temperature": features[3], "humidity": features[4],
-                    "ph": features[5], "rainfall": features[6]
-                },
-                "message": f"Based on your soil and climate conditions, I recommend growing {prediction}. This recommendation has a confidence score of {confidence:.2f}.",
-                "agent_used": "crop"
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Prediction failed: {str(e)}",
-                "agent_used": "crop"
-            }
+        # One feature matrix for the rows that parsed
+        return self._score_rows(results, rows, valid, self._score,
+                                lambda i, output: self._build_result(rows[i], *output))
+
+    def _score(self, rows):
+        """(prediction, class probabilities or None) per feature row, from one predict_proba call"""
+        predictions, probabilities = self._predict_with_proba(self.model, np.array(rows, dtype=float))
+        return [(prediction, None if probabilities is None else probabilities[j])
+                for j, prediction in enumerate(predictions)]
 
-    def _extract_features(self, context, text):
-        """Extract numerical features from context and text"""
+    def _build_result(self, features, prediction, row_probs) -> dict:
+        """Recommendation for one row from its prediction and class probabilities (None without them)"""
+        if row_probs is not None:
+            # Get top 3 crops
+            top_indices = row_probs.argsort()[-3:][::-1]
+            top_crops = [self.model.classes_[j] for j in top_indices]
+            top_probs = [float(row_probs[j]) for j in top_indices]
+            confidence = float(max(row_probs))
+        else:
+            top_crops = [prediction]
+            top_probs = [0.8]
+            confidence = 0.8
+        
+        return {
+            "success": True,
+            "top_crop": prediction,
+            "recommended_crops": top_crops,
+            "confidence_scores": top_probs,
+            "confidence": confidence,
+            "features_used": {
+                "N": features[0], "P": features[1], "K": features[2],
+                "temperature": features[3], "humidity": features[4],
+                "ph": features[5], "rainfall": features[6]
+            },
+            "message": f"Based on your soil and climate conditions, I recommend growing {prediction}. This recommendation has a confidence score of {confidence:.2f}.",
+            "agent_used": "crop"
+        }
+
+    def _extract_inputs(self, context):
+        """Numerical features (N, P, K, temperature, humidity, ph, rainfall) of one payload context"""
         # Default values for soil and climate parameters
         defaults = {
             "N": 50, "P": 30, "K": 40,
@@ -122,6 +135,14 @@ class CropAgent(BaseAgent):
         
         return features
 
+    def heuristic_predict(self, payload):
+        """Model-free fallback prediction"""
+        try:
+            features = self._extract_inputs(payload.get("context", {}))
+        except Exception as e:
+            return self._row_error(e)
+        return self._get_dummy_prediction(features)
+
     def _get_dummy_prediction(self, features):
         """Return dummy prediction when model is not available"""
         import random
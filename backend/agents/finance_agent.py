@@ -1,9 +1,11 @@
 import os
 import joblib
 import numpy as np
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, load_model, artifact_exists, registered_model_path
 
 class FinanceAgent(BaseAgent):
+    error_label = "Finance assessment"
+
     def __init__(self, models_dir=None):
         super().__init__("finance", models_dir=models_dir)
         
@@ -13,11 +15,16 @@ class FinanceAgent(BaseAgent):
             os.path.join(models_dir or "", "finance_model.pkl"),
         ]
         
+        # The live registered version takes precedence over probed paths
+        registered = registered_model_path("finance_model")
+        if registered:
+            model_paths.insert(0, registered)
+        
         self.model = None
         for path in model_paths:
-            if os.path.exists(path):
+            if artifact_exists(path):
                 try:
-                    self.model = joblib.load(path)
+                    self.model = load_model(path)
                     print(f"Loaded finance model from {path}")
                     break
                 except Exception as e:
@@ -36,55 +43,78 @@ class FinanceAgent(BaseAgent):
 
     def predict(self, payload: dict) -> dict:
         """Main prediction method for agricultural finance assessment"""
-        context = payload.get("context", {})
-        text = payload.get("text", "")
-        
-        try:
-            # Extract financial parameters from context
-            farmer_profile = self._extract_farmer_profile(context, text)
-            
-            if self.model:
-                # Use ML model for prediction
-                features = self._prepare_features(farmer_profile)
-                eligibility_prediction = self.model.predict([features])[0]
-                
-                # Get probabilities if available
-                try:
-                    probabilities = self.model.predict_proba([features])[0]
-                    eligibility_classes = self.model.classes_
-                    eligibility_scores = {eligibility_classes[i]: float(prob) for i, prob in enumerate(probabilities)}
-                    confidence = float(max(probabilities))
-                except:
-                    eligibility_scores = {eligibility_prediction: 0.7}
-                    confidence = 0.7
+        return self.predict_many([payload])[0]
+
+    def predict_many(self, payloads: list) -> list:
+        """Assess several farmer profiles with a single predict_proba call"""
+        profiles = [None] * len(payloads)
+        results = [None] * len(payloads)
+        
+        for i, payload in enumerate(payloads):
+            try:
+                # Extract financial parameters from context
+                profiles[i] = self._extract_farmer_profile(payload.get("context", {}), payload.get("text", ""))
+            except Exception as e:
+                results[i] = self._row_error(e)
+        
+        valid = [i for i, profile in enumerate(profiles) if profile is not None]
+        if not valid:
+            return results
+        
+        return self._score_rows(
+            results, profiles, valid, self._assess,
+            lambda i, assessment: self._build_result(profiles[i], *assessment)
+        )
+
+    def _assess(self, profiles: list) -> list:
+        """(eligibility, eligibility scores, confidence) per profile, from one predict_proba call"""
+        if not self.model:
+            # Fallback heuristic prediction
+            return [self._heuristic_finance_assessment(profile) for profile in profiles]
+        
+        # Use ML model for prediction
+        features = np.array([self._prepare_features(profile) for profile in profiles])
+        predictions, probabilities = self._predict_with_proba(self.model, features)
+        
+        assessments = []
+        for j, eligibility_prediction in enumerate(predictions):
+            if probabilities is not None:
+                eligibility_classes = self.model.classes_
+                eligibility_scores = {eligibility_classes[k]: float(prob) for k, prob in enumerate(probabilities[j])}
+                confidence = float(max(probabilities[j]))
             else:
-                # Fallback heuristic prediction
-                eligibility_prediction, eligibility_scores, confidence = self._heuristic_finance_assessment(farmer_profile)
-            
-            # Generate financial recommendations
-            eligible_schemes = self._get_eligible_schemes(eligibility_prediction, farmer_profile)
-            financial_tips = self._get_financial_tips(farmer_profile)
-            
-            return {
-                "success": True,
-                "farmer_profile": farmer_profile,
-                "eligibility_status": eligibility_prediction,
-                "eligibility_scores": eligibility_scores,
-                "confidence": confidence,
-                "eligible_schemes": [scheme["name"] for scheme in eligible_schemes],
-                "detailed_schemes": eligible_schemes,
-                "financial_tips": financial_tips,
-                "financial_health_score": self._calculate_financial_health_score(farmer_profile),
-                "message": f"Finance assessment: {eligibility_prediction.upper()}. {len(eligible_schemes)} schemes available.",
-                "agent_used": "finance"
-            }
-            
+                eligibility_scores = {eligibility_prediction: 0.7}
+                confidence = 0.7
+            assessments.append((eligibility_prediction, eligibility_scores, confidence))
+        return assessments
+
+    def heuristic_predict(self, payload: dict) -> dict:
+        """Rule-based eligibility assessment, without calling the model"""
+        try:
+            farmer_profile = self._extract_farmer_profile(payload.get("context", {}), payload.get("text", ""))
+            return self._build_result(farmer_profile, *self._heuristic_finance_assessment(farmer_profile))
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Finance assessment failed: {str(e)}",
-                "agent_used": "finance"
-            }
+            return self._row_error(e)
+
+    def _build_result(self, farmer_profile, eligibility_prediction, eligibility_scores, confidence):
+        """Assemble the response for one assessed profile"""
+        # Generate financial recommendations
+        eligible_schemes = self._get_eligible_schemes(eligibility_prediction, farmer_profile)
+        financial_tips = self._get_financial_tips(farmer_profile)
+        
+        return {
+            "success": True,
+            "farmer_profile": farmer_profile,
+            "eligibility_status": eligibility_prediction,
+            "eligibility_scores": eligibility_scores,
+            "confidence": confidence,
+            "eligible_schemes": [scheme["name"] for scheme in eligible_schemes],
+            "detailed_schemes": eligible_schemes,
+            "financial_tips": financial_tips,
+            "financial_health_score": self._calculate_financial_health_score(farmer_profile),
+            "message": f"Finance assessment: {eligibility_prediction.upper()}. {len(eligible_schemes)} schemes available.",
+            "agent_used": "finance"
+        }
 
     def _extract_farmer_profile(self, context, text):
         """Extract farmer financial profile from context and text"""
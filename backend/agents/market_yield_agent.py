@@ -1,7 +1,9 @@
 import os, joblib, numpy as np
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, load_model, artifact_exists, registered_model_path
 
 class MarketYieldAgent(BaseAgent):
+    error_label = "Market/yield prediction"
+
     def __init__(self, models_dir=None):
         super().__init__("market_yield", models_dir=models_dir)
         
@@ -13,13 +15,19 @@ class MarketYieldAgent(BaseAgent):
             (os.path.join(models_dir or "", "yield_model.pkl"), "yield"),
         ]
         
+        # Live registered versions are loaded last so they take precedence over probed paths
+        for stem, model_type in (("market_model", "market"), ("yield_model", "yield")):
+            registered = registered_model_path(stem)
+            if registered:
+                model_paths.append((registered, model_type))
+        
         self.price_model = None
         self.yield_model = None
         
         for path, model_type in model_paths:
-            if os.path.exists(path):
+            if artifact_exists(path):
                 try:
-                    model = joblib.load(path)
+                    model = load_model(path)
                     if model_type == "market":
                         self.price_model = model
                         print(f"Loaded market price model from {path}")
@@ -31,79 +39,118 @@ class MarketYieldAgent(BaseAgent):
 
     def predict(self, payload: dict) -> dict:
         """Main prediction method for market price and yield prediction"""
-        context = payload.get("context", {})
-        text = payload.get("text", "")
+        return self.predict_many([payload])[0]
+
+    def predict_many(self, payloads: list) -> list:
+        """Score several payloads with one price and one yield model call"""
+        rows = [None] * len(payloads)
+        results = [None] * len(payloads)
+        
+        for i, payload in enumerate(payloads):
+            try:
+                rows[i] = self._extract_inputs(payload.get("context", {}))
+            except Exception as e:
+                results[i] = self._row_error(e)
+        
+        valid = [i for i, row in enumerate(rows) if row is not None]
+        if not valid:
+            return results
+        
+        return self._score_rows(
+            results, rows, valid, self._score,
+            lambda i, scored: self._build_result(rows[i], *scored)
+        )
+
+    def _score(self, rows: list) -> list:
+        """(price, yield per hectare) per row, from one price and one yield model call"""
+        # Predict market price
+        if self.price_model:
+            # Features: historical_price, demand, supply, season, weather_score
+            season = self._get_season_index()
+            price_features = np.array([
+                [self._get_crop_index(row["crop"]), 0.8, 0.7, season,
+                 self._calculate_weather_score(row["temperature"], row["humidity"], row["rainfall"])]
+                for row in rows
+            ])
+            predicted_prices = [float(p) for p in self.price_model.predict(price_features)]
+        else:
+            predicted_prices = [self._get_fallback_price(row["crop"]) for row in rows]
+        
+        # Predict yield
+        if self.yield_model:
+            # Features: N, P, K, temperature, humidity, ph, rainfall, area
+            yield_features = np.array([
+                [row["N"], row["P"], row["K"], row["temperature"],
+                 row["humidity"], row["ph"], row["rainfall"], row["area_hectares"]]
+                for row in rows
+            ])
+            predicted_yields = [float(y) for y in self.yield_model.predict(yield_features)]
+        else:
+            predicted_yields = [self._get_fallback_yield(row["crop"], row["area_hectares"]) for row in rows]
         
+        return list(zip(predicted_prices, predicted_yields))
+
+    def heuristic_predict(self, payload: dict) -> dict:
+        """Fallback price and yield tables, without calling either model"""
         try:
-            # Extract parameters from context
-            crop = context.get("crop", "wheat").lower()
-            location = context.get("location", "unknown")
-            timeframe = int(context.get("timeframe", 30))
-            area_hectares = float(context.get("area_hectares", context.get("area", 1.0)))
-            
-            # Soil conditions for yield prediction
-            soil_conditions = context.get("soil_conditions", {})
-            N = float(soil_conditions.get("N", context.get("N", 50)))
-            P = float(soil_conditions.get("P", context.get("P", 30)))
-            K = float(soil_conditions.get("K", context.get("K", 40)))
-            ph = float(soil_conditions.get("ph", context.get("ph", 6.5)))
-            
-            # Weather conditions for yield prediction
-            weather_conditions = context.get("weather_conditions", {})
-            temperature = float(weather_conditions.get("temperature", context.get("temperature", 25)))
-            humidity = float(weather_conditions.get("humidity", context.get("humidity", 60)))
-            rainfall = float(weather_conditions.get("rainfall", context.get("rainfall", 100)))
-            
-            # Predict market price
-            if self.price_model:
-                # Features: historical_price, demand, supply, season, weather_score
-                crop_idx = self._get_crop_index(crop)
-                season = self._get_season_index()
-                weather_score = self._calculate_weather_score(temperature, humidity, rainfall)
-                
-                price_features = np.array([[crop_idx, 0.8, 0.7, season, weather_score]])
-                predicted_price = float(self.price_model.predict(price_features)[0])
-            else:
-                predicted_price = self._get_fallback_price(crop)
-            
-            # Predict yield
-            if self.yield_model:
-                # Features: N, P, K, temperature, humidity, ph, rainfall, area
-                yield_features = np.array([[N, P, K, temperature, humidity, ph, rainfall, area_hectares]])
-                predicted_yield = float(self.yield_model.predict(yield_features)[0])
-            else:
-                predicted_yield = self._get_fallback_yield(crop, area_hectares)
-            
-            # Calculate financial projections
-            total_yield = predicted_yield * area_hectares
-            total_revenue = total_yield * predicted_price
-            estimated_cost = self._estimate_costs(crop, area_hectares)
-            estimated_profit = total_revenue - estimated_cost
-            
-            return {
-                "success": True,
-                "crop": crop,
-                "location": location,
-                "timeframe_days": timeframe,
-                "area_hectares": area_hectares,
-                "predicted_price_per_kg": round(predicted_price, 2),
-                "predicted_yield_tons_per_hectare": round(predicted_yield, 2),
-                "total_expected_yield_tons": round(total_yield, 2),
-                "total_expected_revenue": round(total_revenue, 2),
-                "estimated_costs": round(estimated_cost, 2),
-                "estimated_profit": round(estimated_profit, 2),
-                "confidence_price": 0.75,
-                "confidence_yield": 0.8,
-                "message": f"For {crop} cultivation over {area_hectares} hectares: Expected yield is {predicted_yield:.1f} tons/hectare, market price ₹{predicted_price:.2f}/kg, potential profit ₹{estimated_profit:,.2f}",
-                "agent_used": "market_yield"
-            }
-            
+            row = self._extract_inputs(payload.get("context", {}))
+            return self._build_result(
+                row,
+                self._get_fallback_price(row["crop"]),
+                self._get_fallback_yield(row["crop"], row["area_hectares"])
+            )
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Market/yield prediction failed: {str(e)}",
-                "agent_used": "market_yield"
-            }
+            return self._row_error(e)
+
+    def _extract_inputs(self, context: dict) -> dict:
+        """Parse the model inputs for one payload context"""
+        # Soil conditions for yield prediction
+        soil_conditions = context.get("soil_conditions", {})
+        # Weather conditions for yield prediction
+        weather_conditions = context.get("weather_conditions", {})
+        
+        return {
+            "crop": context.get("crop", "wheat").lower(),
+            "location": context.get("location", "unknown"),
+            "timeframe": int(context.get("timeframe", 30)),
+            "area_hectares": float(context.get("area_hectares", context.get("area", 1.0))),
+            "N": float(soil_conditions.get("N", context.get("N", 50))),
+            "P": float(soil_conditions.get("P", context.get("P", 30))),
+            "K": float(soil_conditions.get("K", context.get("K", 40))),
+            "ph": float(soil_conditions.get("ph", context.get("ph", 6.5))),
+            "temperature": float(weather_conditions.get("temperature", context.get("temperature", 25))),
+            "humidity": float(weather_conditions.get("humidity", context.get("humidity", 60))),
+            "rainfall": float(weather_conditions.get("rainfall", context.get("rainfall", 100)))
+        }
+
+    def _build_result(self, row: dict, predicted_price: float, predicted_yield: float) -> dict:
+        """Assemble the response for one scored row"""
+        crop = row["crop"]
+        area_hectares = row["area_hectares"]
+        
+        # Calculate financial projections
+        total_yield = predicted_yield * area_hectares
+        total_revenue = total_yield * predicted_price
+        estimated_cost = self._estimate_costs(crop, area_hectares)
+        estimated_profit = total_revenue - estimated_cost
+        
+        return {
+            "success": True,
+            "crop": crop,
+            "location": row["location"],
+            "timeframe_days": row["timeframe"],
+            "area_hectares": area_hectares,
+            "predicted_price_per_kg": round(predicted_price, 2),
+            "predicted_yield_tons_per_hectare": round(predicted_yield, 2),
+            "total_expected_yield_tons": round(total_yield, 2),
+            "total_expected_revenue": round(total_revenue, 2),
+            "estimated_costs": round(estimated_cost, 2),
+            "estimated_profit": round(estimated_profit, 2),
+            "confidence_price": 0.75,
+            "confidence_yield": 0.8,
+            "message": f"For {crop} cultivation over {area_hectares} hectares: Expected yield is {predicted_yield:.1f} tons/hectare, market price ₹{predicted_price:.2f}/kg, potential profit ₹{estimated_profit:,.2f}",
+            "agent_used": "market_yield"
+        }
 
     def _get_crop_index(self, crop):
         """Convert crop name to index for model"""
@@ -2,9 +2,11 @@ import os
 import joblib
 import numpy as np
 import base64
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, load_model, artifact_exists, registered_model_path
 
 class PestAgent(BaseAgent):
+    error_label = "Pest detection"
+
     def __init__(self, models_dir=None):
         super().__init__("pest", models_dir=models_dir)
         
@@ -14,11 +16,16 @@ class PestAgent(BaseAgent):
             os.path.join(models_dir or "", "pest_model.pkl"),
         ]
         
+        # The live registered version takes precedence over probed paths
+        registered = registered_model_path("pest_model")
+        if registered:
+            model_paths.insert(0, registered)
+        
         self.model = None
         for path in model_paths:
-            if os.path.exists(path):
+            if artifact_exists(path):
                 try:
-                    self.model = joblib.load(path)
+                    self.model = load_model(path)
                     print(f"Loaded pest model from {path}")
                     break
                 except Exception as e:
@@ -38,7 +45,7 @@ class PestAgent(BaseAgent):
             crop_type = context.get("crop_type", "unknown")
             symptoms = context.get("symptoms", [])
             
-            if not image_data:
+            if image_data is None or len(image_data) == 0:
                 return {
                     "success": False,
                     "error": "No image data provided for pest detection",
@@ -75,29 +82,25 @@ class PestAgent(BaseAgent):
                     crop_type, symptoms, image_features
                 )
             
-            # Generate treatment recommendations
-            treatment_recommendations = self._generate_treatment_recommendations(pest_prediction, crop_type)
-            prevention_tips = self._generate_prevention_tips(pest_prediction, crop_type)
+            return self._build_result(pest_prediction, pest_scores, confidence, crop_type, top_pests, top_confidences)
             
+        except Exception as e:
             return {
-                "success": True,
-                "detected_pest": pest_prediction,
-                "pest_type": pest_prediction,
-                "confidence": confidence,
-                "crop_type": crop_type,
-                "pest_scores": pest_scores,
-                "top_predictions": [
-                    {"pest": pest, "confidence": conf} 
-                    for pest, conf in zip(top_pests, top_confidences)
-                ],
-                "treatment_recommendations": treatment_recommendations,
-                "prevention_tips": prevention_tips,
-                "severity_assessment": self._assess_severity(confidence, pest_prediction),
-                "immediate_actions": self._get_immediate_actions(pest_prediction),
-                "message": f"Detected {pest_prediction} with {confidence:.1%} confidence. {self._get_pest_summary(pest_prediction, confidence)}",
+                "success": False,
+                "error": f"Pest detection failed: {str(e)}",
                 "agent_used": "pest"
             }
-            
+
+    def heuristic_predict(self, payload: dict) -> dict:
+        """Crop and symptom based detection that skips image decoding entirely"""
+        context = payload.get("context", {})
+        crop_type = context.get("crop_type", "unknown")
+        
+        try:
+            pest_prediction, pest_scores, confidence, top_pests, top_confidences = self._heuristic_pest_detection(
+                crop_type, context.get("symptoms", []), []
+            )
+            return self._build_result(pest_prediction, pest_scores, confidence, crop_type, top_pests, top_confidences)
         except Exception as e:
             return {
                 "success": False,
@@ -105,6 +108,31 @@ class PestAgent(BaseAgent):
                 "agent_used": "pest"
             }
 
+    def _build_result(self, pest_prediction, pest_scores, confidence, crop_type, top_pests, top_confidences):
+        """Assemble the response for one detection"""
+        # Generate treatment recommendations
+        treatment_recommendations = self._generate_treatment_recommendations(pest_prediction, crop_type)
+        prevention_tips = self._generate_prevention_tips(pest_prediction, crop_type)
+        
+        return {
+            "success": True,
+            "detected_pest": pest_prediction,
+            "pest_type": pest_prediction,
+            "confidence": confidence,
+            "crop_type": crop_type,
+            "pest_scores": pest_scores,
+            "top_predictions": [
+                {"pest": pest, "confidence": conf} 
+                for pest, conf in zip(top_pests, top_confidences)
+            ],
+            "treatment_recommendations": treatment_recommendations,
+            "prevention_tips": prevention_tips,
+            "severity_assessment": self._assess_severity(confidence, pest_prediction),
+            "immediate_actions": self._get_immediate_actions(pest_prediction),
+            "message": f"Detected {pest_prediction} with {confidence:.1%} confidence. {self._get_pest_summary(pest_prediction, confidence)}",
+            "agent_used": "pest"
+        }
+
     def _extract_image_features(self, image_data):
         """Extract features from image data (simplified for demo)"""
         try:
@@ -119,6 +147,9 @@ class PestAgent(BaseAgent):
                     image_size = len(decoded)
                 except:
                     image_size = len(image_data)
+            elif isinstance(image_data, (bytes, bytearray, memoryview, np.ndarray)):
+                # Raw upload bytes (usually an np.frombuffer view); size them without copying
+                image_size = memoryview(image_data).nbytes
             else:
                 image_size = len(str(image_data))
             
@@ -0,0 +1,193 @@
+"""
+Agent registry: constructs agents (and so loads their models) on demand or
+in parallel at startup
+"""
+import importlib
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Agent name -> (module in this package, class name)
+AGENT_REGISTRY = {
+    "crop": ("crop_agent", "CropAgent"),
+    "market_yield": ("market_yield_agent", "MarketYieldAgent"),
+    "risk": ("risk_agent", "RiskAgent"),
+    "finance": ("finance_agent", "FinanceAgent"),
+    "pest": ("pest_agent", "PestAgent")
+}
+
+# Model file stem (<stem>.pkl or <stem>.mmap, and its model_metadata.json key)
+# -> (agent name, attribute holding the loaded model)
+MODEL_ATTRIBUTES = {
+    "crop_model": ("crop", "model"),
+    "market_model": ("market_yield", "price_model"),
+    "yield_model": ("market_yield", "yield_model"),
+    "risk_model": ("risk", "model"),
+    "finance_model": ("finance", "model"),
+    "pest_model": ("pest", "model")
+}
+
+# Agent name -> model file stems the agent loads
+AGENT_ARTIFACTS = {
+    agent: tuple(stem for stem, (owner, _) in MODEL_ATTRIBUTES.items() if owner == agent)
+    for agent in AGENT_REGISTRY
+}
+
+
+class _Entry:
+    """Load state of one registered agent"""
+
+    def __init__(self, name: str, module: str, class_name: str):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.agent = None
+        self.state = "not_loaded"
+        self.load_time: Optional[float] = None
+        self.error: Optional[str] = None
+        self.version = 0
+        self.reloaded_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class AgentRegistry(Mapping):
+    """
+    Read-only mapping of agent name to agent instance.
+
+    Looking up an agent constructs it on first use, so with lazy loading a
+    worker only pays for the models it actually serves. ``load_all`` builds
+    every agent across a thread pool instead, overlapping the model reads.
+    Membership and iteration only consult the registry and never load.
+    """
+
+    def __init__(self, models_dir: str, registry: Optional[Dict[str, tuple]] = None):
+        self.models_dir = models_dir
+        self._entries = {
+            name: _Entry(name, module, class_name)
+            for name, (module, class_name) in (registry or AGENT_REGISTRY).items()
+        }
+        self._listeners = []
+
+    def __getitem__(self, name: str):
+        entry = self._entries[name]
+        if entry.agent is None:
+            self._load(entry)
+        return entry.agent
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _construct(self, entry: _Entry):
+        module = importlib.import_module(f".{entry.module}", __package__)
+        return getattr(module, entry.class_name)(models_dir=self.models_dir)
+
+    def _load(self, entry: _Entry):
+        """Construct the agent once; concurrent lookups wait for the first load"""
+        with entry.lock:
+            if entry.agent is not None:
+                return
+            self._construct_locked(entry)
+        self._notify(entry.name, entry.version)
+
+    def _construct_locked(self, entry: _Entry):
+        """Build the agent and record its load state; the caller holds entry.lock"""
+        entry.state = "loading"
+        start = time.perf_counter()
+        try:
+            agent = self._construct(entry)
+        except Exception as e:
+            # Left unloaded so the next lookup retries
+            entry.state = "failed"
+            entry.error = str(e)
+            logger.error(f"Failed to load agent {entry.name}: {e}")
+            raise
+        entry.load_time = time.perf_counter() - start
+        entry.error = None
+        entry.agent = agent
+        entry.version = 1
+        entry.state = "loaded"
+        logger.info(f"Loaded agent {entry.name} in {entry.load_time:.3f}s")
+
+    def build(self, name: str):
+        """
+        Construct a fresh instance of an agent without installing it.
+
+        Used by hot reload to read new model files while the installed
+        instance keeps serving.
+        """
+        return self._construct(self._entries[name])
+
+    def swap(self, name: str, agent, load_time: Optional[float] = None) -> int:
+        """
+        Install a new instance of an agent and return its model version.
+
+        Requests that already looked up the old instance finish on it; every
+        later lookup gets the new one. Listeners are called with
+        (name, version) after the swap.
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            entry.agent = agent
+            entry.version += 1
+            entry.state = "loaded"
+            entry.error = None
+            entry.reloaded_at = time.time()
+            if load_time is not None:
+                entry.load_time = load_time
+            version = entry.version
+        self._notify(name, version)
+        return version
+
+    def _notify(self, name: str, version: int):
+        for listener in list(self._listeners):
+            try:
+                listener(name, version)
+            except Exception as e:
+                logger.error(f"Agent install listener failed for {name}: {e}")
+
+    def add_listener(self, callback):
+        """Register callback(name, version), called after an agent is loaded or swapped"""
+        self._listeners.append(callback)
+
+    def version(self, name: str) -> int:
+        """Model version of an agent: 0 before it loads, incremented on every swap"""
+        return self._entries[name].version
+
+    def load_all(self, max_workers: int = 5) -> Dict[str, Any]:
+        """Load every registered agent in parallel; failures are logged and skipped"""
+        pending = [entry for entry in self._entries.values() if entry.agent is None]
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))),
+                                    thread_name_prefix="agent-load") as pool:
+                for future in [pool.submit(self._load, entry) for entry in pending]:
+                    try:
+                        future.result()
+                    except Exception:
+                        pass
+        return self.loaded()
+
+    def loaded(self) -> Dict[str, Any]:
+        """Agents constructed so far, without triggering any loads"""
+        return {name: entry.agent for name, entry in self._entries.items() if entry.agent is not None}
+
+    def get_status(self, name: str) -> Dict[str, Any]:
+        """Load state, load time, model version and last error of one agent"""
+        entry = self._entries[name]
+        return {
+            'state': entry.state,
+            'load_time': round(entry.load_time, 4) if entry.load_time is not None else None,
+            'error': entry.error,
+            'version': entry.version,
+            'reloaded_at': entry.reloaded_at
+        }
@@ -1,9 +1,11 @@
 import os
 import joblib
 import numpy as np
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, load_model, artifact_exists, registered_model_path
 
 class RiskAgent(BaseAgent):
+    error_label = "Risk assessment"
+
     def __init__(self, models_dir=None):
         super().__init__("risk", models_dir=models_dir)
         
@@ -13,11 +15,16 @@ class RiskAgent(BaseAgent):
             os.path.join(models_dir or "", "risk_model.pkl"),
         ]
         
+        # The live registered version takes precedence over probed paths
+        registered = registered_model_path("risk_model")
+        if registered:
+            model_paths.insert(0, registered)
+        
         self.model = None
         for path in model_paths:
-            if os.path.exists(path):
+            if artifact_exists(path):
                 try:
-                    self.model = joblib.load(path)
+                    self.model = load_model(path)
                     print(f"Loaded risk model from {path}")
                     break
                 except Exception as e:
@@ -28,84 +35,129 @@ class RiskAgent(BaseAgent):
 
     def predict(self, payload: dict) -> dict:
         """Main prediction method for agricultural risk assessment"""
-        context = payload.get("context", {})
-        text = payload.get("text", "")
-        
-        try:
-            # Extract parameters from context
-            location = context.get("location", "unknown")
-            crop = context.get("crop", "general crops")
-            
-            # Weather data
-            weather_data = context.get("weather_data", {})
-            temperature = float(weather_data.get("temperature", context.get("temperature", context.get("temp", 25))))
-            humidity = float(weather_data.get("humidity", context.get("humidity", context.get("hum", 60))))
-            rainfall = float(weather_data.get("rainfall", context.get("rainfall", context.get("rain", context.get("recent_rain", 100)))))
-            wind_speed = float(weather_data.get("wind_speed", context.get("wind_speed", 10)))
-            pressure = float(weather_data.get("pressure", context.get("pressure", 1013)))
-            
-            time_period = context.get("time_period", "this season")
-            
-            if self.model:
-                # Features: temperature, humidity, rainfall, wind_speed, pressure, location_risk
-                location_risk = self._get_location_risk_score(location)
-                features = np.array([[temperature, humidity, rainfall, wind_speed, pressure, location_risk]])
-                
-                risk_prediction = self.model.predict(features)[0]
-                
-                # Get probabilities if available
-                try:
-                    probabilities = self.model.predict_proba(features)[0]
-                    risk_classes = ['low', 'medium', 'high']
-                    risk_scores = {risk_classes[i]: float(prob) for i, prob in enumerate(probabilities)}
-                    confidence = float(max(probabilities))
-                except:
-                    risk_scores = {risk_prediction: 0.8, 'low': 0.1, 'medium': 0.1}
-                    confidence = 0.8
-            else:
-                risk_prediction, risk_scores, confidence = self._heuristic_risk_assessment(
-                    temperature, humidity, rainfall, wind_speed, pressure, location
+        return self.predict_many([payload])[0]
+
+    def predict_many(self, payloads: list) -> list:
+        """Assess several payloads with a single predict_proba call"""
+        rows = [None] * len(payloads)
+        results = [None] * len(payloads)
+        
+        for i, payload in enumerate(payloads):
+            try:
+                rows[i] = self._extract_inputs(payload.get("context", {}))
+            except Exception as e:
+                results[i] = self._row_error(e)
+        
+        valid = [i for i, row in enumerate(rows) if row is not None]
+        if not valid:
+            return results
+        
+        return self._score_rows(
+            results, rows, valid, self._assess,
+            lambda i, assessment: self._build_result(rows[i], payloads[i].get("text", ""), *assessment)
+        )
+
+    def _assess(self, rows: list) -> list:
+        """(risk level, risk scores, confidence) per row, from one predict_proba call"""
+        if not self.model:
+            return [
+                self._heuristic_risk_assessment(
+                    row["temperature"], row["humidity"], row["rainfall"],
+                    row["wind_speed"], row["pressure"], row["location"]
                 )
-            
-            # Generate detailed risk analysis
-            risk_factors = self._analyze_risk_factors(temperature, humidity, rainfall, wind_speed, pressure)
-            recommendations = self._generate_recommendations(risk_prediction, risk_factors, crop)
-            
-            # Legacy compatibility
-            pest_probability = risk_scores.get('high', 0.3) if 'pest' in text.lower() or humidity > 70 else 0.2
-            advice = recommendations[0] if recommendations else "Monitor crops regularly"
-            
-            return {
-                "success": True,
-                "location": location,
-                "crop": crop,
-                "time_period": time_period,
-                "overall_risk_level": risk_prediction,
-                "risk_scores": risk_scores,
-                "confidence": confidence,
-                "risk_factors": risk_factors,
-                "recommendations": recommendations,
-                "weather_conditions": {
-                    "temperature": temperature,
-                    "humidity": humidity,
-                    "rainfall": rainfall,
-                    "wind_speed": wind_speed,
-                    "pressure": pressure
-                },
-                # Legacy fields for backward compatibility
-                "pest_probability": round(pest_probability, 3),
-                "yield_risk": risk_prediction in ['medium', 'high'],
-                "advice": advice,
-                "message": f"Risk assessment for {crop} in {location}: {risk_prediction.upper()} risk level. {self._get_risk_summary(risk_prediction, risk_factors)}",
-                "agent_used": "risk"
-            }
-            
+                for row in rows
+            ]
+        
+        # Features: temperature, humidity, rainfall, wind_speed, pressure, location_risk
+        features = np.array([
+            [row["temperature"], row["humidity"], row["rainfall"],
+             row["wind_speed"], row["pressure"],
+             self._get_location_risk_score(row["location"])]
+            for row in rows
+        ])
+        predictions, probabilities = self._predict_with_proba(self.model, features)
+        
+        assessments = []
+        for j, risk_prediction in enumerate(predictions):
+            if probabilities is not None:
+                risk_classes = ['low', 'medium', 'high']
+                risk_scores = {risk_classes[k]: float(prob) for k, prob in enumerate(probabilities[j])}
+                confidence = float(max(probabilities[j]))
+            else:
+                risk_scores = {risk_prediction: 0.8, 'low': 0.1, 'medium': 0.1}
+                confidence = 0.8
+            assessments.append((risk_prediction, risk_scores, confidence))
+        return assessments
+
+    def heuristic_predict(self, payload: dict) -> dict:
+        """Rule-based risk assessment, without calling the model"""
+        try:
+            row = self._extract_inputs(payload.get("context", {}))
+            assessment = self._heuristic_risk_assessment(
+                row["temperature"], row["humidity"], row["rainfall"],
+                row["wind_speed"], row["pressure"], row["location"]
+            )
+            return self._build_result(row, payload.get("text", ""), *assessment)
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Risk assessment failed: {str(e)}",
-                "agent_used": "risk"
-            }
+            return self._row_error(e)
+
+    def _extract_inputs(self, context: dict) -> dict:
+        """Parse location and weather inputs for one payload context"""
+        weather_data = context.get("weather_data") or {}
+        
+        return {
+            "location": context.get("location", "unknown"),
+            "crop": context.get("crop", "general crops"),
+            "temperature": float(weather_data.get("temperature", context.get("temperature", context.get("temp", 25)))),
+            "humidity": float(weather_data.get("humidity", context.get("humidity", context.get("hum", 60)))),
+            "rainfall": float(weather_data.get("rainfall", context.get("rainfall", context.get("rain", context.get("recent_rain", 100))))),
+            "wind_speed": float(weather_data.get("wind_speed", context.get("wind_speed", 10))),
+            "pressure": float(weather_data.get("pressure", context.get("pressure", 1013))),
+            "time_period": context.get("time_period", "this season")
+        }
+
+    def _build_result(self, row: dict, text: str, risk_prediction, risk_scores, confidence) -> dict:
+        """Assemble the response for one assessed row"""
+        location = row["location"]
+        crop = row["crop"]
+        temperature = row["temperature"]
+        humidity = row["humidity"]
+        rainfall = row["rainfall"]
+        wind_speed = row["wind_speed"]
+        pressure = row["pressure"]
+        
+        # Generate detailed risk analysis
+        risk_factors = self._analyze_risk_factors(temperature, humidity, rainfall, wind_speed, pressure)
+        recommendations = self._generate_recommendations(risk_prediction, risk_factors, crop)
+        
+        # Legacy compatibility
+        pest_probability = risk_scores.get('high', 0.3) if 'pest' in text.lower() or humidity > 70 else 0.2
+        advice = recommendations[0] if recommendations else "Monitor crops regularly"
+        
+        return {
+            "success": True,
+            "location": location,
+            "crop": crop,
+            "time_period": row["time_period"],
+            "overall_risk_level": risk_prediction,
+            "risk_scores": risk_scores,
+            "confidence": confidence,
+            "risk_factors": risk_factors,
+            "recommendations": recommendations,
+            "weather_conditions": {
+                "temperature": temperature,
+                "humidity": humidity,
+                "rainfall": rainfall,
+                "wind_speed": wind_speed,
+                "pressure": pressure
+            },
+            # Legacy fields for backward compatibility
+            "pest_probability": round(pest_probability, 3),
+            "yield_risk": risk_prediction in ['medium', 'high'],
+            "advice": advice,
+            "message": f"Risk assessment for {crop} in {location}: {risk_prediction.upper()} risk level. {self._get_risk_summary(risk_prediction, risk_factors)}",
+            "agent_used": "risk"
+        }
 
     def _get_location_risk_score(self, location):
         """Get risk score for location (0-1, higher = more risky)"""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+How much traffic the keyword cascade answers without the intent model, and
+what that does to accuracy, on the dataset train_scripts/train_intent.py
+trains on (orchestrator/intent_sample.csv).
+
+The CSV uses the agent labels crop, market_yield, risk and finance, so
+runtime intents are compared after mapping them to those labels;
+pest_detection counts as risk, which is where the CSV files pest questions.
+Rows are classified as they are stored, without translation, so the
+non-English rows are reported separately: the API translates queries
+before classifying them, and untranslated text rarely contains keywords.
+
+Usage:
+    python benchmarks/bench_intent_cascade.py [--repeat 20]
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_classifier import AdvancedIntentClassifier
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "orchestrator", "intent_sample.csv")
+
+# Runtime intent -> train_intent.py label
+LABELS = {
+    'crop_recommendation': 'crop',
+    'market_yield': 'market_yield',
+    'risk_assessment': 'risk',
+    'pest_detection': 'risk',
+    'finance_agent': 'finance'
+}
+
+
+def load_dataset(path: str = DATASET):
+    """(text, label) rows of the CSV; section comment rows have no label and are skipped"""
+    with open(path, encoding='utf-8') as f:
+        return [
+            (row['text'].strip().replace('"', ''), row['label'])
+            for row in csv.DictReader(f)
+            if row['label'] in set(LABELS.values()) and len(row['text'].strip()) >= 3
+        ]
+
+
+def evaluate(classifier: AdvancedIntentClassifier, rows):
+    """Per row: (model-only label, cascade label, decided by keywords)"""
+    results = []
+    for text, _ in rows:
+        classifier.cascade = False
+        model_intent, _ = classifier.classify_intent(text)
+        classifier.cascade = True
+        cascade_intent, _ = classifier.classify_intent(text)
+        short_circuited = classifier._cascade_intent(text) is not None
+        results.append((LABELS.get(model_intent), LABELS.get(cascade_intent), short_circuited))
+    return results
+
+
+def report(name: str, rows, results):
+    if not rows:
+        return
+    total = len(rows)
+    model_correct = sum(model == label for (_, label), (model, _, _) in zip(rows, results))
+    cascade_correct = sum(cascade == label for (_, label), (_, cascade, _) in zip(rows, results))
+    skipped = [(label, model, cascade) for (_, label), (model, cascade, short) in zip(rows, results) if short]
+    print(f"  {name:<12} {total:5d} rows   short-circuited {len(skipped) / total:6.1%}   "
+          f"accuracy model {model_correct / total:6.1%} -> cascade {cascade_correct / total:6.1%} "
+          f"({(cascade_correct - model_correct) / total:+.1%})")
+    if skipped:
+        print(f"  {'':<12} on the short-circuited rows: model "
+              f"{sum(model == label for label, model, _ in skipped) / len(skipped):6.1%}, keywords "
+              f"{sum(cascade == label for label, _, cascade in skipped) / len(skipped):6.1%}")
+
+
+def time_per_query(classifier: AdvancedIntentClassifier, texts, cascade: bool, repeat: int) -> float:
+    """Median over 5 rounds of microseconds per classify_intent call"""
+    classifier.cascade = cascade
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                classifier.classify_intent(text)
+        rounds.append((time.perf_counter() - start) / (repeat * len(texts)) * 1e6)
+    return statistics.median(rounds)
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    classifier = AdvancedIntentClassifier()
+    classifier.pipeline  # load or fit before timing anything
+    rows = load_dataset()
+    results = evaluate(classifier, rows)
+
+    print(f"Cascade threshold {classifier.cascade_threshold:.4f} "
+          f"(keyword precision {classifier.cascade_precision:.1%} on the intent examples)\n")
+    print(f"{os.path.relpath(DATASET)}:")
+    report("all", rows, results)
+    english = [i for i, (text, _) in enumerate(rows) if text.isascii()]
+    other = [i for i in range(len(rows)) if i not in set(english)]
+    report("English", [rows[i] for i in english], [results[i] for i in english])
+    report("non-English", [rows[i] for i in other], [results[i] for i in other])
+
+    texts = [text for text, _ in rows]
+    model_us = time_per_query(classifier, texts, False, args.repeat)
+    cascade_us = time_per_query(classifier, texts, True, args.repeat)
+    print(f"\nMicroseconds per classify_intent call, {len(texts)} rows x {args.repeat}:")
+    print(f"  model only {model_us:8.1f}   cascade {cascade_us:8.1f}   ({model_us / cascade_us:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
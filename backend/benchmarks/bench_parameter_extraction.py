@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Per-query cost of AdvancedIntentClassifier.extract_parameters, before and after
+the single-pass extraction engine and the keyword automaton.
+
+"Before" is the previous implementation, kept below as LegacyExtraction: each
+intent helper lowercased the query again and ran its own re.search calls,
+with the NPK patterns rebuilt from f-strings on every call, and every
+dictionary lookup (crops, symptoms, loan types, ...) looped over its list
+with substring tests. The last section grows the crop list with synthetic
+variety names to compare how both lookups scale with vocabulary size.
+
+End to end the two cost about the same per query: the old helpers only ran
+for the query's intent, while the engine resolves every numeric fact and
+every dictionary for every intent. The gains are in the numeric step when
+all of it is needed, and in lookups over large vocabularies.
+
+Usage:
+    python benchmarks/bench_parameter_extraction.py [--repeat 2000] [--varieties 5000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_classifier import (
+    AdvancedIntentClassifier, SOIL_TYPES, FARMING_TYPES, MARKET_TYPES, RISK_KEYWORDS, TIME_PERIODS,
+    SYMPTOMS, PLANT_PARTS, LOAN_TYPES, FINANCIAL_PURPOSES
+)
+from orchestrator.parameter_extraction import parameter_extractor
+from orchestrator.keyword_automaton import KeywordAutomaton
+
+QUERIES = [
+    ("I have soil with pH 7.2, nitrogen 45, phosphorus 23, potassium 67, temperature 28°C, "
+     "humidity 75%, rainfall 120mm", "crop_recommendation"),
+    ("What should I grow on 5 acres of sandy loam with ph 6.5 at 30 degrees celsius", "crop_recommendation"),
+    ("Organic farming on 2 hectares, temperature is 86 degrees fahrenheit", "crop_recommendation"),
+    ("Predict wheat prices for next 3 months in Punjab with 500 quintals production", "market_yield"),
+    ("Where can I sell 20 bags of onion in the mandi next week", "market_yield"),
+    ("Assess drought risk for 10 acres of cotton in Rajasthan this summer", "risk_assessment"),
+    ("Is there flood risk this season near Cuttack district", "risk_assessment"),
+    ("My tomato plants have yellowing leaves and brown spots, need pest identification", "pest_detection"),
+    ("Need agricultural loan of 2.5 lakh rupees for buying seeds and fertilizers", "finance_agent"),
+    ("Kisan credit card for rs 50,000 to buy irrigation equipment", "finance_agent"),
+]
+
+
+class LegacyExtraction:
+    """The regex-per-helper extraction that the engine replaced"""
+
+    def __init__(self, classifier: AdvancedIntentClassifier):
+        self.crops = classifier.parameter_extractors['crops']
+        self.soil_nutrients = {
+            'nitrogen': ['nitrogen', 'n', 'nitrate', 'ammonia'],
+            'phosphorus': ['phosphorus', 'p', 'phosphate'],
+            'potassium': ['potassium', 'k', 'potash']
+        }
+        self.numbers = re.compile(r'\b\d+\.?\d*\b')
+        self.locations = re.compile(r'\b(?:in|at|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b')
+
+    def extract_parameters(self, query, intent, context=None):
+        params = {'query': query, 'intent': intent}
+        if context:
+            params.update(context)
+        if intent == 'crop_recommendation':
+            query_lower = query.lower()
+            params.update(self._soil(query_lower))
+            params.update(self._climate(query_lower))
+            params.update(self._area(query_lower))
+            farming_type = self._farming_type(query_lower)
+            if farming_type:
+                params['farming_type'] = farming_type
+        elif intent == 'market_yield':
+            query_lower = query.lower()
+            crop = self._crop_name(query_lower)
+            if crop:
+                params['crop'] = crop
+            timeframe = self._timeframe(query_lower)
+            if timeframe:
+                params['timeframe'] = timeframe
+            params.update(self._quantity(query_lower))
+            market_type = self._market_type(query_lower)
+            if market_type:
+                params['market_type'] = market_type
+        elif intent == 'risk_assessment':
+            query_lower = query.lower()
+            risk_types = self._risk_types(query_lower)
+            if risk_types:
+                params['risk_types'] = risk_types
+            location = self._location(query_lower)
+            if location:
+                params['location'] = location
+            time_period = self._time_period(query_lower)
+            if time_period:
+                params['time_period'] = time_period
+        elif intent == 'pest_detection':
+            query_lower = query.lower()
+            crop = self._crop_name(query_lower)
+            if crop:
+                params['crop_type'] = crop
+            symptoms = self._symptoms(query_lower)
+            if symptoms:
+                params['symptoms'] = symptoms
+            affected_parts = self._affected_parts(query_lower)
+            if affected_parts:
+                params['affected_parts'] = affected_parts
+        elif intent == 'finance_agent':
+            query_lower = query.lower()
+            amount = self._amount(query_lower)
+            if amount:
+                params['amount'] = amount
+            loan_type = self._loan_type(query_lower)
+            if loan_type:
+                params['loan_type'] = loan_type
+            purpose = self._financial_purpose(query_lower)
+            if purpose:
+                params['purpose'] = purpose
+        query_lower = query.lower()
+        location = self._location(query_lower)
+        if location:
+            params['location'] = location
+        numbers = self.numbers.findall(query)
+        if numbers:
+            params['numbers'] = [float(n) for n in numbers]
+        return params
+
+    def numeric(self, query):
+        """Every numeric helper on one query, the work the engine does in its single scan"""
+        query_lower = query.lower()
+        params = {}
+        params.update(self._soil(query_lower))
+        params.update(self._climate(query_lower))
+        params.update(self._area(query_lower))
+        params.update(self._quantity(query_lower))
+        params['timeframe'] = self._timeframe(query_lower)
+        params['amount'] = self._amount(query_lower)
+        params['location'] = self._location(query_lower)
+        params['numbers'] = [float(n) for n in self.numbers.findall(query)]
+        return params
+
+    def _soil(self, query):
+        params = {}
+        for pattern in [r'ph\s*(?:is|of|=|:)?\s*(\d+\.?\d*)', r'acidity\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
+                        r'alkalinity\s*(?:is|of|=|:)?\s*(\d+\.?\d*)']:
+            match = re.search(pattern, query)
+            if match:
+                params['ph'] = float(match.group(1))
+                break
+        for nutrient, keywords in self.soil_nutrients.items():
+            for keyword in keywords:
+                match = re.search(f'{keyword}\\s*(?:is|of|=|:)?\\s*(\\d+\\.?\\d*)', query)
+                if match:
+                    params[nutrient[0].upper()] = float(match.group(1))
+                    break
+        soil_type = self._soil_type(query)
+        if soil_type:
+            params['soil_type'] = soil_type
+        return params
+
+    def _climate(self, query):
+        params = {}
+        for pattern in [r'temperature\s*(?:is|of|=|:)?\s*(\d+\.?\d*)', r'(\d+\.?\d*)\s*(?:degrees?|°)\s*(?:celsius|c)',
+                        r'(\d+\.?\d*)\s*(?:degrees?|°)\s*(?:fahrenheit|f)']:
+            match = re.search(pattern, query)
+            if match:
+                temp = float(match.group(1))
+                if 'fahrenheit' in pattern:
+                    temp = (temp - 32) * 5 / 9
+                params['temperature'] = temp
+                break
+        match = re.search(r'humidity\s*(?:is|of|=|:)?\s*(\d+\.?\d*)', query)
+        if match:
+            params['humidity'] = float(match.group(1))
+        for pattern in [r'rainfall\s*(?:is|of|=|:)?\s*(\d+\.?\d*)', r'precipitation\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
+                        r'(\d+\.?\d*)\s*(?:mm|millimeter|inch|in)\s*(?:rain|rainfall)']:
+            match = re.search(pattern, query)
+            if match:
+                params['rainfall'] = float(match.group(1))
+                break
+        return params
+
+    def _area(self, query):
+        for pattern, key in [(r'(\d+\.?\d*)\s*(?:acres?|acre)', 'area_acres'),
+                             (r'(\d+\.?\d*)\s*(?:hectares?|hectare|ha)', 'area_hectares'),
+                             (r'(\d+\.?\d*)\s*(?:sq\s*ft|square\s*feet)', 'area_sqft'),
+                             (r'(\d+\.?\d*)\s*(?:sq\s*m|square\s*meter)', 'area_sqm')]:
+            match = re.search(pattern, query)
+            if match:
+                return {key: float(match.group(1))}
+        return {}
+
+    def _quantity(self, query):
+        for pattern, key in [(r'(\d+\.?\d*)\s*(?:tons?|tonne)', 'quantity_tons'),
+                             (r'(\d+\.?\d*)\s*(?:quintals?|qtl)', 'quantity_quintals'),
+                             (r'(\d+\.?\d*)\s*(?:kg|kilograms?)', 'quantity_kg'),
+                             (r'(\d+\.?\d*)\s*(?:bags?)', 'quantity_bags'),
+                             (r'(\d+\.?\d*)\s*(?:sacks?)', 'quantity_sacks')]:
+            match = re.search(pattern, query)
+            if match:
+                return {key: float(match.group(1))}
+        return {}
+
+    def _timeframe(self, query):
+        for pattern, unit in [(r'(\d+)\s*days?', 'days'), (r'(\d+)\s*weeks?', 'weeks'), (r'(\d+)\s*months?', 'months'),
+                              (r'next\s*week', 'weeks'), (r'next\s*month', 'months'),
+                              (r'this\s*season', 'seasons'), (r'next\s*season', 'seasons')]:
+            match = re.search(pattern, query)
+            if match:
+                return {'value': int(match.group(1)) if match.groups() else 1, 'unit': unit}
+        return None
+
+    def _amount(self, query):
+        for pattern, multiplier in [(r'(?:rs|rupees?)\s*(\d+(?:,\d+)*(?:\.\d+)?)', 1),
+                                    (r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:rs|rupees?)', 1),
+                                    (r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:lakhs?|lakh)', 100000),
+                                    (r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:crores?|crore)', 10000000)]:
+            match = re.search(pattern, query)
+            if match:
+                return float(match.group(1).replace(',', '')) * multiplier
+        return None
+
+    @staticmethod
+    def _first(keywords, query):
+        for keyword in keywords:
+            if keyword in query:
+                return keyword
+        return None
+
+    def _soil_type(self, query):
+        return self._first(SOIL_TYPES, query)
+
+    def _crop_name(self, query):
+        return self._first(self.crops, query)
+
+    def _farming_type(self, query):
+        return self._first(FARMING_TYPES, query)
+
+    def _market_type(self, query):
+        return self._first(MARKET_TYPES, query)
+
+    def _time_period(self, query):
+        return self._first(TIME_PERIODS, query)
+
+    def _loan_type(self, query):
+        return self._first(LOAN_TYPES, query)
+
+    def _financial_purpose(self, query):
+        return self._first(FINANCIAL_PURPOSES, query)
+
+    def _risk_types(self, query):
+        return [risk for risk, keywords in RISK_KEYWORDS.items() if any(keyword in query for keyword in keywords)]
+
+    def _symptoms(self, query):
+        return [symptom for symptom in SYMPTOMS if symptom in query]
+
+    def _affected_parts(self, query):
+        return [part for part in PLANT_PARTS if part in query]
+
+    def _location(self, query):
+        match = self.locations.search(query)
+        if match:
+            return match.group(1).strip()
+        for pattern in [r'(?:in|at|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+                        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:area|region|district|state)']:
+            match = re.search(pattern, query)
+            if match:
+                return match.group(1).strip()
+        return None
+
+
+def time_per_query(extract, repeat: int) -> float:
+    """Median over 5 rounds of microseconds per call of extract(query, intent)"""
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query, intent in QUERIES:
+                extract(query, intent)
+        rounds.append((time.perf_counter() - start) / (repeat * len(QUERIES)) * 1e6)
+    return statistics.median(rounds)
+
+
+def variety_names(count: int):
+    """Synthetic local variety names ("wheat variety 17", ...) to grow the crop list"""
+    return [f"variety{i:05d}" for i in range(count)]
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--varieties", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    classifier = AdvancedIntentClassifier()
+    legacy = LegacyExtraction(classifier)
+
+    print("Parameters that differ (before -> after):")
+    for query, intent in QUERIES:
+        before = legacy.extract_parameters(query, intent)
+        after = classifier.extract_parameters(query, intent)
+        for key in sorted(set(before) | set(after)):
+            if before.get(key) != after.get(key):
+                print(f"  {query[:50]!r}: {key}: {before.get(key)} -> {after.get(key)}")
+
+    print(f"\nMicroseconds per query, {len(QUERIES)} queries x {args.repeat}:")
+    rows = [
+        ("extract_parameters", legacy.extract_parameters, classifier.extract_parameters),
+        ("numeric values only", lambda query, intent: legacy.numeric(query),
+         lambda query, intent: parameter_extractor.extract(query))
+    ]
+    for label, before, after in rows:
+        before_us = time_per_query(before, args.repeat)
+        after_us = time_per_query(after, args.repeat)
+        print(f"  {label:<20} before {before_us:8.2f}   after {after_us:8.2f}   ({before_us / after_us:.1f}x)")
+
+    print(f"\nCrop lookup, microseconds per query, by crop list size:")
+    for extra in (0, args.varieties):
+        crops = legacy.crops + variety_names(extra)
+        automaton = KeywordAutomaton({'crops': {crop: crop for crop in crops}})
+        before_us = time_per_query(lambda query, intent: LegacyExtraction._first(crops, query.lower()),
+                                   args.repeat)
+        after_us = time_per_query(lambda query, intent: automaton.scan(query.lower()), args.repeat)
+        print(f"  {len(crops):>6} crops          before {before_us:8.2f}   after {after_us:8.2f}   "
+              f"({before_us / after_us:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
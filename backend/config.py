@@ -15,6 +15,8 @@ CLOUD_MODELS_DIR = MODELS_DIR / "cloud"
 FLASK_HOST = os.getenv("FLASK_HOST", "0.0.0.0")
 FLASK_PORT = int(os.getenv("FLASK_PORT", 5000))
 FLASK_DEBUG = os.getenv("FLASK_DEBUG", "False").lower() == "true"
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 2))  # pre-fork workers for serve.py
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))  # seconds between serve.py workers publishing their metrics to /metrics
 
 # Model paths
 MODEL_PATHS = {
@@ -24,7 +26,9 @@ MODEL_PATHS = {
     "yield_model": CLOUD_MODELS_DIR / "yield_model.pkl",
     "pest_model": CLOUD_MODELS_DIR / "pest_model.onnx",
     "weather_risk": CLOUD_MODELS_DIR / "weather_risk.pkl",
-    "main_mt5": LOCAL_MODELS_DIR / "main_mt5_model"
+    "main_mt5": LOCAL_MODELS_DIR / "main_mt5_model",
+    "intent_pipeline": MODELS_DIR / "intent_pipeline.joblib",  # rebuilt when the intent examples change
+    "intent_online": MODELS_DIR / "intent_online.joblib"  # hashing intent model, checkpointed as feedback arrives
 }
 
 # API Keys (load from environment)
@@ -38,6 +42,22 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///agricultural_ai.db")
 # Cache Configuration
 CACHE_TTL = int(os.getenv("CACHE_TTL", 3600))  # 1 hour default
 ENABLE_CACHE = os.getenv("ENABLE_CACHE", "True").lower() == "true"
+# Seconds a cached /query response stays fresh per intent (CACHE_TTL for others),
+# overridable as e.g. "market_yield=120,crop_recommendation=43200"
+RESPONSE_CACHE_TTLS = {
+    'market_yield': 300,
+    'risk_assessment': 1800,
+    'pest_detection': 3600,
+    'crop_recommendation': 86400,
+    'finance_agent': 86400,
+    **{
+        intent.strip(): int(ttl)
+        for intent, ttl in (
+            item.split("=", 1) for item in os.getenv("RESPONSE_CACHE_TTLS", "").split(",") if "=" in item
+        )
+    }
+}
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))  # LRU eviction above this
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -57,6 +77,43 @@ DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "en")
 
 # Agent Configuration
 AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", 30))  # seconds
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", 4))  # default concurrent requests per agent
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", 32))  # requests allowed to wait per agent
+# Per-agent concurrency overrides, e.g. "pest=2,crop=16"
+AGENT_CONCURRENCY_LIMITS = {
+    name.strip(): int(limit)
+    for name, limit in (
+        item.split("=", 1) for item in os.getenv("AGENT_CONCURRENCY_LIMITS", "").split(",") if "=" in item
+    )
+}
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "True").lower() == "true"  # single-flight identical requests
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 1000))  # payloads per /predict/<agent>/batch call
+# "eager" loads every agent's models in parallel at startup; "lazy" defers each
+# agent until its first request (models are then not shared across serve.py workers)
+AGENT_LOADING = os.getenv("AGENT_LOADING", "eager").lower()
+AGENT_LOAD_WORKERS = int(os.getenv("AGENT_LOAD_WORKERS", 5))  # threads for parallel model loading
+USE_MAPPED_MODELS = os.getenv("USE_MAPPED_MODELS", "True").lower() == "true"  # prefer <model>.mmap artifacts over pickles
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", 0))  # seconds between model file checks, 0 disables hot reload watching
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", 0.05))  # share of live predictions replayed on candidate models
+# Compound questions: also run every agent whose intent clears the threshold in some clause
+MULTI_INTENT = os.getenv("MULTI_INTENT", "False").lower() == "true"
+MULTI_INTENT_THRESHOLD = float(os.getenv("MULTI_INTENT_THRESHOLD", 0.5))  # clause probability for an extra intent
+MULTI_INTENT_MAX = int(os.getenv("MULTI_INTENT_MAX", 3))  # agents run per query at most
+MULTI_INTENT_WORKERS = int(os.getenv("MULTI_INTENT_WORKERS", 16))  # threads running fanned-out agents
+# Ambiguous questions: run the top two intents' agents in parallel (ignored when MULTI_INTENT is on)
+SPECULATIVE_EXECUTION = os.getenv("SPECULATIVE_EXECUTION", "False").lower() == "true"
+SPECULATIVE_MARGIN = float(os.getenv("SPECULATIVE_MARGIN", 0.15))  # top-two confidence gap below which both run
+# Decisive keyword questions: answer from the keyword scorer and skip the intent model.
+# Off by default: benchmarks/bench_intent_cascade.py shows no repeatable speedup yet
+INTENT_CASCADE = os.getenv("INTENT_CASCADE", "False").lower() == "true"
+INTENT_CASCADE_PRECISION = float(os.getenv("INTENT_CASCADE_PRECISION", 0.9))  # keyword accuracy on the intent examples the margin threshold must reach
+# Intent model: "tfidf" (TF-IDF + Naive Bayes) or "hashing" (hashed n-grams + linear model that learns from /feedback)
+INTENT_BACKEND = os.getenv("INTENT_BACKEND", "tfidf").lower()
+INTENT_HASH_FEATURES = int(os.getenv("INTENT_HASH_FEATURES", 2 ** 18))  # hashed n-gram columns; fixes the hashing model's size
+FEEDBACK_CHECKPOINT_EVERY = int(os.getenv("FEEDBACK_CHECKPOINT_EVERY", 100))  # corrected labels learned between checkpoints
+FEEDBACK_CHECKPOINT_INTERVAL = float(os.getenv("FEEDBACK_CHECKPOINT_INTERVAL", 300))  # seconds between background checkpoints of pending feedback
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # required as X-Admin-Token on /admin endpoints and /feedback; unset disables them
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "True").lower() == "true"  # warm models before /ready turns green
 
 # Data file paths
 DATA_FILES = {
@@ -5,12 +5,14 @@ This script creates mock models that can be used for testing and demonstration
 """
 
 import os
+import json
 import joblib
 import pickle
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LinearRegression
 from sklearn.dummy import DummyClassifier, DummyRegressor
+from utils.model_artifacts import export_forest
 
 # Create models directory
 models_dir = "models"
@@ -46,6 +48,7 @@ crop_model.fit(X_crop, y_crop)
 
 # Save to both locations for compatibility
 joblib.dump(crop_model, os.path.join(models_dir, "crop_model.pkl"))
+export_forest(crop_model, os.path.join(models_dir, "crop_model.mmap"))
 if os.path.exists("backend"):
     os.makedirs("backend/models", exist_ok=True)
     joblib.dump(crop_model, os.path.join("backend", "models", "crop_model.pkl"))
@@ -121,6 +124,8 @@ risk_model.fit(X_risk, y_risk)
 
 joblib.dump(risk_model, os.path.join(models_dir, "risk_model.pkl"))
 joblib.dump(risk_model, os.path.join(saved_models_dir, "risk_model.pkl"))
+for directory in (models_dir, saved_models_dir):
+    export_forest(risk_model, os.path.join(directory, "risk_model.mmap"))
 print("   ✓ Saved risk assessment model")
 
 # 5. Pest Detection Model
@@ -136,6 +141,8 @@ pest_model.fit(X_pest, y_pest)
 
 joblib.dump(pest_model, os.path.join(models_dir, "pest_model.pkl"))
 joblib.dump(pest_model, os.path.join(saved_models_dir, "pest_model.pkl"))
+for directory in (models_dir, saved_models_dir):
+    export_forest(pest_model, os.path.join(directory, "pest_model.mmap"))
 print("   ✓ Saved pest detection model")
 
 # 6. Finance/Credit Model
@@ -149,6 +156,8 @@ finance_model.fit(X_finance, y_finance)
 
 joblib.dump(finance_model, os.path.join(models_dir, "finance_model.pkl"))
 joblib.dump(finance_model, os.path.join(saved_models_dir, "finance_model.pkl"))
+for directory in (models_dir, saved_models_dir):
+    export_forest(finance_model, os.path.join(directory, "finance_model.mmap"))
 print("   ✓ Saved finance model")
 
 # Create model metadata
@@ -184,9 +193,21 @@ model_metadata = {
     }
 }
 
-with open(os.path.join(models_dir, "model_metadata.json"), "w") as f:
-    import json
-    json.dump(model_metadata, f, indent=2)
+# Merge into the existing file: registered versions and live/candidate
+# pointers belong to the model registry and must survive a regeneration
+metadata_path = os.path.join(models_dir, "model_metadata.json")
+try:
+    with open(metadata_path) as f:
+        existing_metadata = json.load(f)
+except (OSError, ValueError):
+    existing_metadata = {}
+for name, fields in model_metadata.items():
+    existing_metadata.setdefault(name, {}).update(fields)
+
+# Replaced atomically: running workers re-read this file when it changes
+with open(metadata_path + ".tmp", "w") as f:
+    json.dump(existing_metadata, f, indent=2)
+os.replace(metadata_path + ".tmp", metadata_path)
 
 print("   ✓ Saved model metadata")
 
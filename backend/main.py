@@ -1,10 +1,18 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 from flask_cors import CORS
-from orchestrator.orchestrator import Orchestrator
+from orchestrator.orchestrator import Orchestrator, ModelReloadError
+from config import MAX_BATCH_SIZE, MAX_IMAGE_SIZE, FLASK_HOST, FLASK_PORT, FLASK_DEBUG, ADMIN_TOKEN
+from utils.metrics import metrics, StageTimings
+from utils.admission import AgentOverloaded
 import os
+import hmac
 import logging
 from werkzeug.utils import secure_filename
+from werkzeug.formparser import parse_form_data
+from werkzeug.exceptions import RequestEntityTooLarge
+import numpy as np
 import base64
+import io
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +21,9 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+# Room for multipart boundaries and small form fields around an image upload
+MULTIPART_OVERHEAD = 64 * 1024
+
 # Ensure the core logic from specification is implemented
 BASE = os.path.dirname(__file__)
 MODELS_DIR = os.path.join(BASE, "saved_models")
@@ -25,6 +36,29 @@ except Exception as e:
     logger.error(f"Failed to initialize orchestrator: {e}")
     orch = None
 
+def _timings():
+    """Stage timings for the current request, echoed as a Server-Timing header"""
+    if 'timings' not in g:
+        g.timings = StageTimings()
+    return g.timings
+
+@app.after_request
+def add_server_timing(response):
+    timings = g.get('timings')
+    if timings is not None and timings.stages:
+        response.headers['Server-Timing'] = timings.server_timing_header()
+    return response
+
+def _overloaded_response(error):
+    """503 telling the client when the agent's backlog should have drained"""
+    response = jsonify({"ok": False, "error": str(error), "agent": error.agent, "retry_after": error.retry_after})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+def _present(**params):
+    """Drop parameters the client did not send so agent defaults apply"""
+    return {k: v for k, v in params.items() if v is not None}
+
 @app.get("/health")
 def health():
     """Health check endpoint - matches specification"""
@@ -33,6 +67,21 @@ def health():
     
     return jsonify({"status": "ok", "agents": list(orch.agents.keys())})
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 only after the warm-up pass has run.
+    The first probe starts warm-up in the background if nothing else has.
+    """
+    if orch is None:
+        return jsonify({"status": "error", "message": "Orchestrator not initialized"}), 503
+    
+    if not orch.is_ready():
+        orch.start_warm_up()
+        return jsonify({"status": "warming_up"}), 503
+    
+    return jsonify({"status": "ready", "warmup": orch.warmup_report})
+
 @app.post("/predict/<agent>")
 def predict_agent(agent):
     """Direct agent prediction endpoint - matches specification"""
@@ -44,11 +93,50 @@ def predict_agent(agent):
         return jsonify({"ok": False, "error": "Unknown agent", "available": list(orch.agents.keys())}), 400
     
     try:
-        result = orch.agents[agent].predict(payload)
+        with metrics.time_agent(agent):
+            result = orch.agents[agent].predict(payload)
         return jsonify({"ok": True, "agent": agent, "result": result})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
+@app.post("/predict/<agent>/batch")
+def predict_agent_batch(agent):
+    """
+    Batch prediction endpoint - scores many payloads with one model call.
+    Body: { "payloads": [ {"context": {...}}, ... ] } or a bare list of payloads
+    """
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+        
+    body = request.get_json(force=True, silent=True)
+    payloads = body.get("payloads") if isinstance(body, dict) else body
+    if agent not in orch.agents:
+        return jsonify({"ok": False, "error": "Unknown agent", "available": list(orch.agents.keys())}), 400
+    
+    if not isinstance(payloads, list) or not payloads:
+        return jsonify({
+            "ok": False,
+            "error": "A non-empty list of payloads is required",
+            "example": {"payloads": [{"context": {"N": 90, "P": 42, "K": 43}}]}
+        }), 400
+    
+    if len(payloads) > MAX_BATCH_SIZE:
+        return jsonify({"ok": False, "error": f"Batch too large, maximum is {MAX_BATCH_SIZE} payloads"}), 413
+    
+    # Non-object rows are reported individually rather than failing the batch
+    valid = [i for i, payload in enumerate(payloads) if isinstance(payload, dict)]
+    results = [{"success": False, "error": "Payload must be a JSON object"} for _ in payloads]
+    
+    try:
+        with metrics.time_agent(agent):
+            batch_results = orch.agents[agent].predict_many([payloads[i] for i in valid])
+        for i, result in zip(valid, batch_results):
+            results[i] = result
+        errors = sum(1 for result in results if not result.get("success", True))
+        return jsonify({"ok": True, "agent": agent, "count": len(results), "errors": errors, "results": results})
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
 @app.post("/query")
 def query():
     """
@@ -65,15 +153,53 @@ def query():
     if not text:
         return jsonify({"ok": False, "error": "no text"}), 400
     
+    if context is not None and not isinstance(context, dict):
+        return jsonify({"ok": False, "error": "context must be a JSON object"}), 400
+    
     try:
         # Use the handle_query method as specified
-        resp = orch.handle_query(text, context)
+        resp = orch.handle_query(text, context, timings=_timings())
         return jsonify({"ok": True, **resp})
         
+    except AgentOverloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         logger.error(f"Error processing query: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
+@app.post("/query/stream")
+def query_stream():
+    """
+    Streaming variant of /query that emits newline-delimited JSON events:
+    language and intent first, then the raw agent result, then the
+    localized answer once translation finishes.
+    Body: { "text": "...", "context": { optional structured data } }
+    """
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+        
+    body = request.get_json(force=True, silent=True) or {}
+    text = body.get("text") or body.get("query") or ""
+    context = body.get("context", {})
+    
+    if not text:
+        return jsonify({"ok": False, "error": "no text"}), 400
+    
+    if context is not None and not isinstance(context, dict):
+        return jsonify({"ok": False, "error": "context must be a JSON object"}), 400
+    
+    def generate():
+        try:
+            for event in orch.handle_query_stream(text, context):
+                yield app.json.dumps(event) + "\n"
+        except AgentOverloaded as e:
+            # Headers are already sent, so the overload is reported in-band
+            yield app.json.dumps({
+                "event": "error", "success": False, "error": str(e), "retry_after": e.retry_after
+            }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.post("/crop-recommendation")
 def crop_recommendation():
     """Specific endpoint for crop recommendations"""
@@ -93,18 +219,18 @@ def crop_recommendation():
             "required": required_params
         }), 400
     
-    # Create query text from parameters
-    query_text = f"Recommend crops for soil with N={data['N']}, P={data['P']}, K={data['K']}, pH={data['ph']}, temperature={data['temperature']}°C, humidity={data['humidity']}%, rainfall={data['rainfall']}mm"
-    
-    context = {
-        "soil_data": {k: data[k] for k in required_params},
-        "location": data.get("location"),
-        "area": data.get("area_hectares")
-    }
+    params = {k: data[k] for k in required_params}
+    params.update(_present(
+        soil_data={k: data[k] for k in required_params},
+        location=data.get("location"),
+        area=data.get("area_hectares")
+    ))
     
     try:
-        response = orch.handle_query(query_text, context)
+        response = orch.dispatch("crop", params, language=data.get("language", "en"), timings=_timings())
         return jsonify({"ok": True, **response})
+    except AgentOverloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         logger.error(f"Error in crop recommendation: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -126,16 +252,17 @@ def market_prediction():
             "example": {"crop": "wheat", "timeframe": 30}
         }), 400
     
-    query_text = f"Predict {crop} prices for the next {timeframe} days"
-    context = {
-        "crop": crop,
-        "timeframe": timeframe,
-        "location": data.get("location")
-    }
+    params = _present(
+        crop=crop,
+        timeframe=timeframe,
+        location=data.get("location")
+    )
     
     try:
-        response = orch.handle_query(query_text, context)
+        response = orch.dispatch("market_yield", params, language=data.get("language", "en"), timings=_timings())
         return jsonify({"ok": True, **response})
+    except AgentOverloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         logger.error(f"Error in market prediction: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -156,53 +283,133 @@ def risk_assessment():
             "example": {"location": "Punjab", "crop": "wheat"}
         }), 400
     
-    crop = data.get("crop", "crops")
-    query_text = f"Assess weather and agricultural risks for {crop} in {location}"
-    
-    context = {
-        "location": location,
-        "crop": data.get("crop"),
-        "weather_data": data.get("weather_data"),
-        "time_period": data.get("time_period", "this season")
-    }
+    params = _present(
+        location=location,
+        crop=data.get("crop"),
+        weather_data=data.get("weather_data"),
+        time_period=data.get("time_period", "this season")
+    )
     
     try:
-        response = orch.handle_query(query_text, context)
+        response = orch.dispatch("risk", params, language=data.get("language", "en"), timings=_timings())
         return jsonify({"ok": True, **response})
+    except AgentOverloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         logger.error(f"Error in risk assessment: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
 @app.post("/pest-detection")
 def pest_detection():
-    """Specific endpoint for pest detection from images"""
+    """
+    Specific endpoint for pest detection from images.
+    Accepts JSON with a base64 "image", a multipart upload with an "image"
+    file part, or the raw image bytes as application/octet-stream (other
+    fields then go in the query string).
+    """
     if orch is None:
         return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
         
-    data = request.get_json(force=True, silent=True) or {}
-    image_data = data.get("image")
+    try:
+        data, image_data = _read_pest_request()
+    except RequestEntityTooLarge:
+        return jsonify({
+            "ok": False,
+            "error": f"Image exceeds the maximum size of {MAX_IMAGE_SIZE} bytes"
+        }), 413
     
-    if not image_data:
+    if image_data is None or len(image_data) == 0:
         return jsonify({
             "ok": False,
             "error": "Image data is required for pest detection",
-            "example": {"image": "base64_encoded_image_data", "crop_type": "wheat"}
+            "example": {"image": "base64_encoded_image_data", "crop_type": "wheat"},
+            "accepted_content_types": ["application/json", "multipart/form-data", "application/octet-stream"]
         }), 400
     
-    query_text = "Identify pest or disease in this image"
-    context = {
-        "image_data": image_data,
-        "crop_type": data.get("crop_type"),
-        "symptoms": data.get("symptoms", [])
-    }
+    params = _present(
+        image_data=image_data,
+        crop_type=data.get("crop_type"),
+        symptoms=data.get("symptoms", [])
+    )
     
     try:
-        response = orch.handle_query(query_text, context)
+        response = orch.dispatch("pest", params, language=data.get("language", "en"), timings=_timings())
         return jsonify({"ok": True, **response})
+    except AgentOverloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         logger.error(f"Error in pest detection: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
+def _read_pest_request():
+    """
+    Read pest detection fields and image from any accepted body type.
+    
+    Binary uploads are read into a single buffer and exposed to the agent as
+    an np.frombuffer view, without an intermediate base64 string. The size
+    limit is enforced while the body streams in.
+    """
+    if request.mimetype == "multipart/form-data":
+        _, form, files = parse_form_data(
+            request.environ,
+            stream_factory=_memory_stream_factory,
+            max_content_length=MAX_IMAGE_SIZE + MULTIPART_OVERHEAD
+        )
+        data = form.to_dict()
+        data["symptoms"] = form.getlist("symptoms")
+        upload = files.get("image")
+        if upload is None:
+            return data, None
+        if upload.stream.getbuffer().nbytes > MAX_IMAGE_SIZE:
+            raise RequestEntityTooLarge()
+        return data, np.frombuffer(upload.stream.getbuffer(), dtype=np.uint8)
+    
+    if request.mimetype == "application/octet-stream":
+        data = request.args.to_dict()
+        data["symptoms"] = request.args.getlist("symptoms")
+        return data, _read_image_stream(request.stream, MAX_IMAGE_SIZE)
+    
+    data = request.get_json(force=True, silent=True) or {}
+    return data, data.get("image")
+
+def _memory_stream_factory(total_content_length, content_type, filename, content_length=None):
+    """Keep multipart file parts in memory so the finished part can be viewed without another copy"""
+    return io.BytesIO()
+
+def _read_image_stream(stream, limit):
+    """
+    Read a raw request body into one buffer, failing as soon as it exceeds limit.
+    
+    With a Content-Length the buffer is allocated once at that size and
+    filled in place with readinto. A chunked body of unknown length is read
+    in chunks and joined, which copies it once.
+    """
+    length = request.content_length
+    if length is not None:
+        if length > limit:
+            raise RequestEntityTooLarge()
+        buffer = bytearray(length)
+        view = memoryview(buffer)
+        filled = 0
+        while filled < length:
+            read = stream.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+        return np.frombuffer(buffer, dtype=np.uint8, count=filled)
+    
+    chunks = []
+    size = 0
+    while True:
+        chunk = stream.read(64 * 1024)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise RequestEntityTooLarge()
+        chunks.append(chunk)
+    return np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
 @app.post("/upload-image")
 def upload_image():
     """Upload image for pest detection"""
@@ -229,6 +436,54 @@ def upload_image():
         logger.error(f"Error uploading image: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
+@app.post("/feedback")
+def feedback():
+    """
+    Teach the intent model the correct intent of past queries, online (INTENT_BACKEND=hashing).
+    Body: { "text": "...", "intent": "finance_agent" } or { "items": [ {"text": "...", "intent": "..."}, ... ] }
+    The intent may be an intent or an agent name. Requires the X-Admin-Token header matching ADMIN_TOKEN; disabled when ADMIN_TOKEN is unset.
+    """
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+    
+    denied = _admin_denied()
+    if denied:
+        return denied
+    
+    if not orch.intent_clf.supports_feedback:
+        return jsonify({"ok": False, "error": "The intent backend does not learn from feedback, set INTENT_BACKEND=hashing"}), 409
+    
+    data = request.get_json(force=True, silent=True) or {}
+    items = data.get("items") if isinstance(data, dict) and "items" in data else [data]
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            "ok": False,
+            "error": "A non-empty list of feedback items is required",
+            "example": {"items": [{"text": "Can I get money for a tractor?", "intent": "finance_agent"}]}
+        }), 400
+    
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"ok": False, "error": f"Batch too large, maximum is {MAX_BATCH_SIZE} items"}), 413
+    
+    try:
+        result = orch.record_feedback(items)
+        return jsonify({"ok": True, **result})
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error recording feedback: {e}")
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Per-stage and per-agent latency histograms in Prometheus text format.
+    
+    Under serve.py the values are summed over every worker; the first line
+    lists the worker pids included.
+    """
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 @app.get("/languages")
 def get_languages():
     """Get supported languages"""
@@ -242,13 +497,20 @@ def get_languages():
 
 @app.get("/agent-status")
 def agent_status():
-    """Get detailed status of all agents"""
+    """Get detailed status of all agents, with this worker's cache and coalescing stats"""
     if orch is None:
         return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
     
     try:
         status = orch.get_agent_status()
-        return jsonify({"ok": True, "agent_status": status})
+        return jsonify({
+            "ok": True,
+            "agent_status": status,
+            "worker_pid": os.getpid(),
+            "coalescing": orch.get_coalescing_stats(),
+            "response_cache": orch.response_cache.get_stats(),
+            "shadow": orch.shadow.get_report()
+        })
     except Exception as e:
         logger.error(f"Error getting agent status: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -266,6 +528,97 @@ def clear_cache():
         logger.error(f"Error clearing cache: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
+def _admin_denied():
+    """403 response unless the request carries the configured admin token; always 403 when none is configured"""
+    if not ADMIN_TOKEN:
+        return jsonify({"ok": False, "error": "Admin endpoints are disabled, set ADMIN_TOKEN to enable them"}), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"ok": False, "error": "Invalid admin token"}), 403
+    return None
+
+@app.post("/admin/reload-models")
+def reload_models():
+    """
+    Hot-reload agent models from disk without restarting.
+    Body: { "agents": ["crop", "risk"] } or { "agent": "crop" }; omit both to reload every loaded agent.
+    Requires the X-Admin-Token header matching ADMIN_TOKEN; disabled when ADMIN_TOKEN is unset.
+    """
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+    
+    denied = _admin_denied()
+    if denied:
+        return denied
+    
+    data = request.get_json(force=True, silent=True) or {}
+    agents = data.get("agents") or ([data["agent"]] if data.get("agent") else None)
+    
+    try:
+        results = orch.reload_models(agents)
+        ok = all(result["ok"] for result in results.values())
+        return jsonify({"ok": ok, "results": results}), 200 if ok else 422
+    except Exception as e:
+        logger.error(f"Error reloading models: {e}")
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@app.get("/admin/models")
+def list_models():
+    """Registered model versions (hash, schema, size, latency) and shadow comparison results"""
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+    
+    denied = _admin_denied()
+    if denied:
+        return denied
+    
+    return jsonify({"ok": True, **orch.get_model_report()})
+
+@app.post("/admin/models/<name>/candidate")
+def set_model_candidate(name):
+    """
+    Start shadow-evaluating a registered version against live.
+    Body: { "version": "2" }; a null version stops shadowing.
+    """
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+    
+    denied = _admin_denied()
+    if denied:
+        return denied
+    
+    data = request.get_json(force=True, silent=True) or {}
+    version = data.get("version")
+    try:
+        orch.set_model_candidate(name, str(version) if version is not None else None)
+        return jsonify({"ok": True, "model": name, "candidate": version})
+    except KeyError as e:
+        return jsonify({"ok": False, "error": f"Unknown model or version: {e}"}), 404
+
+@app.post("/admin/models/<name>/promote")
+def promote_model(name):
+    """
+    Make a registered version live and hot-reload its agent onto it.
+    Body: { "version": "2" }
+    """
+    if orch is None:
+        return jsonify({"ok": False, "error": "Orchestrator not initialized"}), 500
+    
+    denied = _admin_denied()
+    if denied:
+        return denied
+    
+    data = request.get_json(force=True, silent=True) or {}
+    if data.get("version") is None:
+        return jsonify({"ok": False, "error": "version is required", "example": {"version": "2"}}), 400
+    
+    try:
+        result = orch.promote_model(name, str(data["version"]))
+        return jsonify({"ok": True, "model": name, "live": str(data["version"]), "reload": result})
+    except KeyError as e:
+        return jsonify({"ok": False, "error": f"Unknown model or version: {e}"}), 404
+    except ModelReloadError as e:
+        return jsonify({"ok": False, "error": str(e)}), 422
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -273,7 +626,7 @@ def not_found(error):
         "ok": False,
         "error": "Endpoint not found",
         "available_endpoints": [
-            "/health", "/query", "/crop-recommendation", 
+            "/health", "/ready", "/query", "/crop-recommendation", 
             "/market-prediction", "/risk-assessment", "/pest-detection"
         ]
     }), 404
@@ -287,5 +640,9 @@ def internal_error(error):
     }), 500
 
 if __name__ == "__main__":
+    # Development server; use serve.py for the pre-fork production server
     print("Starting Demeter backend...")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    if orch is not None:
+        orch.start_warm_up()
+        orch.start_model_watcher()
+    app.run(host=FLASK_HOST, port=FLASK_PORT, debug=FLASK_DEBUG)
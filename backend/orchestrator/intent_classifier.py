@@ -5,8 +5,12 @@ import re
 import numpy as np
 from typing import Dict, Any, Optional, List, Tuple
 import logging
-from sklearn.feature_extraction.text import TfidfVectorizer
+import time
+import copy
+import atexit
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
+from sklearn.linear_model import SGDClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
@@ -14,19 +18,189 @@ import pickle
 import json
 from pathlib import Path
 from collections import defaultdict
+import threading
 
 logger = logging.getLogger(__name__)
 
+try:
+    from ..config import (MODEL_PATHS, INTENT_CASCADE, INTENT_CASCADE_PRECISION, INTENT_BACKEND,
+                            INTENT_HASH_FEATURES, FEEDBACK_CHECKPOINT_EVERY, FEEDBACK_CHECKPOINT_INTERVAL)
+    from ..utils.metrics import metrics
+    from ..utils.intent_artifact import training_hash, save_intent_pipeline, load_intent_pipeline
+    from .parameter_extraction import parameter_extractor, SOIL_FACTS, CLIMATE_FACTS, AREA_FACTS, QUANTITY_FACTS
+    from .keyword_automaton import KeywordAutomaton, invert
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import (MODEL_PATHS, INTENT_CASCADE, INTENT_CASCADE_PRECISION, INTENT_BACKEND,
+                          INTENT_HASH_FEATURES, FEEDBACK_CHECKPOINT_EVERY, FEEDBACK_CHECKPOINT_INTERVAL)
+    from utils.metrics import metrics
+    from utils.intent_artifact import training_hash, save_intent_pipeline, load_intent_pipeline
+    from orchestrator.parameter_extraction import parameter_extractor, SOIL_FACTS, CLIMATE_FACTS, AREA_FACTS, QUANTITY_FACTS
+    from orchestrator.keyword_automaton import KeywordAutomaton, invert
+
+# Clause boundaries in compound questions ("what should I plant and what will it sell for?");
+# a period only splits when it is not a decimal point
+CLAUSE_SPLIT = re.compile(r'\s*(?:[,;?!]|\.(?!\d)|\b(?:and|also|plus|then)\b)\s*', re.IGNORECASE)
+
+# Keyword dictionaries; all of them are matched together by one KeywordAutomaton scan
+SOIL_TYPES = ['clay', 'sandy', 'loam', 'silt', 'peat', 'chalk', 'saline']
+FARMING_TYPES = [
+    'organic', 'conventional', 'hydroponic', 'greenhouse',
+    'polyhouse', 'drip irrigation', 'sprinkler', 'traditional'
+]
+MARKET_TYPES = ['wholesale', 'retail', 'mandi', 'local', 'export', 'domestic']
+RISK_KEYWORDS = {
+    'drought': ['drought', 'dry', 'water shortage', 'no rain'],
+    'flood': ['flood', 'flooding', 'too much rain', 'waterlogging'],
+    'pest': ['pest', 'insect', 'bug', 'infestation'],
+    'disease': ['disease', 'fungal', 'bacterial', 'viral', 'infection'],
+    'weather': ['weather', 'climate', 'temperature', 'storm', 'cyclone'],
+    'market': ['market', 'price', 'demand', 'supply'],
+    'financial': ['financial', 'economic', 'cost', 'profit', 'loss']
+}
+TIME_PERIODS = [
+    'today', 'tomorrow', 'this week', 'next week',
+    'this month', 'next month', 'this season', 'next season',
+    'short term', 'long term', 'immediate'
+]
+SYMPTOMS = [
+    'yellowing', 'browning', 'wilting', 'spots', 'holes',
+    'curling', 'stunted', 'discoloration', 'rotting', 'drying'
+]
+PLANT_PARTS = [
+    'leaves', 'stem', 'roots', 'flowers', 'fruits',
+    'branches', 'trunk', 'seeds', 'pods'
+]
+LOAN_TYPES = [
+    'crop loan', 'kisan credit card', 'kcc', 'term loan',
+    'equipment loan', 'land purchase loan', 'working capital'
+]
+FINANCIAL_PURPOSES = [
+    'seeds', 'fertilizer', 'pesticide', 'equipment', 'machinery',
+    'irrigation', 'land', 'storage', 'processing', 'marketing'
+]
+
+# Keywords that raise the model's confidence in an intent, KEYWORD_BOOST each
+KEYWORD_BOOST = 0.05
+INTENT_BOOSTERS = {
+    'crop_recommendation': ['recommend', 'suggest', 'best', 'suitable', 'plant', 'grow'],
+    'market_yield': ['price', 'market', 'yield', 'forecast', 'predict', 'profit'],
+    'risk_assessment': ['risk', 'danger', 'threat', 'weather', 'climate', 'drought'],
+    'pest_detection': ['pest', 'bug', 'disease', 'identify', 'what is this'],
+    'finance_agent': ['loan', 'credit', 'subsidy', 'cost', 'budget', 'money']
+}
+# Intent -> (context key, boost added when the request context has it)
+CONTEXT_BOOSTS = {
+    'pest_detection': ('image_data', 0.2),
+    'risk_assessment': ('location', 0.1),
+    'crop_recommendation': ('soil_data', 0.15)
+}
+
+# Keyword classification used when there is no model
+FALLBACK_KEYWORDS = {
+    'crop_recommendation': {
+        'primary': ['recommend', 'suggest', 'best crop', 'what to plant', 'which crop'],
+        'secondary': ['soil', 'climate', 'suitable', 'grow', 'plant', 'farming'],
+        'context': ['ph', 'nitrogen', 'phosphorus', 'potassium', 'temperature']
+    },
+    'market_yield': {
+        'primary': ['price', 'market', 'yield', 'forecast', 'predict'],
+        'secondary': ['profit', 'revenue', 'cost', 'sell', 'buy', 'trade'],
+        'context': ['ton', 'quintal', 'per acre', 'per hectare', 'rupees']
+    },
+    'risk_assessment': {
+        'primary': ['risk', 'danger', 'threat', 'weather risk', 'climate risk'],
+        'secondary': ['drought', 'flood', 'storm', 'temperature', 'rainfall'],
+        'context': ['probability', 'chance', 'likely', 'forecast', 'warning']
+    },
+    'pest_detection': {
+        'primary': ['pest', 'bug', 'disease', 'identify', 'what is this'],
+        'secondary': ['insect', 'fungal', 'bacterial', 'infection', 'damage'],
+        'context': ['leaf', 'plant', 'crop', 'treatment', 'control']
+    },
+    'finance_agent': {
+        'primary': ['loan', 'credit', 'subsidy', 'scheme', 'financial'],
+        'secondary': ['cost', 'budget', 'money', 'investment', 'insurance'],
+        'context': ['bank', 'government', 'interest', 'EMI', 'premium']
+    }
+}
+FALLBACK_WEIGHTS = {'primary': 3, 'secondary': 2, 'context': 1}
+# Highest possible keyword score per intent, which fallback scores are divided by
+FALLBACK_TOTALS = {
+    intent: sum(FALLBACK_WEIGHTS[tier] * len(keywords) for tier, keywords in tiers.items())
+    for intent, tiers in FALLBACK_KEYWORDS.items()
+}
+
+# Intent backend -> MODEL_PATHS entry of its artifact
+INTENT_BACKENDS = {'tfidf': 'intent_pipeline', 'hashing': 'intent_online'}
+
 class AdvancedIntentClassifier:
-    """Advanced ML-based intent classifier with NLP capabilities"""
+    """
+    Advanced ML-based intent classifier with NLP capabilities
     
-    def __init__(self):
+    The TF-IDF + Naive Bayes pipeline is not built at construction. On
+    first use it is loaded from the artifact at artifact_path, and only
+    refitted (and the artifact rewritten) when the training examples or
+    pipeline configuration no longer match the artifact's hash.
+    
+    With the cascade on, the keyword scorer runs first and a query whose
+    best keyword intent leads the runner-up by at least cascade_threshold
+    is answered without the model. The threshold is calibrated on the
+    intent examples at construction.
+    
+    The "hashing" backend swaps the pipeline for hashed n-grams and a
+    linear model. It has no vocabulary, its size is fixed by
+    INTENT_HASH_FEATURES, and learn() folds corrected labels into it with
+    partial_fit, checkpointing to its own artifact as feedback accumulates.
+    """
+    
+    def __init__(self, artifact_path: Optional[str] = None, backend: Optional[str] = None):
         self.model = None
         self.vectorizer = None
-        self.pipeline = None
         self.intent_examples = self._load_training_data()
         self.parameter_extractors = self._initialize_extractors()
-        self._train_model()
+        self.extraction_engine = parameter_extractor
+        self.keyword_automaton = self._build_keyword_automaton()
+        self.cascade = INTENT_CASCADE
+        self.cascade_threshold, self.cascade_precision = self._calibrate_cascade(INTENT_CASCADE_PRECISION)
+        self.backend = backend or INTENT_BACKEND
+        if self.backend not in INTENT_BACKENDS:
+            raise ValueError(f"Unknown intent backend {self.backend!r}, expected one of {list(INTENT_BACKENDS)}")
+        self.artifact_path = str(artifact_path or MODEL_PATHS[INTENT_BACKENDS[self.backend]])
+        self.training_hash = training_hash(self.intent_examples, self._build_pipeline())
+        self._pipeline = None
+        self._pipeline_ready = False
+        self._pipeline_lock = threading.Lock()
+        
+        # Online learning (hashing backend): labels learned by this process, and those not yet checkpointed
+        self.feedback_count = 0
+        self._pending_feedback = 0
+        self._last_checkpoint = time.monotonic()
+        self._feedback_lock = threading.Lock()
+        self.checkpoint_interval = FEEDBACK_CHECKPOINT_INTERVAL
+        self._checkpoint_timer = None
+        self._checkpoint_at_exit = False
+    
+    @property
+    def pipeline(self):
+        """The fitted pipeline, loaded or trained on first access; None if training failed"""
+        if not self._pipeline_ready:
+            with self._pipeline_lock:
+                if not self._pipeline_ready:
+                    self._pipeline = load_intent_pipeline(self.artifact_path, self.training_hash)
+                    if self._pipeline is None:
+                        self._train_model()
+                    else:
+                        logger.info(f"Loaded intent pipeline from {self.artifact_path}")
+                    self._pipeline_ready = True
+        return self._pipeline
+    
+    @pipeline.setter
+    def pipeline(self, pipeline):
+        self._pipeline = pipeline
+        self._pipeline_ready = True
     
     def _load_training_data(self) -> Dict[str, List[str]]:
         """Load comprehensive training data for intent classification"""
@@ -237,7 +411,6 @@ class AdvancedIntentClassifier:
     def _initialize_extractors(self) -> Dict[str, Any]:
         """Initialize parameter extraction patterns and methods"""
         return {
-            'numbers': re.compile(r'\b\d+\.?\d*\b'),
             'crops': [
                 'wheat', 'rice', 'corn', 'maize', 'barley', 'oats', 'rye', 'millet',
                 'soybean', 'soya', 'chickpea', 'lentil', 'pea', 'bean', 'groundnut',
@@ -250,11 +423,6 @@ class AdvancedIntentClassifier:
                 'coconut', 'date', 'fig', 'pomegranate', 'watermelon', 'melon',
                 'grapes','jackfruit','sappota','lemon','custard apple'
             ],
-            'soil_nutrients': {
-                'nitrogen': ['nitrogen', 'n', 'nitrate', 'ammonia'],
-                'phosphorus': ['phosphorus', 'p', 'phosphate'],
-                'potassium': ['potassium', 'k', 'potash']
-            },
             'weather_terms': [
                 'temperature', 'humidity', 'rainfall', 'precipitation', 'wind',
                 'pressure', 'drought', 'flood', 'storm', 'cyclone', 'hail'
@@ -266,7 +434,6 @@ class AdvancedIntentClassifier:
                 'season': ['season', 'seasonal', 'spring', 'summer', 'monsoon', 'winter'],
                 'year': ['year', 'yearly', 'annual', 'next year', 'this year']
             },
-            'locations': re.compile(r'\b(?:in|at|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b'),
             'measurements': {
                 'area': ['acre', 'hectare', 'sq ft', 'square feet', 'sq m', 'square meter'],
                 'weight': ['kg', 'kilogram', 'ton', 'tonne', 'quintal', 'pound', 'lb'],
@@ -275,8 +442,34 @@ class AdvancedIntentClassifier:
             }
         }
     
+    def _build_pipeline(self) -> Pipeline:
+        """Unfitted pipeline for the backend: TF-IDF and Naive Bayes, or hashing and a linear model"""
+        if self.backend == 'hashing':
+            return Pipeline([
+                ('hashing', HashingVectorizer(
+                    ngram_range=(1, 3),
+                    n_features=INTENT_HASH_FEATURES,
+                    alternate_sign=False,
+                    stop_words='english',
+                    lowercase=True,
+                    strip_accents='ascii'
+                )),
+                # Logistic loss, so predict_proba works as it does for Naive Bayes
+                ('classifier', SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42))
+            ])
+        return Pipeline([
+            ('tfidf', TfidfVectorizer(
+                ngram_range=(1, 3),
+                max_features=5000,
+                stop_words='english',
+                lowercase=True,
+                strip_accents='ascii'
+            )),
+            ('classifier', MultinomialNB(alpha=0.1))
+        ])
+    
     def _train_model(self):
-        """Train the intent classification model"""
+        """Train the intent classification model and save it as the artifact"""
         # Prepare training data
         texts = []
         labels = []
@@ -286,16 +479,7 @@ class AdvancedIntentClassifier:
             labels.extend([intent] * len(examples))
         
         # Create pipeline with TF-IDF and Naive Bayes
-        self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(
-                ngram_range=(1, 3),
-                max_features=5000,
-                stop_words='english',
-                lowercase=True,
-                strip_accents='ascii'
-            )),
-            ('classifier', MultinomialNB(alpha=0.1))
-        ])
+        self._pipeline = self._build_pipeline()
         
         # Train the model
         try:
@@ -303,17 +487,129 @@ class AdvancedIntentClassifier:
                 texts, labels, test_size=0.2, random_state=42, stratify=labels
             )
             
-            self.pipeline.fit(X_train, y_train)
+            self._pipeline.fit(X_train, y_train)
             
             # Evaluate model
-            y_pred = self.pipeline.predict(X_test)
+            y_pred = self._pipeline.predict(X_test)
             logger.info("Intent Classification Model Performance:")
             logger.info(classification_report(y_test, y_pred))
             
         except Exception as e:
             logger.error(f"Error training intent classifier: {e}")
             # Fallback to simple keyword matching
-            self.pipeline = None
+            self._pipeline = None
+            return
+        
+        try:
+            save_intent_pipeline(self._pipeline, self.artifact_path, self.training_hash,
+                                 examples=len(texts))
+        except Exception as e:
+            logger.warning(f"Could not save intent pipeline to {self.artifact_path}: {e}")
+    
+    def train(self):
+        """Refit the pipeline now and rewrite the artifact, whatever its hash"""
+        with self._pipeline_lock:
+            self._train_model()
+            self._pipeline_ready = True
+        return self._pipeline
+    
+    @property
+    def supports_feedback(self) -> bool:
+        """Whether learn() can update the model in place"""
+        return self.backend == 'hashing'
+    
+    def learn(self, texts: List[str], intents: List[str]) -> Dict[str, Any]:
+        """
+        Fold corrected intent labels into the hashing model without refitting
+        
+        The texts are hashed and passed to partial_fit on a copy of the
+        linear model, which then replaces the live pipeline in a single
+        assignment, so a query is always classified by either the old or
+        the new model. Each call costs a few milliseconds, mostly copying
+        INTENT_HASH_FEATURES weights per intent. The model is checkpointed
+        to the artifact once FEEDBACK_CHECKPOINT_EVERY labels are pending,
+        and a background timer writes whatever is still pending every
+        FEEDBACK_CHECKPOINT_INTERVAL seconds and when the process exits
+        (serve.py workers, which skip atexit, call checkpoint() themselves
+        on the way out). Each worker process learns only the feedback it
+        receives, and a changed set of intent examples still retrains from
+        scratch, dropping what was learned online.
+        
+        Args:
+            texts: Queries, in English as they were classified
+            intents: The correct intent of each query
+            
+        Returns:
+            {'learned', 'feedback_count', 'checkpointed'}
+        """
+        if not self.supports_feedback:
+            raise ValueError(f"The {self.backend} intent backend does not learn from feedback")
+        if len(texts) != len(intents):
+            raise ValueError(f"Got {len(texts)} texts but {len(intents)} intents")
+        unknown = sorted(set(intents) - set(self.intent_examples))
+        if unknown:
+            raise ValueError(f"Unknown intents {unknown}, expected one of {list(self.intent_examples)}")
+        pipeline = self.pipeline
+        if pipeline is None:
+            raise RuntimeError("Intent model is not available")
+        if not texts:
+            return {'learned': 0, 'feedback_count': self.feedback_count, 'checkpointed': False}
+        
+        with self._feedback_lock:
+            # Update a copy and swap it in whole: queries being classified keep
+            # using the old model and never see a half-applied update
+            pipeline = self.pipeline
+            classifier = copy.deepcopy(pipeline.named_steps['classifier'])
+            features = pipeline.named_steps['hashing'].transform(texts)
+            classifier.partial_fit(features, intents, classes=pipeline.classes_)
+            updated = Pipeline([('hashing', pipeline.named_steps['hashing']), ('classifier', classifier)])
+            with self._pipeline_lock:
+                if self._pipeline is not pipeline:
+                    raise RuntimeError("Intent model was retrained during the update, send the feedback again")
+                self._pipeline = updated
+            self.feedback_count += len(texts)
+            self._pending_feedback += len(texts)
+            due = (self._pending_feedback >= FEEDBACK_CHECKPOINT_EVERY
+                   or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval)
+            checkpointed = self._checkpoint_locked() if due else False
+        self._start_checkpoint_timer()
+        
+        return {'learned': len(texts), 'feedback_count': self.feedback_count, 'checkpointed': checkpointed}
+    
+    def checkpoint(self) -> bool:
+        """Write the model with the feedback learned so far to the artifact, if any is pending"""
+        with self._feedback_lock:
+            return self._checkpoint_locked() if self._pending_feedback else False
+    
+    def _start_checkpoint_timer(self):
+        """Flush pending feedback periodically and at exit, from the first learn() in this process"""
+        if not self._checkpoint_at_exit:
+            atexit.register(self.checkpoint)
+            self._checkpoint_at_exit = True
+        # A timer started before fork does not run in the forked worker
+        if self.checkpoint_interval <= 0 or (self._checkpoint_timer is not None and self._checkpoint_timer.is_alive()):
+            return
+        
+        def run():
+            while True:
+                time.sleep(self.checkpoint_interval)
+                self.checkpoint()
+        
+        self._checkpoint_timer = threading.Thread(target=run, name="intent-checkpoint", daemon=True)
+        self._checkpoint_timer.start()
+    
+    def _checkpoint_locked(self) -> bool:
+        try:
+            save_intent_pipeline(self._pipeline, self.artifact_path, self.training_hash,
+                                 examples=sum(len(examples) for examples in self.intent_examples.values()),
+                                 feedback=self.feedback_count)
+        except Exception as e:
+            # Pending feedback stays pending and is retried on the next call
+            logger.warning(f"Could not checkpoint intent model to {self.artifact_path}: {e}")
+            return False
+        self._pending_feedback = 0
+        self._last_checkpoint = time.monotonic()
+        return True
     
     def classify_intent(self, query: str, context: Dict[str, Any] = None) -> Tuple[str, float]:
         """
@@ -326,23 +622,116 @@ class AdvancedIntentClassifier:
         Returns:
             Tuple of (intent, confidence_score)
         """
+        return self.rank_intents(query, context, top_k=1)[0]
+    
+    def classify_intents(self, texts: List[str],
+                         contexts: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Tuple[str, float]]:
+        """
+        Classify many queries at once, with the same results as classify_intent on each
+        
+        Texts the keyword cascade does not decide are vectorized and scored
+        with a single predict_proba call on the whole sparse matrix, and the
+        contextual boosts are added as arrays. Meant for log replay, offline queue sync
+        and evaluation, where per-call overhead dominates.
+        
+        Args:
+            texts: User query strings
+            contexts: One context per text (or None for no contexts)
+            
+        Returns:
+            List of (intent, confidence_score), one per text
+        """
+        if contexts is None:
+            contexts = [None] * len(texts)
+        if len(contexts) != len(texts):
+            raise ValueError(f"Got {len(texts)} texts but {len(contexts)} contexts")
+        
+        results: List[Optional[Tuple[str, float]]] = [None] * len(texts)
+        hits = {}
+        model_rows = []
+        for i, (query, context) in enumerate(zip(texts, contexts)):
+            # Same early exits as rank_intents
+            if not query or len(query.strip()) < 3:
+                results[i] = ('general', 0.3)
+                continue
+            context_intent = self._context_intent(context)
+            if context_intent:
+                results[i] = context_intent
+                continue
+            hits[i] = self.keyword_automaton.scan(query.lower())
+            cascade_intent = self._cascade_intent(query, context, hits[i])
+            if cascade_intent:
+                results[i] = cascade_intent
+            else:
+                model_rows.append(i)
+        keyword_rows = len(hits) - len(model_rows)
+        if keyword_rows:
+            metrics.intent_classifications.inc(keyword_rows, path='keyword')
+        
+        if model_rows and self.pipeline:
+            try:
+                probabilities = self.pipeline.predict_proba([texts[i] for i in model_rows])
+                best = probabilities.argmax(axis=1)
+                intents = np.asarray(self.pipeline.classes_)[best]
+                confidences = probabilities[np.arange(len(model_rows)), best]
+                
+                keyword_matches = np.array([
+                    self._keyword_matches(hits[i], intent) for i, intent in zip(model_rows, intents)
+                ])
+                context_boosts = np.array([
+                    CONTEXT_BOOSTS[intent][1]
+                    if contexts[i] and intent in CONTEXT_BOOSTS and contexts[i].get(CONTEXT_BOOSTS[intent][0]) else 0.0
+                    for i, intent in zip(model_rows, intents)
+                ])
+                boosted = np.minimum(confidences + (keyword_matches * KEYWORD_BOOST + context_boosts), 1.0)
+                for i, intent, confidence in zip(model_rows, intents, boosted):
+                    results[i] = (str(intent), float(confidence))
+                metrics.intent_classifications.inc(len(model_rows), path='model')
+                model_rows = []
+            except Exception as e:
+                logger.error(f"Error in batch ML classification: {e}")
+        
+        # No model, or the batch failed: classify the rest one by one
+        for i in model_rows:
+            results[i] = self.classify_intent(texts[i], contexts[i])
+        
+        return results
+    
+    def rank_intents(self, query: str, context: Dict[str, Any] = None,
+                     top_k: int = 2) -> List[Tuple[str, float]]:
+        """
+        Rank the most likely intents of a user query
+        
+        The first entry is always what classify_intent returns. Runner-up
+        intents only come from the ML model, in order of model probability,
+        each with its own contextual boost applied; a query the keyword
+        cascade decides gets no runner-up.
+        
+        Args:
+            query: User query string
+            context: Additional context (e.g., image data, location, user history)
+            top_k: Maximum number of intents to return
+            
+        Returns:
+            List of (intent, confidence_score), best first
+        """
         # Handle empty or very short queries
         if not query or len(query.strip()) < 3:
-            return 'general', 0.3
+            metrics.intent_classifications.inc(path='short')
+            return [('general', 0.3)]
         
         # Strong contextual indicators
-        if context:
-            # Image data strongly indicates pest detection
-            if context.get('image_data') or context.get('image_path'):
-                return 'pest_detection', 0.95
-            
-            # Location + weather data indicates risk assessment
-            if context.get('weather_data') and context.get('location'):
-                return 'risk_assessment', 0.85
-            
-            # Financial keywords in context
-            if context.get('financial_context'):
-                return 'finance_agent', 0.8
+        context_intent = self._context_intent(context)
+        if context_intent:
+            metrics.intent_classifications.inc(path='context')
+            return [context_intent]
+        
+        # Decisive keywords answer without the model
+        hits = self.keyword_automaton.scan(query.lower())
+        cascade_intent = self._cascade_intent(query, context, hits)
+        if cascade_intent:
+            metrics.intent_classifications.inc(path='keyword')
+            return [cascade_intent]
         
         # Use ML model if available
         if self.pipeline:
@@ -351,118 +740,224 @@ class AdvancedIntentClassifier:
                 probabilities = self.pipeline.predict_proba([query])[0]
                 classes = self.pipeline.classes_
                 
-                # Get the best prediction
-                best_idx = np.argmax(probabilities)
-                best_intent = classes[best_idx]
-                confidence = probabilities[best_idx]
+                # Best prediction first; ties keep class order, as argmax does
+                ranked = sorted(zip(classes, probabilities), key=lambda item: item[1], reverse=True)
                 
                 # Apply contextual boosting
-                confidence = self._apply_contextual_boosting(
-                    query, best_intent, confidence, context
-                )
-                
-                return best_intent, float(confidence)
+                metrics.intent_classifications.inc(path='model')
+                return [
+                    (str(intent), float(self._apply_contextual_boosting(query, intent, probability, context, hits)))
+                    for intent, probability in ranked[:top_k]
+                ]
                 
             except Exception as e:
                 logger.error(f"Error in ML classification: {e}")
         
         # Fallback to enhanced keyword matching
-        return self._fallback_classification(query, context)
+        metrics.intent_classifications.inc(path='fallback')
+        return [self._fallback_classification(query, context, hits)]
+    
+    def classify_multi_intent(self, query: str, context: Dict[str, Any] = None,
+                              threshold: float = 0.5, max_intents: int = 3) -> List[Tuple[str, float]]:
+        """
+        Classify a possibly compound query into every intent it asks about
+        
+        The whole query gives the primary intent, exactly as classify_intent.
+        Each clause of the query is then scored separately, and every other
+        intent whose boosted probability reaches the threshold in some clause
+        is added.
+        
+        Args:
+            query: User query string
+            context: Additional context (e.g., image data, location, user history)
+            threshold: Minimum clause probability for an additional intent
+            max_intents: Upper bound on the number of intents returned
+            
+        Returns:
+            List of (intent, confidence_score), primary intent first, then by confidence
+        """
+        primary, confidence = self.classify_intent(query, context)
+        intents = [(primary, confidence)]
+        if max_intents < 2 or not self.pipeline or primary == 'general' or self._context_intent(context):
+            return intents
+        
+        clauses = [clause for clause in CLAUSE_SPLIT.split(query) if len(clause.strip()) >= 3]
+        if len(clauses) < 2:
+            return intents
+        
+        try:
+            probabilities = self.pipeline.predict_proba(clauses)
+        except Exception as e:
+            logger.error(f"Error in multi-intent classification: {e}")
+            return intents
+        
+        scores = {}
+        for clause, row in zip(clauses, probabilities):
+            hits = self.keyword_automaton.scan(clause.lower())
+            for intent, probability in zip(self.pipeline.classes_, row):
+                score = self._apply_contextual_boosting(clause, intent, probability, context, hits)
+                scores[str(intent)] = max(scores.get(str(intent), 0.0), float(score))
+        
+        additional = sorted(
+            ((intent, score) for intent, score in scores.items() if intent != primary and score >= threshold),
+            key=lambda item: item[1], reverse=True
+        )
+        return intents + additional[:max_intents - 1]
+    
+    def _context_intent(self, context: Dict[str, Any] = None) -> Optional[Tuple[str, float]]:
+        """Intent implied outright by the request context, if any"""
+        if not context:
+            return None
+        
+        # Image data strongly indicates pest detection
+        if context.get('image_data') or context.get('image_path'):
+            return 'pest_detection', 0.95
+        
+        # Location + weather data indicates risk assessment
+        if context.get('weather_data') and context.get('location'):
+            return 'risk_assessment', 0.85
+        
+        # Financial keywords in context
+        if context.get('financial_context'):
+            return 'finance_agent', 0.8
+        
+        return None
+    
+    def _build_keyword_automaton(self) -> KeywordAutomaton:
+        """One automaton over every keyword dictionary the classifier looks queries up in"""
+        fallback = {}
+        for intent, tiers in FALLBACK_KEYWORDS.items():
+            for tier, keywords in tiers.items():
+                for keyword in keywords:
+                    fallback[keyword.lower()] = fallback.get(keyword.lower(), ()) + ((intent, FALLBACK_WEIGHTS[tier]),)
+        
+        def identity(keywords):
+            return {keyword: keyword for keyword in keywords}
+        
+        return KeywordAutomaton({
+            'crops': identity(self.parameter_extractors['crops']),
+            'soil_types': identity(SOIL_TYPES),
+            'farming_types': identity(FARMING_TYPES),
+            'market_types': identity(MARKET_TYPES),
+            'risk_types': invert(RISK_KEYWORDS),
+            'time_periods': identity(TIME_PERIODS),
+            'symptoms': identity(SYMPTOMS),
+            'plant_parts': identity(PLANT_PARTS),
+            'loan_types': identity(LOAN_TYPES),
+            'purposes': identity(FINANCIAL_PURPOSES),
+            'boosters': invert(INTENT_BOOSTERS),
+            'fallback': fallback
+        })
     
     def _apply_contextual_boosting(self, query: str, intent: str, confidence: float, 
-                                 context: Dict[str, Any] = None) -> float:
-        """Apply contextual boosting to confidence scores"""
+                                 context: Dict[str, Any] = None,
+                                 hits: Optional[Dict[str, Dict[str, Any]]] = None) -> float:
+        """Apply contextual boosting to confidence scores; hits is the query's keyword scan, if done"""
         boost = 0.0
-        query_lower = query.lower()
+        if hits is None:
+            hits = self.keyword_automaton.scan(query.lower())
         
         # Boost based on specific keywords
-        intent_boosters = {
-            'crop_recommendation': ['recommend', 'suggest', 'best', 'suitable', 'plant', 'grow'],
-            'market_yield': ['price', 'market', 'yield', 'forecast', 'predict', 'profit'],
-            'risk_assessment': ['risk', 'danger', 'threat', 'weather', 'climate', 'drought'],
-            'pest_detection': ['pest', 'bug', 'disease', 'identify', 'what is this'],
-            'finance_agent': ['loan', 'credit', 'subsidy', 'cost', 'budget', 'money']
-        }
-        
-        if intent in intent_boosters:
-            matching_keywords = sum(1 for keyword in intent_boosters[intent] 
-                                  if keyword in query_lower)
-            boost += matching_keywords * 0.05
+        boost += self._keyword_matches(hits, intent) * KEYWORD_BOOST
         
         # Boost based on context
-        if context:
-            if intent == 'pest_detection' and context.get('image_data'):
-                boost += 0.2
-            elif intent == 'risk_assessment' and context.get('location'):
-                boost += 0.1
-            elif intent == 'crop_recommendation' and context.get('soil_data'):
-                boost += 0.15
+        if context and intent in CONTEXT_BOOSTS:
+            key, context_boost = CONTEXT_BOOSTS[intent]
+            if context.get(key):
+                boost += context_boost
         
         return min(confidence + boost, 1.0)
     
-    def _fallback_classification(self, query: str, context: Dict[str, Any] = None) -> Tuple[str, float]:
-        """Fallback classification using enhanced keyword matching"""
-        query_lower = query.lower()
+    @staticmethod
+    def _keyword_matches(hits: Dict[str, Dict[str, Any]], intent: str) -> int:
+        """Number of an intent's booster keywords in the scanned query"""
+        return sum(1 for intents in hits.get('boosters', {}).values() if intent in intents)
+    
+    @staticmethod
+    def _keyword_scores(hits: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+        """Keyword score of every matched intent, normalized by its maximum, in FALLBACK_KEYWORDS order"""
+        # Primary keywords weigh 3, secondary 2 and context 1
         intent_scores = defaultdict(float)
+        for weights in hits.get('fallback', {}).values():
+            for intent, weight in weights:
+                intent_scores[intent] += weight
+        return {intent: intent_scores[intent] / FALLBACK_TOTALS[intent]
+                for intent in FALLBACK_KEYWORDS if intent in intent_scores}
+    
+    @classmethod
+    def _keyword_decision(cls, hits: Dict[str, Dict[str, Any]]) -> Optional[Tuple[str, float]]:
+        """Best keyword intent and its score margin over the runner-up; None without keyword hits"""
+        scores = cls._keyword_scores(hits)
+        if not scores:
+            return None
+        # Ties go to the intent listed first
+        best_intent = max(scores, key=scores.get)
+        ranked = sorted(scores.values(), reverse=True)
+        return best_intent, ranked[0] - (ranked[1] if len(ranked) > 1 else 0.0)
+    
+    def _calibrate_cascade(self, precision: float) -> Tuple[float, float]:
+        """
+        Learn the keyword margin above which the cascade skips the model
         
-        # Enhanced keyword patterns
-        patterns = {
-            'crop_recommendation': {
-                'primary': ['recommend', 'suggest', 'best crop', 'what to plant', 'which crop'],
-                'secondary': ['soil', 'climate', 'suitable', 'grow', 'plant', 'farming'],
-                'context': ['ph', 'nitrogen', 'phosphorus', 'potassium', 'temperature']
-            },
-            'market_yield': {
-                'primary': ['price', 'market', 'yield', 'forecast', 'predict'],
-                'secondary': ['profit', 'revenue', 'cost', 'sell', 'buy', 'trade'],
-                'context': ['ton', 'quintal', 'per acre', 'per hectare', 'rupees']
-            },
-            'risk_assessment': {
-                'primary': ['risk', 'danger', 'threat', 'weather risk', 'climate risk'],
-                'secondary': ['drought', 'flood', 'storm', 'temperature', 'rainfall'],
-                'context': ['probability', 'chance', 'likely', 'forecast', 'warning']
-            },
-            'pest_detection': {
-                'primary': ['pest', 'bug', 'disease', 'identify', 'what is this'],
-                'secondary': ['insect', 'fungal', 'bacterial', 'infection', 'damage'],
-                'context': ['leaf', 'plant', 'crop', 'treatment', 'control']
-            },
-            'finance_agent': {
-                'primary': ['loan', 'credit', 'subsidy', 'scheme', 'financial'],
-                'secondary': ['cost', 'budget', 'money', 'investment', 'insurance'],
-                'context': ['bank', 'government', 'interest', 'EMI', 'premium']
-            }
-        }
+        Every intent example is classified by keywords alone and the
+        decisions are sorted by margin. The threshold is the lowest margin
+        at which the decisions at or above it still name the example's
+        intent at least `precision` of the time. Tied scores (margin 0)
+        never qualify.
         
-        # Score each intent
-        for intent, keywords in patterns.items():
-            score = 0
-            
-            # Primary keywords (high weight)
-            for keyword in keywords['primary']:
-                if keyword in query_lower:
-                    score += 3
-            
-            # Secondary keywords (medium weight)
-            for keyword in keywords['secondary']:
-                if keyword in query_lower:
-                    score += 2
-            
-            # Context keywords (low weight)
-            for keyword in keywords['context']:
-                if keyword in query_lower:
-                    score += 1
-            
-            if score > 0:
-                intent_scores[intent] = score / (len(keywords['primary']) * 3 + 
-                                               len(keywords['secondary']) * 2 + 
-                                               len(keywords['context']))
+        Returns:
+            (threshold, precision measured above it); the threshold is
+            infinite, so the cascade never fires, when no margin qualifies
+        """
+        decisions = []
+        for intent, examples in self.intent_examples.items():
+            for example in examples:
+                decision = self._keyword_decision(self.keyword_automaton.scan(example.lower()))
+                if decision and decision[1] > 0:
+                    decisions.append((decision[1], decision[0] == intent))
+        decisions.sort(reverse=True)
+        
+        threshold, measured = float('inf'), 0.0
+        correct = 0
+        for seen, (margin, right) in enumerate(decisions, 1):
+            correct += right
+            # Only cut between different margins
+            if seen < len(decisions) and decisions[seen][0] == margin:
+                continue
+            if correct / seen >= precision:
+                threshold, measured = margin, correct / seen
+        return threshold, measured
+    
+    def _cascade_intent(self, query: str, context: Dict[str, Any] = None,
+                        hits: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[Tuple[str, float]]:
+        """
+        Intent the keyword scorer decides alone, or None when the model has to run
         
-        if not intent_scores:
+        The confidence is the keyword precision measured at calibration,
+        with the usual contextual boosts.
+        """
+        if not self.cascade:
+            return None
+        if hits is None:
+            hits = self.keyword_automaton.scan(query.lower())
+        decision = self._keyword_decision(hits)
+        if not decision or decision[1] < self.cascade_threshold:
+            return None
+        intent = decision[0]
+        return intent, float(self._apply_contextual_boosting(query, intent, self.cascade_precision, context, hits))
+    
+    def _fallback_classification(self, query: str, context: Dict[str, Any] = None,
+                                 hits: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[str, float]:
+        """Fallback classification using enhanced keyword matching; hits is the query's keyword scan, if done"""
+        if hits is None:
+            hits = self.keyword_automaton.scan(query.lower())
+        normalized = self._keyword_scores(hits)
+        if not normalized:
             return 'general', 0.4
         
-        best_intent = max(intent_scores, key=intent_scores.get)
-        confidence = min(intent_scores[best_intent], 0.8)  # Cap fallback confidence
+        # Normalized by each intent's maximum; ties go to the intent listed first
+        best_intent = max(normalized, key=normalized.get)
+        confidence = min(normalized[best_intent], 0.8)  # Cap fallback confidence
         
         return best_intent, confidence
     
@@ -484,476 +979,143 @@ class AdvancedIntentClassifier:
         if context:
             params.update(context)
         
+        # One lowercased copy serves every extractor: numeric facts come from a single
+        # scan for number spans, dictionary keywords from a single automaton scan
+        query_lower = query.lower()
+        facts = self.extraction_engine.extract(query, query_lower)
+        hits = self.keyword_automaton.scan(query_lower)
+        
         # Intent-specific parameter extraction
         if intent == 'crop_recommendation':
-            params.update(self._extract_crop_recommendation_params(query))
+            params.update(self._extract_crop_recommendation_params(facts, hits))
         elif intent == 'market_yield':
-            params.update(self._extract_market_yield_params(query))
+            params.update(self._extract_market_yield_params(facts, hits))
         elif intent == 'risk_assessment':
-            params.update(self._extract_risk_assessment_params(query))
+            params.update(self._extract_risk_assessment_params(hits))
         elif intent == 'pest_detection':
-            params.update(self._extract_pest_detection_params(query))
+            params.update(self._extract_pest_detection_params(hits))
         elif intent == 'finance_agent':
-            params.update(self._extract_finance_params(query))
+            params.update(self._extract_finance_params(facts, hits))
         
         # Common parameter extraction
-        params.update(self._extract_common_params(query))
+        params.update(self._extract_common_params(facts, context))
         
         return params
     
-    def _extract_crop_recommendation_params(self, query: str) -> Dict[str, Any]:
+    @staticmethod
+    def _pick_facts(facts: Dict[str, Any], keys: Tuple[str, ...]) -> Dict[str, Any]:
+        return {key: facts[key] for key in keys if key in facts}
+    
+    @staticmethod
+    def _first_hit(hits: Dict[str, Dict[str, Any]], dictionary: str) -> Optional[str]:
+        """Keyword of a dictionary that occurs first in the query"""
+        return next(iter(hits.get(dictionary, ())), None)
+    
+    def _extract_crop_recommendation_params(self, facts: Dict[str, Any],
+                                            hits: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Extract parameters specific to crop recommendation"""
-        params = {}
-        query_lower = query.lower()
-        
-        # Soil parameters
-        soil_params = self._extract_soil_parameters(query_lower)
-        params.update(soil_params)
+        # Soil, climate and area values
+        params = self._pick_facts(facts, SOIL_FACTS + CLIMATE_FACTS + AREA_FACTS)
         
-        # Climate parameters
-        climate_params = self._extract_climate_parameters(query_lower)
-        params.update(climate_params)
-        
-        # Area information
-        area_info = self._extract_area_information(query_lower)
-        params.update(area_info)
+        # Soil type
+        soil_type = self._first_hit(hits, 'soil_types')
+        if soil_type:
+            params['soil_type'] = soil_type
         
         # Farming type
-        farming_type = self._extract_farming_type(query_lower)
+        farming_type = self._first_hit(hits, 'farming_types')
         if farming_type:
             params['farming_type'] = farming_type
         
         return params
     
-    def _extract_market_yield_params(self, query: str) -> Dict[str, Any]:
+    def _extract_market_yield_params(self, facts: Dict[str, Any],
+                                     hits: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Extract parameters for market and yield predictions"""
-        params = {}
-        query_lower = query.lower()
+        # Time frame and quantity
+        params = self._pick_facts(facts, ('timeframe',) + QUANTITY_FACTS)
         
         # Crop identification
-        crop = self._extract_crop_name(query_lower)
+        crop = self._first_hit(hits, 'crops')
         if crop:
             params['crop'] = crop
         
-        # Time frame
-        timeframe = self._extract_timeframe(query_lower)
-        if timeframe:
-            params['timeframe'] = timeframe
-        
-        # Quantity/Area
-        quantity = self._extract_quantity(query_lower)
-        if quantity:
-            params.update(quantity)
-        
         # Market type
-        market_type = self._extract_market_type(query_lower)
+        market_type = self._first_hit(hits, 'market_types')
         if market_type:
             params['market_type'] = market_type
         
         return params
     
-    def _extract_risk_assessment_params(self, query: str) -> Dict[str, Any]:
-        """Extract parameters for risk assessment"""
+    def _extract_risk_assessment_params(self, hits: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract parameters for risk assessment; location is read with the common parameters"""
         params = {}
-        query_lower = query.lower()
-        
-        # Risk types
-        risk_types = self._extract_risk_types(query_lower)
-        if risk_types:
-            params['risk_types'] = risk_types
         
-        # Location
-        location = self._extract_location(query_lower)
-        if location:
-            params['location'] = location
+        # Risk types, in RISK_KEYWORDS order
+        found = {risk_type for risk_types in hits.get('risk_types', {}).values() for risk_type in risk_types}
+        if found:
+            params['risk_types'] = [risk_type for risk_type in RISK_KEYWORDS if risk_type in found]
         
         # Time period
-        time_period = self._extract_time_period(query_lower)
+        time_period = self._first_hit(hits, 'time_periods')
         if time_period:
             params['time_period'] = time_period
         
         return params
     
-    def _extract_pest_detection_params(self, query: str) -> Dict[str, Any]:
+    def _extract_pest_detection_params(self, hits: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Extract parameters for pest detection"""
         params = {}
-        query_lower = query.lower()
         
         # Crop type
-        crop = self._extract_crop_name(query_lower)
+        crop = self._first_hit(hits, 'crops')
         if crop:
             params['crop_type'] = crop
         
         # Symptoms
-        symptoms = self._extract_symptoms(query_lower)
-        if symptoms:
-            params['symptoms'] = symptoms
+        if hits.get('symptoms'):
+            params['symptoms'] = list(hits['symptoms'])
         
         # Affected parts
-        affected_parts = self._extract_affected_parts(query_lower)
-        if affected_parts:
-            params['affected_parts'] = affected_parts
+        if hits.get('plant_parts'):
+            params['affected_parts'] = list(hits['plant_parts'])
         
         return params
     
-    def _extract_finance_params(self, query: str) -> Dict[str, Any]:
+    def _extract_finance_params(self, facts: Dict[str, Any],
+                                hits: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Extract parameters for financial queries"""
         params = {}
-        query_lower = query.lower()
         
         # Loan amount
-        amount = self._extract_monetary_amount(query_lower)
-        if amount:
-            params['amount'] = amount
+        if facts.get('amount'):
+            params['amount'] = facts['amount']
         
         # Loan type
-        loan_type = self._extract_loan_type(query_lower)
+        loan_type = self._first_hit(hits, 'loan_types')
         if loan_type:
             params['loan_type'] = loan_type
         
         # Purpose
-        purpose = self._extract_financial_purpose(query_lower)
+        purpose = self._first_hit(hits, 'purposes')
         if purpose:
             params['purpose'] = purpose
         
         return params
     
-    def _extract_common_params(self, query: str) -> Dict[str, Any]:
+    def _extract_common_params(self, facts: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Extract common parameters from any query"""
         params = {}
-        query_lower = query.lower()
         
-        # Location
-        location = self._extract_location(query_lower)
-        if location:
-            params['location'] = location
+        # Location; one passed in context outranks a place name read from the text
+        if facts.get('location') and not (context and context.get('location')):
+            params['location'] = facts['location']
         
         # Numbers
-        numbers = self.parameter_extractors['numbers'].findall(query)
-        if numbers:
-            params['numbers'] = [float(n) for n in numbers]
-        
-        return params
-    
-    # Helper methods for parameter extraction
-    def _extract_soil_parameters(self, query: str) -> Dict[str, Any]:
-        """Extract soil-related parameters"""
-        params = {}
-        
-        # pH extraction
-        ph_patterns = [
-            r'ph\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
-            r'acidity\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
-            r'alkalinity\s*(?:is|of|=|:)?\s*(\d+\.?\d*)'
-        ]
-        
-        for pattern in ph_patterns:
-            match = re.search(pattern, query)
-            if match:
-                params['ph'] = float(match.group(1))
-                break
-        
-        # NPK extraction
-        for nutrient, keywords in self.parameter_extractors['soil_nutrients'].items():
-            for keyword in keywords:
-                pattern = f'{keyword}\\s*(?:is|of|=|:)?\\s*(\\d+\\.?\\d*)'
-                match = re.search(pattern, query)
-                if match:
-                    params[nutrient[0].upper()] = float(match.group(1))
-                    break
-        
-        # Soil type
-        soil_types = ['clay', 'sandy', 'loam', 'silt', 'peat', 'chalk', 'saline']
-        for soil_type in soil_types:
-            if soil_type in query:
-                params['soil_type'] = soil_type
-                break
-        
-        return params
-    
-    def _extract_climate_parameters(self, query: str) -> Dict[str, Any]:
-        """Extract climate-related parameters"""
-        params = {}
-        
-        # Temperature
-        temp_patterns = [
-            r'temperature\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
-            r'(\d+\.?\d*)\s*(?:degrees?|°)\s*(?:celsius|c)',
-            r'(\d+\.?\d*)\s*(?:degrees?|°)\s*(?:fahrenheit|f)'
-        ]
-        
-        for pattern in temp_patterns:
-            match = re.search(pattern, query)
-            if match:
-                temp = float(match.group(1))
-                # Convert Fahrenheit to Celsius if needed
-                if 'fahrenheit' in pattern or '°f' in pattern:
-                    temp = (temp - 32) * 5/9
-                params['temperature'] = temp
-                break
-        
-        # Humidity
-        humidity_match = re.search(r'humidity\s*(?:is|of|=|:)?\s*(\d+\.?\d*)', query)
-        if humidity_match:
-            params['humidity'] = float(humidity_match.group(1))
-        
-        # Rainfall
-        rainfall_patterns = [
-            r'rainfall\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
-            r'precipitation\s*(?:is|of|=|:)?\s*(\d+\.?\d*)',
-            r'(\d+\.?\d*)\s*(?:mm|millimeter|inch|in)\s*(?:rain|rainfall)'
-        ]
-        
-        for pattern in rainfall_patterns:
-            match = re.search(pattern, query)
-            if match:
-                params['rainfall'] = float(match.group(1))
-                break
+        if facts.get('numbers'):
+            params['numbers'] = facts['numbers']
         
         return params
-    
-    def _extract_crop_name(self, query: str) -> Optional[str]:
-        """Extract crop name from query"""
-        for crop in self.parameter_extractors['crops']:
-            if crop in query:
-                return crop
-        return None
-    
-    def _extract_location(self, query: str) -> Optional[str]:
-        """Extract location from query"""
-        match = self.parameter_extractors['locations'].search(query)
-        if match:
-            return match.group(1).strip()
-        
-        # Fallback patterns
-        location_patterns = [
-            r'(?:in|at|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:area|region|district|state)'
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, query)
-            if match:
-                return match.group(1).strip()
-        
-        return None
-    
-    def _extract_timeframe(self, query: str) -> Optional[Dict[str, Any]]:
-        """Extract timeframe information"""
-        timeframe_patterns = {
-            r'(\d+)\s*days?': {'value': lambda x: int(x), 'unit': 'days'},
-            r'(\d+)\s*weeks?': {'value': lambda x: int(x), 'unit': 'weeks'},
-            r'(\d+)\s*months?': {'value': lambda x: int(x), 'unit': 'months'},
-            r'next\s*week': {'value': lambda x: 1, 'unit': 'weeks'},
-            r'next\s*month': {'value': lambda x: 1, 'unit': 'months'},
-            r'this\s*season': {'value': lambda x: 1, 'unit': 'seasons'},
-            r'next\s*season': {'value': lambda x: 1, 'unit': 'seasons'}
-        }
-        
-        for pattern, config in timeframe_patterns.items():
-            match = re.search(pattern, query)
-            if match:
-                if match.groups():
-                    value = config['value'](match.group(1))
-                else:
-                    value = config['value'](None)
-                return {'value': value, 'unit': config['unit']}
-        
-        return None
-    
-    def _extract_area_information(self, query: str) -> Dict[str, Any]:
-        """Extract area/land information"""
-        params = {}
-        
-        area_patterns = [
-            r'(\d+\.?\d*)\s*(?:acres?|acre)',
-            r'(\d+\.?\d*)\s*(?:hectares?|hectare|ha)',
-            r'(\d+\.?\d*)\s*(?:sq\s*ft|square\s*feet)',
-            r'(\d+\.?\d*)\s*(?:sq\s*m|square\s*meter)'
-        ]
-        
-        for pattern in area_patterns:
-            match = re.search(pattern, query)
-            if match:
-                area_value = float(match.group(1))
-                if 'acre' in pattern:
-                    params['area_acres'] = area_value
-                elif 'hectare' in pattern or 'ha' in pattern:
-                    params['area_hectares'] = area_value
-                elif 'sq ft' in pattern or 'square feet' in pattern:
-                    params['area_sqft'] = area_value
-                elif 'sq m' in pattern or 'square meter' in pattern:
-                    params['area_sqm'] = area_value
-                break
-        
-        return params
-    
-    def _extract_farming_type(self, query: str) -> Optional[str]:
-        """Extract farming type"""
-        farming_types = [
-            'organic', 'conventional', 'hydroponic', 'greenhouse', 
-            'polyhouse', 'drip irrigation', 'sprinkler', 'traditional'
-        ]
-        
-        for farming_type in farming_types:
-            if farming_type in query:
-                return farming_type
-        
-        return None
-    
-    def _extract_quantity(self, query: str) -> Dict[str, Any]:
-        """Extract quantity information"""
-        params = {}
-        
-        quantity_patterns = [
-            r'(\d+\.?\d*)\s*(?:tons?|tonne)',
-            r'(\d+\.?\d*)\s*(?:quintals?|qtl)',
-            r'(\d+\.?\d*)\s*(?:kg|kilograms?)',
-            r'(\d+\.?\d*)\s*(?:bags?)',
-            r'(\d+\.?\d*)\s*(?:sacks?)'
-        ]
-        
-        for pattern in quantity_patterns:
-            match = re.search(pattern, query)
-            if match:
-                quantity_value = float(match.group(1))
-                if 'ton' in pattern:
-                    params['quantity_tons'] = quantity_value
-                elif 'quintal' in pattern or 'qtl' in pattern:
-                    params['quantity_quintals'] = quantity_value
-                elif 'kg' in pattern:
-                    params['quantity_kg'] = quantity_value
-                elif 'bag' in pattern:
-                    params['quantity_bags'] = quantity_value
-                elif 'sack' in pattern:
-                    params['quantity_sacks'] = quantity_value
-                break
-        
-        return params
-    
-    def _extract_market_type(self, query: str) -> Optional[str]:
-        """Extract market type"""
-        market_types = ['wholesale', 'retail', 'mandi', 'local', 'export', 'domestic']
-        
-        for market_type in market_types:
-            if market_type in query:
-                return market_type
-        
-        return None
-    
-    def _extract_risk_types(self, query: str) -> List[str]:
-        """Extract risk types"""
-        risk_types = []
-        
-        risk_keywords = {
-            'drought': ['drought', 'dry', 'water shortage', 'no rain'],
-            'flood': ['flood', 'flooding', 'too much rain', 'waterlogging'],
-            'pest': ['pest', 'insect', 'bug', 'infestation'],
-            'disease': ['disease', 'fungal', 'bacterial', 'viral', 'infection'],
-            'weather': ['weather', 'climate', 'temperature', 'storm', 'cyclone'],
-            'market': ['market', 'price', 'demand', 'supply'],
-            'financial': ['financial', 'economic', 'cost', 'profit', 'loss']
-        }
-        
-        for risk_type, keywords in risk_keywords.items():
-            if any(keyword in query for keyword in keywords):
-                risk_types.append(risk_type)
-        
-        return risk_types
-    
-    def _extract_time_period(self, query: str) -> Optional[str]:
-        """Extract time period for risk assessment"""
-        time_periods = [
-            'today', 'tomorrow', 'this week', 'next week', 
-            'this month', 'next month', 'this season', 'next season',
-            'short term', 'long term', 'immediate'
-        ]
-        
-        for period in time_periods:
-            if period in query:
-                return period
-        
-        return None
-    
-    def _extract_symptoms(self, query: str) -> List[str]:
-        """Extract pest/disease symptoms"""
-        symptoms = []
-        
-        symptom_keywords = [
-            'yellowing', 'browning', 'wilting', 'spots', 'holes',
-            'curling', 'stunted', 'discoloration', 'rotting', 'drying'
-        ]
-        
-        for symptom in symptom_keywords:
-            if symptom in query:
-                symptoms.append(symptom)
-        
-        return symptoms
-    
-    def _extract_affected_parts(self, query: str) -> List[str]:
-        """Extract affected plant parts"""
-        parts = []
-        
-        plant_parts = [
-            'leaves', 'stem', 'roots', 'flowers', 'fruits',
-            'branches', 'trunk', 'seeds', 'pods'
-        ]
-        
-        for part in plant_parts:
-            if part in query:
-                parts.append(part)
-        
-        return parts
-    
-    def _extract_monetary_amount(self, query: str) -> Optional[float]:
-        """Extract monetary amounts"""
-        amount_patterns = [
-            r'(?:rs|rupees?)\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-            r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:rs|rupees?)',
-            r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:lakhs?|lakh)',
-            r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:crores?|crore)'
-        ]
-        
-        for pattern in amount_patterns:
-            match = re.search(pattern, query)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                amount = float(amount_str)
-                
-                if 'lakh' in pattern:
-                    amount *= 100000
-                elif 'crore' in pattern:
-                    amount *= 10000000
-                
-                return amount
-        
-        return None
-    
-    def _extract_loan_type(self, query: str) -> Optional[str]:
-        """Extract loan type"""
-        loan_types = [
-            'crop loan', 'kisan credit card', 'kcc', 'term loan',
-            'equipment loan', 'land purchase loan', 'working capital'
-        ]
-        
-        for loan_type in loan_types:
-            if loan_type in query:
-                return loan_type
-        
-        return None
-    
-    def _extract_financial_purpose(self, query: str) -> Optional[str]:
-        """Extract financial purpose"""
-        purposes = [
-            'seeds', 'fertilizer', 'pesticide', 'equipment', 'machinery',
-            'irrigation', 'land', 'storage', 'processing', 'marketing'
-        ]
-        
-        for purpose in purposes:
-            if purpose in query:
-                return purpose
-        
-        return None
 
     # Legacy methods for backward compatibility
     def predict_intent(self, text: str) -> str:
@@ -0,0 +1,120 @@
+"""
+Aho-Corasick matching of every keyword dictionary in one scan.
+
+The classifier looks queries up in many word lists (crops, symptoms, plant
+parts, loan types, risk keywords, intent keywords). Testing each entry with
+a substring ``in`` costs vocabulary size times query length and matches
+inside words ("pea" in "peace"). The automaton here runs over words rather
+than characters: the query is split on whitespace once, each word is one
+dictionary lookup, and every hit from every dictionary comes out of that
+single walk however many keywords are loaded.
+"""
+import string
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Stripped from the ends of whitespace-separated words; a multi-word keyword
+# never matches across it ("crop, loan" is not "crop loan")
+PUNCTUATION = string.punctuation + '“”‘’…।'
+
+# Endings the last word of a keyword may carry and still match ("tomatoes",
+# "plants", "prediction")
+INFLECTIONS = ('s', 'es', 'ed', 'ing', 'er', 'ers', 'ion', 'ions', 'ation', 'ations')
+
+
+def inflected(keyword: str) -> List[str]:
+    """The keyword and its variants with an inflected last word"""
+    return [keyword] + [keyword + ending for ending in INFLECTIONS]
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is words.
+
+    Keywords only ever match whole words, so "pea" matches "peas" but not
+    "peace" or "chickpea", and a multi-word keyword only matches words that
+    are separated by whitespace.
+    """
+
+    def __init__(self, dictionaries: Dict[str, Dict[str, Any]]):
+        """dictionaries maps a dictionary name to {keyword: value}"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[tuple, ...]] = [()]
+        for name, entries in dictionaries.items():
+            for keyword, value in entries.items():
+                keyword = keyword.lower()
+                for variant in inflected(keyword):
+                    self._add(variant.split(), (name, keyword, value))
+        self._link()
+
+    def _add(self, words: List[str], hit: tuple):
+        state = 0
+        for word in words:
+            next_state = self._goto[state].get(word)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][word] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if hit not in self._output[state]:
+            self._output[state] += (hit,)
+
+    def _link(self):
+        """Breadth-first failure links; each state also reports its failure chain's keywords"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(word, 0)
+                self._output[next_state] += tuple(
+                    hit for hit in self._output[self._fail[next_state]] if hit not in self._output[next_state]
+                )
+
+    @property
+    def size(self) -> int:
+        """Number of automaton states"""
+        return len(self._goto)
+
+    def scan(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Every hit in lowercased text, in one pass.
+
+        Returns {dictionary name: {keyword: value}}; each dictionary's
+        keywords are in the order they end in the text, and a keyword found
+        more than once is reported once.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: Dict[str, Dict[str, Any]] = {}
+        state = 0
+        for token in text.split():
+            word = token.strip(PUNCTUATION)
+            if not word or word[0] != token[0]:
+                state = 0
+                if not word:
+                    continue
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for name, keyword, value in output[state]:
+                found = hits.setdefault(name, {})
+                if keyword not in found:
+                    found[keyword] = value
+            if word[-1] != token[-1]:
+                state = 0
+        return hits
+
+
+def invert(groups: Dict[str, Iterable[str]]) -> Dict[str, Tuple[str, ...]]:
+    """{group: keywords} -> {keyword: groups containing it}, for keywords shared between groups"""
+    inverted: Dict[str, Tuple[str, ...]] = {}
+    for group, keywords in groups.items():
+        for keyword in keywords:
+            inverted[keyword.lower()] = inverted.get(keyword.lower(), ()) + (group,)
+    return inverted
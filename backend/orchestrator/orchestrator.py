@@ -1,6 +1,8 @@
 import os, json
 import logging
-from langdetect import detect, LangDetectException
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -18,17 +20,91 @@ from .intent_classifier import intent_classifier
 
 # Handle relative imports
 try:
-    from ..agents.base_agent import load_agent_classes
+    from ..agents.registry import AgentRegistry, AGENT_ARTIFACTS, MODEL_ATTRIBUTES
     from ..utils.translation import translation_service
+    from ..utils.language_detection import detect_language
+    from ..utils.metrics import metrics, StageTimings
+    from ..utils.singleflight import SingleFlight, fingerprint
+    from ..utils.admission import AdmissionController, AgentOverloaded
+    from ..utils.model_watcher import ModelWatcher
+    from ..utils.model_registry import model_registry
+    from ..utils.model_artifacts import load_model
+    from ..utils.shadow import ShadowEvaluator, ShadowedModel
+    from ..utils.response_cache import ResponseCache
+    from ..utils.kv_store import KVStore
+    from ..config import (AGENT_TIMEOUT, AGENT_WORKERS, AGENT_MAX_QUEUE,
+                          AGENT_CONCURRENCY_LIMITS, COALESCE_REQUESTS, WARMUP_ON_START,
+                          AGENT_LOADING, AGENT_LOAD_WORKERS, MODEL_WATCH_INTERVAL,
+                          SHADOW_SAMPLE_RATE, MULTI_INTENT, MULTI_INTENT_THRESHOLD,
+                          MULTI_INTENT_MAX, MULTI_INTENT_WORKERS, SPECULATIVE_EXECUTION,
+                          SPECULATIVE_MARGIN, ENABLE_CACHE, CACHE_TTL, RESPONSE_CACHE_TTLS,
+                          RESPONSE_CACHE_MAX_BYTES)
 except ImportError:
     # Fallback for direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-    from agents.base_agent import load_agent_classes
+    from agents.registry import AgentRegistry, AGENT_ARTIFACTS, MODEL_ATTRIBUTES
     from utils.translation import translation_service
+    from utils.language_detection import detect_language
+    from utils.metrics import metrics, StageTimings
+    from utils.singleflight import SingleFlight, fingerprint
+    from utils.admission import AdmissionController, AgentOverloaded
+    from utils.model_watcher import ModelWatcher
+    from utils.model_registry import model_registry
+    from utils.model_artifacts import load_model
+    from utils.shadow import ShadowEvaluator, ShadowedModel
+    from utils.response_cache import ResponseCache
+    from utils.kv_store import KVStore
+    from config import (AGENT_TIMEOUT, AGENT_WORKERS, AGENT_MAX_QUEUE,
+                        AGENT_CONCURRENCY_LIMITS, COALESCE_REQUESTS, WARMUP_ON_START,
+                        AGENT_LOADING, AGENT_LOAD_WORKERS, MODEL_WATCH_INTERVAL,
+                        SHADOW_SAMPLE_RATE, MULTI_INTENT, MULTI_INTENT_THRESHOLD,
+                        MULTI_INTENT_MAX, MULTI_INTENT_WORKERS, SPECULATIVE_EXECUTION,
+                        SPECULATIVE_MARGIN, ENABLE_CACHE, CACHE_TTL, RESPONSE_CACHE_TTLS,
+                        RESPONSE_CACHE_MAX_BYTES)
+
+class ModelReloadError(Exception):
+    """Raised when a reloaded model fails validation; the live model stays in place"""
+
 
 class Orchestrator:
+    # Map intents to agent names
+    INTENT_TO_AGENT = {
+        'crop_recommendation': 'crop',
+        'market_yield': 'market_yield',
+        'risk_assessment': 'risk',
+        'pest_detection': 'pest',
+        'finance_agent': 'finance'
+    }
+    AGENT_TO_INTENT = {agent: intent for intent, agent in INTENT_TO_AGENT.items()}
+    
+    # Synthetic inputs that exercise each agent's full model path during warm-up
+    WARMUP_PAYLOADS = {
+        'crop': {'context': {'N': 90, 'P': 42, 'K': 43, 'temperature': 25, 'humidity': 80, 'ph': 6.5, 'rainfall': 200}},
+        'market_yield': {'context': {'crop': 'wheat', 'timeframe': 30, 'location': 'Punjab'}},
+        'risk': {'context': {'location': 'Punjab', 'crop': 'wheat', 'temperature': 30, 'rainfall': 50}},
+        'pest': {'context': {'image_data': bytes(1024), 'crop_type': 'wheat', 'symptoms': ['yellow leaves']}},
+        'finance': {'context': {'annual_income': 150000, 'land_size': 2.0, 'credit_score': 650}}
+    }
+    WARMUP_QUERY = "Which crop should I grow in Punjab this season?"
+    
+    # Name the model watcher reports when model_metadata.json changes
+    REGISTRY_WATCH_NAME = "model_registry"
+    
+    # Parameters each intent's agent can use; a slot is filled by any of its keys.
+    # Speculative execution answers with the intent whose slots the query fills best.
+    INTENT_SLOTS = {
+        'crop_recommendation': (('N', 'nitrogen'), ('P', 'phosphorus'), ('K', 'potassium'), ('temperature',),
+                                ('humidity',), ('ph',), ('rainfall', 'rain'), ('soil_type',)),
+        'market_yield': (('crop',), ('timeframe',), ('market_type',),
+                         ('quantity_tons', 'quantity_quintals', 'quantity_kg', 'quantity_bags', 'quantity_sacks',
+                          'area_acres', 'area_hectares')),
+        'risk_assessment': (('risk_types',), ('location',), ('time_period',), ('crop',)),
+        'pest_detection': (('crop_type',), ('symptoms',), ('affected_parts',), ('image_data', 'image_path')),
+        'finance_agent': (('amount',), ('loan_type',), ('purpose',))
+    }
+
     def __init__(self, models_dir=None):
         # Handle both new and legacy initialization
         base = os.path.dirname(os.path.dirname(__file__))
@@ -39,6 +115,52 @@ class Orchestrator:
         # Load agents
         self.agents = self._load_agents(self.models_dir)
         
+        # Bounded worker pool per agent; inference past the deadline falls back to heuristics
+        self.agent_timeout = AGENT_TIMEOUT
+        self._executors = {}
+        self._executors_lock = threading.Lock()
+        
+        # Admission control: per-agent concurrency limit and bounded wait queue
+        self.admission = AdmissionController(AGENT_WORKERS, AGENT_MAX_QUEUE, AGENT_CONCURRENCY_LIMITS)
+        
+        # Compound questions fan out to several agents on a shared pool
+        self.multi_intent = MULTI_INTENT
+        self.multi_intent_threshold = MULTI_INTENT_THRESHOLD
+        self.multi_intent_max = MULTI_INTENT_MAX
+        self._fanout_executor = None
+        
+        # Low-margin classifications run the runner-up intent's agent alongside
+        self.speculative_execution = SPECULATIVE_EXECUTION
+        self.speculative_margin = SPECULATIVE_MARGIN
+        
+        # Finished query responses, keyed by canonical text and context
+        self.response_cache = ResponseCache(
+            RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTLS, CACHE_TTL, enabled=ENABLE_CACHE
+        )
+        
+        # Identical concurrent requests wait on one in-flight computation
+        self.coalesce_requests = COALESCE_REQUESTS
+        self._inflight = SingleFlight()
+        
+        # Hot model reload: one reload at a time, optional file watcher
+        self._reload_lock = threading.Lock()
+        self._model_watcher = None
+        
+        # Candidate model versions from the registry are shadow-evaluated on sampled traffic
+        self.shadow = ShadowEvaluator(SHADOW_SAMPLE_RATE)
+        self.agents.add_listener(self._on_model_reload)
+        for agent_name in self.agents.loaded():
+            self._attach_candidates(agent_name)
+        self._registry_pointers = self._read_registry_pointers()
+        
+        # Readiness: set once warm_up has run (or immediately when warm-up is disabled)
+        self._ready = threading.Event()
+        self._warmup_lock = threading.Lock()
+        self._warmup_started = False
+        self.warmup_report = {}
+        if not WARMUP_ON_START:
+            self._ready.set()
+        
         # Lazy load intent classifier (support both advanced and simple)
         try:
             self.intent_clf = intent_classifier  # Use the advanced classifier
@@ -47,32 +169,25 @@ class Orchestrator:
             from .intent_classifier import IntentClassifier
             self.intent_clf = IntentClassifier()
         
-        # Path for simple cache (daily sync)
-        self.cache_file = os.path.join(self.models_dir, "daily_cache.json")
-        if not os.path.exists(self.cache_file):
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, "w") as f:
-                json.dump({}, f)
+        # Simple cache (daily sync), in SQLite so workers can share it; imports the old daily_cache.json
+        self.cache_file = os.path.join(self.models_dir, "daily_cache.sqlite3")
+        self.cache_store = KVStore(self.cache_file, legacy_json=os.path.join(self.models_dir, "daily_cache.json"))
 
-    def _load_agents(self, models_dir: str) -> Dict[str, Any]:
-        """Load and initialize all agents"""
-        try:
-            agents = load_agent_classes(models_dir)
-            logger.info(f"Loaded {len(agents)} agents: {list(agents.keys())}")
-            return agents
-        except Exception as e:
-            logger.error(f"Error loading agents: {e}")
-            return {}
+    def _load_agents(self, models_dir: str) -> AgentRegistry:
+        """Build the agent registry, loading every agent up front unless loading is lazy"""
+        agents = AgentRegistry(models_dir)
+        if AGENT_LOADING == "lazy":
+            logger.info(f"Registered {len(agents)} agents for lazy loading: {list(agents)}")
+        else:
+            loaded = agents.load_all(max_workers=AGENT_LOAD_WORKERS)
+            logger.info(f"Loaded {len(loaded)} agents: {list(loaded)}")
+        return agents
 
     def detect_language(self, text: str) -> str:
         """Detect language of input text"""
-        try:
-            lang = detect(text)
-            logger.debug(f"Detected language: {lang}")
-            return lang
-        except LangDetectException:
-            logger.warning("Language detection failed, defaulting to English")
-            return "en"
+        lang = detect_language(text)
+        logger.debug(f"Detected language: {lang}")
+        return lang
 
     def to_en(self, text: str, src: Optional[str] = None) -> str:
         """Translate text to English"""
@@ -206,24 +321,75 @@ class Orchestrator:
             "answer": answer_local
         }
 
-    def handle_query(self, text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def handle_query(self, text: str, context: Dict[str, Any] = None,
+                     timings: Optional[StageTimings] = None) -> Dict[str, Any]:
         """
         Handle user query with advanced intent classification and parameter extraction
         
         Args:
             text: User query text
             context: Additional context (image data, location, etc.)
+            timings: Optional per-request stage timings, filled in as stages run
             
         Returns:
             Comprehensive response with results and metadata
         """
+        if timings is None:
+            timings = StageTimings()
+        key = self.response_cache.key(text, context)
+        
+        start = time.perf_counter()
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            timings.record("response_cache", time.perf_counter() - start)
+            metrics.response_cache.inc(outcome="hit")
+            metrics.record_stages(timings, cached.get('intent'), cached.get('agent_used'), cached.get('language'))
+            return cached
+        metrics.response_cache.inc(outcome="miss")
+        
+        # Responses computed before a model reload invalidates the cache are not stored
+        generation = self.response_cache.generation
+        
+        def compute():
+            response = self._run_query(text, context, timings)
+            self.response_cache.put(key, response, generation)
+            return response
+        
+        return self._coalesce('query', key, compute, timings)
+
+    def _run_query(self, text: str, context: Optional[Dict[str, Any]],
+                   timings: StageTimings) -> Dict[str, Any]:
+        """Run the full pipeline and return only the final response"""
+        response = None
+        for event in self.handle_query_stream(text, context, timings):
+            response = event
+        response = dict(response)
+        response.pop('event', None)
+        return response
+
+    def handle_query_stream(self, text: str, context: Dict[str, Any] = None,
+                            timings: Optional[StageTimings] = None):
+        """
+        Run the query pipeline, yielding events as each part completes.
+        
+        Events, in order:
+            {"event": "intent", "language", "intent", "confidence"}
+            {"event": "result", "agent_used", "parameters", "result"}
+            {"event": "answer", ...}  - the full handle_query response
+        A failure at any point yields a final {"event": "error", ...} instead.
+        """
         if context is None:
             context = {}
+        if timings is None:
+            timings = StageTimings()
+        lang, intent, agent_used = None, None, None
             
         try:
             # 1) Detect language and translate to English
-            lang = self.detect_language(text)
-            text_en = self.to_en(text, src=lang)
+            with timings.stage("detect_language"):
+                lang = self.detect_language(text)
+            with timings.stage("to_en"):
+                text_en = self.to_en(text, src=lang)
             
             logger.info(f"Language detected: {lang}")
             if lang != 'en':
@@ -231,11 +397,42 @@ class Orchestrator:
                 logger.info(f"Translated query: {text_en}")
             
             # 2) Advanced intent classification with confidence
-            intent, confidence = self.intent_clf.classify_intent(text_en, context)
+            with timings.stage("classify_intent"):
+                if self.multi_intent:
+                    intents = self.intent_clf.classify_multi_intent(
+                        text_en, context, self.multi_intent_threshold, self.multi_intent_max
+                    )
+                    intent, confidence = intents[0]
+                elif self.speculative_execution:
+                    intents = self.intent_clf.rank_intents(text_en, context, top_k=2)
+                    intent, confidence = intents[0]
+                    if len(intents) > 1 and confidence - intents[1][1] >= self.speculative_margin:
+                        intents = intents[:1]
+                else:
+                    intent, confidence = self.intent_clf.classify_intent(text_en, context)
+                    intents = [(intent, confidence)]
             logger.info(f"Classified intent: {intent} (confidence: {confidence:.2f})")
             
+            if len(intents) > 1:
+                speculative = not self.multi_intent
+                if speculative:
+                    logger.info(f"Ambiguous query, speculatively running intents: {[name for name, _ in intents]}")
+                else:
+                    logger.info(f"Compound query, fanning out to intents: {[name for name, _ in intents]}")
+                yield {"event": "intent", "language": lang, "intent": intent, "confidence": confidence,
+                       "intents": [{"intent": name, "confidence": score} for name, score in intents],
+                       "speculative": speculative}
+                for event in self._fan_out(text, text_en, lang, intents, context, timings, speculative):
+                    if event['event'] == 'answer':
+                        agent_used = event.get('agent_used')
+                    yield event
+                return
+            
+            yield {"event": "intent", "language": lang, "intent": intent, "confidence": confidence}
+            
             # 3) Extract comprehensive parameters
-            parameters = self.intent_clf.extract_parameters(text_en, intent, context)
+            with timings.stage("extract_parameters"):
+                parameters = self.intent_clf.extract_parameters(text_en, intent, context)
             logger.debug(f"Extracted parameters: {parameters}")
             
             # 4) Prepare enhanced payload
@@ -251,42 +448,280 @@ class Orchestrator:
             
             # 5) Route to appropriate agent
             logger.info(f"Routing intent '{intent}' (confidence: {confidence:.2f}) with parameters: {list(parameters.keys())}")
-            agent_result = self._route_to_agent(intent, payload)
+            with timings.stage("route_to_agent"):
+                agent_result = self._route_to_agent(intent, payload)
+            agent_used = agent_result.get('agent_used')
+            
+            yield {"event": "result", "agent_used": agent_used, "parameters": parameters, "result": agent_result}
             
             # 6) Generate natural language response using mT5
-            if lang != "en" and agent_result.get('success', False):
-                # Use mT5 to generate natural response in user's language
-                natural_answer = translation_service.generate_natural_response(
-                    agent_result, intent, lang, text
-                )
-            else:
-                # For English or failed requests, use simple response generation
-                natural_answer = self._generate_simple_answer(agent_result, intent)
+            with timings.stage("generate_natural_response"):
+                natural_answer = self._generate_natural_answer(agent_result, intent, lang, text)
             
             # 7) Generate comprehensive response
+            with timings.stage("generate_response"):
+                response = self._generate_response(
+                    agent_result, intent, lang, confidence, parameters, context, natural_answer
+                )
+            
+            yield {"event": "answer", **response}
+            
+        except AgentOverloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error handling query: {e}")
+            yield {"event": "error", **self._generate_error_response(str(e), lang or 'en')}
+        finally:
+            metrics.record_stages(timings, intent, agent_used, lang)
+
+    def _fan_out(self, text: str, text_en: str, lang: str, intents, context: Dict[str, Any],
+                 timings: StageTimings, speculative: bool = False):
+        """
+        Run the agents for several intents concurrently and merge their answers.
+        
+        Each intent gets its own parameters and payload and runs on the
+        fan-out pool, so the wait is about as long as the slowest agent.
+        Yields a "result" event per intent as it finishes, then one "answer"
+        event shaped like a single-intent response for the primary intent.
+        
+        For a compound query the other intents are listed under
+        "additional_results" and all answers are joined. In speculative mode
+        the two candidate intents are alternatives: the one whose parameters
+        the query fills more completely answers (the classifier's choice on
+        a tie) and the other is attached as "alternative".
+        
+        An overloaded primary agent rejects the request; an overloaded
+        secondary agent only fails its own part.
+        """
+        with timings.stage("extract_parameters"):
+            parts = [
+                (intent, confidence, self.intent_clf.extract_parameters(text_en, intent, context))
+                for intent, confidence in intents
+            ]
+            if speculative:
+                completeness = {intent: self._parameter_completeness(intent, parameters)
+                                for intent, _, parameters in parts}
+                parts.sort(key=lambda part: completeness[part[0]], reverse=True)
+        
+        def answer(intent, confidence, parameters):
+            payload = {
+                "text": text_en,
+                "original_text": text,
+                "language": lang,
+                "intent": intent,
+                "confidence": confidence,
+                "parameters": parameters,
+                # _route_to_agent normalizes the context in place
+                "context": dict(context)
+            }
+            try:
+                agent_result = self._route_to_agent(intent, payload)
+            except AgentOverloaded as e:
+                if intent == parts[0][0]:
+                    raise
+                agent_result = {'success': False, 'error': str(e), 'agent_used': e.agent}
+            return agent_result, self._generate_natural_answer(agent_result, intent, lang, text)
+        
+        executor = self._fanout_pool()
+        outcomes = {}
+        with timings.stage("route_to_agent"):
+            futures = {executor.submit(answer, *part): part for part in parts}
+            for future in as_completed(futures):
+                intent, _, parameters = futures[future]
+                agent_result, natural_answer = outcomes[intent] = future.result()
+                yield {"event": "result", "intent": intent, "agent_used": agent_result.get('agent_used'),
+                       "parameters": parameters, "result": agent_result}
+        
+        with timings.stage("generate_response"):
+            intent, confidence, parameters = parts[0]
+            agent_result, natural_answer = outcomes[intent]
             response = self._generate_response(
                 agent_result, intent, lang, confidence, parameters, context, natural_answer
             )
+            response['intents'] = [{'intent': name, 'confidence': score} for name, score, _ in parts]
+            if speculative:
+                alternative, alternative_confidence, alternative_parameters = parts[1]
+                alternative_result, alternative_answer = outcomes[alternative]
+                response['speculative'] = True
+                response['parameter_completeness'] = completeness
+                response['alternative'] = {
+                    'intent': alternative,
+                    'confidence': alternative_confidence,
+                    'agent_used': alternative_result.get('agent_used'),
+                    'parameters': self._public_parameters(alternative_parameters),
+                    'result': alternative_result,
+                    'answer': alternative_answer
+                }
+                yield {"event": "answer", **response}
+                return
+            response['additional_results'] = []
+            answers = [response['answer']]
+            for intent, confidence, parameters in parts[1:]:
+                agent_result, natural_answer = outcomes[intent]
+                answers.append(natural_answer)
+                response['additional_results'].append({
+                    'intent': intent,
+                    'confidence': confidence,
+                    'agent_used': agent_result.get('agent_used'),
+                    'parameters': self._public_parameters(parameters),
+                    'result': agent_result,
+                    'answer': natural_answer
+                })
+            response['answer'] = "\n\n".join(answers)
+            response['success'] = any(outcome[0].get('success', True) for outcome in outcomes.values())
+            if any(outcome[0].get('degraded') for outcome in outcomes.values()):
+                response['degraded'] = True
+        
+        yield {"event": "answer", **response}
+
+    def _parameter_completeness(self, intent: str, parameters: Dict[str, Any]) -> float:
+        """Share of an intent's parameter slots that the extracted parameters fill"""
+        slots = self.INTENT_SLOTS.get(intent)
+        if not slots:
+            return 0.0
+        filled = sum(1 for keys in slots if any(parameters.get(key) not in (None, '', []) for key in keys))
+        return filled / len(slots)
+
+    def _fanout_pool(self) -> ThreadPoolExecutor:
+        """Get (creating on first use) the pool that runs fanned-out agent calls"""
+        if self._fanout_executor is None:
+            with self._executors_lock:
+                if self._fanout_executor is None:
+                    self._fanout_executor = ThreadPoolExecutor(
+                        max_workers=MULTI_INTENT_WORKERS, thread_name_prefix="fanout"
+                    )
+        return self._fanout_executor
+
+    def dispatch(self, agent_name: str, params: Dict[str, Any], language: str = "en",
+                 timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+        """
+        Run a named agent on already-structured parameters.
+        
+        Used by endpoints that know their target agent: skips language
+        detection, translation, intent classification and parameter
+        extraction, and goes straight to the agent and response builder.
+        
+        Args:
+            agent_name: Agent key in self.agents (crop, market_yield, risk, pest, finance)
+            params: Typed parameters, passed to the agent as its context
+            language: Language for the natural-language answer
+            timings: Optional per-request stage timings, filled in as stages run
             
-            return response
+        Returns:
+            Response in the same shape as handle_query
+        """
+        if timings is None:
+            timings = StageTimings()
+        # The model version keeps requests from joining a computation on a replaced model
+        version = self.agents.version(agent_name) if agent_name in self.agents else None
+        key = fingerprint('dispatch', agent_name, version, params, language)
+        return self._coalesce(
+            'dispatch', key, lambda: self._run_dispatch(agent_name, params, language, timings), timings
+        )
+
+    def _run_dispatch(self, agent_name: str, params: Dict[str, Any], language: str,
+                      timings: StageTimings) -> Dict[str, Any]:
+        """Route typed parameters to the named agent and build the response"""
+        intent = self.AGENT_TO_INTENT.get(agent_name)
+        if intent is None or agent_name not in self.agents:
+            return self._generate_error_response(f"Unknown agent: {agent_name}", language)
+        agent_used = None
+        
+        try:
+            # The route named the agent explicitly, so routing is certain
+            confidence = 1.0
+            payload = {
+                "text": "",
+                "original_text": "",
+                "language": language,
+                "intent": intent,
+                "confidence": confidence,
+                "parameters": params,
+                "context": dict(params)
+            }
+            
+            with timings.stage("route_to_agent"):
+                agent_result = self._route_to_agent(intent, payload)
+            agent_used = agent_result.get('agent_used')
+            
+            with timings.stage("generate_natural_response"):
+                natural_answer = self._generate_natural_answer(agent_result, intent, language, "")
             
+            with timings.stage("generate_response"):
+                return self._generate_response(
+                    agent_result, intent, language, confidence, params, payload['context'], natural_answer
+                )
+            
+        except AgentOverloaded:
+            raise
         except Exception as e:
-            logger.error(f"Error handling query: {e}")
-            return self._generate_error_response(str(e), lang if 'lang' in locals() else 'en')
+            logger.error(f"Error dispatching to agent {agent_name}: {e}")
+            return self._generate_error_response(str(e), language)
+        finally:
+            metrics.record_stages(timings, intent, agent_used, language)
+
+    def _coalesce(self, kind: str, key: str, compute, timings: StageTimings) -> Dict[str, Any]:
+        """
+        Single-flight wrapper: concurrent calls with the same key run compute
+        once and share its response.
+        """
+        if not self.coalesce_requests:
+            return compute()
+        
+        start = time.perf_counter()
+        response, shared = self._inflight.do(key, compute)
+        if shared:
+            timings.record("coalesced_wait", time.perf_counter() - start)
+            metrics.coalesced_requests.inc(kind=kind)
+            # Each caller gets its own top-level dict
+            response = dict(response)
+        return response
+
+    def record_feedback(self, items) -> Dict[str, Any]:
+        """
+        Teach the intent classifier the correct intent of past queries.
+        
+        Each item is {"text", "intent"}; the intent may also be given as the
+        agent name a response reported in agent_used. Texts are translated
+        to English first, as queries are before they are classified. Cached
+        responses are dropped afterwards, since the old model routed them.
+        Raises ValueError for an empty text or unknown intent.
+        """
+        texts, intents = [], []
+        for item in items:
+            if not isinstance(item, dict) or not str(item.get("text") or "").strip():
+                raise ValueError("Every feedback item needs a text")
+            label = str(item.get("intent") or "")
+            texts.append(self.to_en(str(item["text"])))
+            intents.append(self.AGENT_TO_INTENT.get(label, label))
+        result = self.intent_clf.learn(texts, intents)
+        if result['learned']:
+            self.response_cache.invalidate()
+        return result
+
+    def flush_feedback(self) -> bool:
+        """Checkpoint intent feedback not yet written; called as a worker shuts down"""
+        return self.intent_clf.checkpoint() if getattr(self.intent_clf, 'supports_feedback', False) else False
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Counters for single-flight request coalescing"""
+        return {'enabled': self.coalesce_requests, **self._inflight.get_stats()}
+
+    def _generate_natural_answer(self, agent_result: Dict[str, Any], intent: str,
+                                 lang: str, original_text: str) -> str:
+        """Produce the user-facing answer in the user's language"""
+        if lang != "en" and agent_result.get('success', False):
+            # Use mT5 to generate natural response in user's language
+            return translation_service.generate_natural_response(
+                agent_result, intent, lang, original_text
+            )
+        # For English or failed requests, use simple response generation
+        return self._generate_simple_answer(agent_result, intent)
 
     def _route_to_agent(self, intent: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Route query to appropriate agent based on intent"""
         try:
-            # Map intents to agent names
-            intent_to_agent = {
-                'crop_recommendation': 'crop',
-                'market_yield': 'market_yield',
-                'risk_assessment': 'risk',
-                'pest_detection': 'pest',
-                'finance_agent': 'finance'
-            }
-            
-            agent_name = intent_to_agent.get(intent)
+            agent_name = self.INTENT_TO_AGENT.get(intent)
             
             # Force routing to crop agent for crop_recommendation intent (bypass confidence threshold)
             if intent == 'crop_recommendation':
@@ -330,12 +765,8 @@ class Orchestrator:
                     payload['context'] = context
                     logger.debug(f"Normalized context for crop agent: {context}")
                 
-                # Call agent with enhanced payload
-                if hasattr(agent, 'process_query'):
-                    result = agent.process_query(payload['text'], payload)
-                else:
-                    # Fallback for older agent interface
-                    result = agent.predict(payload)
+                # Call agent with enhanced payload, bounded by AGENT_TIMEOUT
+                result = self._run_agent(agent_name, agent, payload)
                 
                 result['agent_used'] = agent_name
                 result['agent_confidence'] = payload['confidence']
@@ -347,6 +778,8 @@ class Orchestrator:
                 logger.warning(f"No agent found for intent: {intent}")
                 return self._handle_general_query(payload)
                 
+        except AgentOverloaded:
+            raise
         except Exception as e:
             logger.error(f"Error routing to agent: {e}")
             return {
@@ -355,6 +788,358 @@ class Orchestrator:
                 'success': False
             }
 
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Run synthetic inputs through every loaded agent, the intent classifier
+        and one translation per supported language, then mark the orchestrator
+        ready. With lazy agent loading, agents not yet requested are skipped.
+        
+        Pays for lazy library initialization and page faults on model files
+        before real traffic arrives. Failures are recorded in the report but
+        do not block readiness, since every path has a fallback at request time.
+        """
+        started = time.perf_counter()
+        report = {'agents': {}, 'intent_classifier': None, 'translation': {}, 'errors': {}}
+        
+        for agent_name, agent in self.agents.loaded().items():
+            start = time.perf_counter()
+            try:
+                agent.predict(self._synthetic_payload(agent_name))
+            except Exception as e:
+                report['errors'][agent_name] = str(e)
+            report['agents'][agent_name] = round(time.perf_counter() - start, 4)
+        
+        start = time.perf_counter()
+        try:
+            # Load (or fit) the intent pipeline here, before any fork: the keyword
+            # cascade may answer the warm-up query without touching the model
+            pipeline = getattr(self.intent_clf, 'pipeline', None)
+            if pipeline is not None:
+                pipeline.predict_proba([self.WARMUP_QUERY])
+            intent, _ = self.intent_clf.classify_intent(self.WARMUP_QUERY)
+            self.intent_clf.extract_parameters(self.WARMUP_QUERY, intent)
+        except Exception as e:
+            report['errors']['intent_classifier'] = str(e)
+        report['intent_classifier'] = round(time.perf_counter() - start, 4)
+        
+        try:
+            report['translation'] = {
+                lang: round(seconds, 4) for lang, seconds in translation_service.warm_up().items()
+            }
+        except Exception as e:
+            report['errors']['translation'] = str(e)
+        
+        report['total'] = round(time.perf_counter() - started, 4)
+        self.warmup_report = report
+        self._ready.set()
+        logger.info(f"Warm-up finished in {report['total']:.2f}s")
+        return report
+
+    def _synthetic_payload(self, agent_name: str) -> Dict[str, Any]:
+        """Fresh copy of the warm-up payload for an agent"""
+        payload = self.WARMUP_PAYLOADS.get(agent_name, {'text': '', 'context': {}})
+        return dict(payload, context=dict(payload.get('context', {})))
+
+    def start_warm_up(self):
+        """Run warm_up once on a background thread; later calls are no-ops"""
+        with self._warmup_lock:
+            if self._warmup_started or self._ready.is_set():
+                return
+            self._warmup_started = True
+        threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def reload_agent(self, agent_name: str) -> Dict[str, Any]:
+        """
+        Reload an agent's models without a restart.
+        
+        A new agent instance reads the model files in the calling thread
+        while the live instance keeps serving. The new instance must answer
+        the agent's smoke payload, and must not lose a model or change its
+        feature count compared to the live one. It is then swapped in
+        atomically. In-flight requests finish on the old instance. Raises
+        ModelReloadError and keeps the live model if validation fails.
+        """
+        if agent_name not in self.agents:
+            raise KeyError(agent_name)
+        
+        with self._reload_lock:
+            start = time.perf_counter()
+            try:
+                candidate = self.agents.build(agent_name)
+                load_time = time.perf_counter() - start
+                
+                live = self.agents.loaded().get(agent_name)
+                smoke_start = time.perf_counter()
+                self._validate_candidate(agent_name, live, candidate)
+                smoke_time = time.perf_counter() - smoke_start
+            except Exception as e:
+                metrics.model_reloads.inc(agent=agent_name, outcome='rejected')
+                logger.error(f"Reload of agent {agent_name} rejected, keeping the live model: {e}")
+                if isinstance(e, ModelReloadError):
+                    raise
+                raise ModelReloadError(f"Could not load {agent_name}: {e}") from e
+            
+            version = self.agents.swap(agent_name, candidate, load_time=load_time)
+            metrics.model_reloads.inc(agent=agent_name, outcome='swapped')
+            logger.info(f"Reloaded agent {agent_name} as version {version} in {load_time:.3f}s")
+            return {
+                'agent': agent_name,
+                'version': version,
+                'load_time': round(load_time, 4),
+                'smoke_time': round(smoke_time, 4)
+            }
+
+    def reload_models(self, agent_names=None) -> Dict[str, Any]:
+        """Reload several agents (default: every loaded agent), reporting each outcome"""
+        names = list(agent_names) if agent_names else list(self.agents.loaded())
+        results = {}
+        for agent_name in names:
+            try:
+                results[agent_name] = {'ok': True, **self.reload_agent(agent_name)}
+            except KeyError:
+                results[agent_name] = {'ok': False, 'error': f"Unknown agent: {agent_name}"}
+            except ModelReloadError as e:
+                results[agent_name] = {'ok': False, 'error': str(e)}
+        return results
+
+    def _validate_candidate(self, agent_name: str, live: Any, candidate: Any):
+        """Smoke-test a freshly loaded agent before it replaces the live one"""
+        for attr in ('model', 'price_model', 'yield_model'):
+            live_model = getattr(live, attr, None)
+            new_model = getattr(candidate, attr, None)
+            if live_model is not None and new_model is None:
+                raise ModelReloadError(f"{agent_name}.{attr} failed to load")
+            live_features = getattr(live_model, 'n_features_in_', None)
+            new_features = getattr(new_model, 'n_features_in_', None)
+            if live_features is not None and new_features is not None and live_features != new_features:
+                raise ModelReloadError(
+                    f"{agent_name}.{attr} expects {new_features} features, live model expects {live_features}"
+                )
+        
+        result = candidate.predict(self._synthetic_payload(agent_name))
+        if not isinstance(result, dict) or result.get('success') is False:
+            error = result.get('error') if isinstance(result, dict) else result
+            raise ModelReloadError(f"Smoke prediction failed for {agent_name}: {error}")
+
+    def _on_model_reload(self, agent_name: str, version: int):
+        """Drop state that was measured against the previous model and re-attach shadow candidates"""
+        self.admission.gate(agent_name).reset_service_time()
+        self.response_cache.invalidate(self.AGENT_TO_INTENT.get(agent_name))
+        self._attach_candidates(agent_name)
+
+    def _attach_candidates(self, agent_name: str):
+        """Wrap each of the agent's live models that has a registered candidate version"""
+        agent = self.agents.loaded().get(agent_name)
+        if agent is None:
+            return
+        for stem in AGENT_ARTIFACTS.get(agent_name, ()):
+            attr = MODEL_ATTRIBUTES[stem][1]
+            live_model = getattr(agent, attr, None)
+            entry = model_registry.get(stem)
+            candidate_path = model_registry.resolve(stem, "candidate")
+            if live_model is None or candidate_path is None:
+                self.shadow.stop(stem)
+                if isinstance(live_model, ShadowedModel):
+                    setattr(agent, attr, live_model.live)
+                continue
+            try:
+                candidate = load_model(candidate_path)
+            except Exception as e:
+                logger.error(f"Could not load candidate {stem} version {entry.get('candidate')}: {e}")
+                continue
+            setattr(agent, attr, self.shadow.wrap(
+                stem, live_model, candidate, entry.get("live"), entry.get("candidate")
+            ))
+            logger.info(f"Shadow-evaluating {stem} version {entry.get('candidate')} against {entry.get('live')}")
+
+    def set_model_candidate(self, stem: str, version: Optional[str]):
+        """Mark a registered version as the shadow candidate (None stops shadowing)"""
+        agent_name = self._model_agent(stem)
+        model_registry.set_candidate(stem, version)
+        self._attach_candidates(agent_name)
+        self._registry_pointers = self._read_registry_pointers()
+
+    def promote_model(self, stem: str, version: str) -> Dict[str, Any]:
+        """
+        Make a registered version live and hot-reload its agent onto it.
+        
+        Raises KeyError for a model no agent serves, before any pointer is
+        changed. If the reload fails for any reason, the previous live and
+        candidate pointers are restored.
+        """
+        agent_name = self._model_agent(stem)
+        previous = model_registry.get(stem)
+        model_registry.promote(stem, version)
+        try:
+            return self.reload_agent(agent_name)
+        except Exception:
+            if previous.get("live") is not None:
+                model_registry.promote(stem, previous["live"])
+            model_registry.set_candidate(stem, previous.get("candidate"))
+            raise
+        finally:
+            self._registry_pointers = self._read_registry_pointers()
+
+    @staticmethod
+    def _model_agent(stem: str) -> str:
+        """Agent serving a registered model stem; KeyError if none does"""
+        if stem not in MODEL_ATTRIBUTES:
+            raise KeyError(f"No agent serves model {stem}")
+        return MODEL_ATTRIBUTES[stem][0]
+
+    def get_model_report(self) -> Dict[str, Any]:
+        """Registered versions per model and the running shadow comparisons"""
+        return {'models': model_registry.list_models(), 'shadow': self.shadow.get_report()}
+
+    def _read_registry_pointers(self) -> Dict[str, tuple]:
+        """(live, candidate) version of every registered model"""
+        return {
+            stem: (entry.get("live"), entry.get("candidate"))
+            for stem, entry in model_registry.list_models().items()
+            if stem in MODEL_ATTRIBUTES
+        }
+
+    def sync_registry(self) -> Dict[str, str]:
+        """
+        Follow live/candidate changes another process made in model_metadata.json.
+        
+        Agents whose live version moved are reloaded; agents whose candidate
+        moved get their shadow comparison re-attached. Returns what was done
+        per agent. Agents not loaded yet resolve the registry on first use.
+        """
+        pointers = self._read_registry_pointers()
+        previous, self._registry_pointers = self._registry_pointers, pointers
+        actions = {}
+        for stem in set(pointers) | set(previous):
+            old, new = previous.get(stem, (None, None)), pointers.get(stem, (None, None))
+            agent_name = MODEL_ATTRIBUTES[stem][0]
+            if old[0] != new[0]:
+                actions[agent_name] = 'reload'
+            elif old[1] != new[1]:
+                actions.setdefault(agent_name, 'candidates')
+        
+        loaded = self.agents.loaded()
+        for agent_name, action in actions.items():
+            if agent_name not in loaded:
+                continue
+            if action == 'reload':
+                # The reload listener re-attaches candidates too
+                self.reload_agent(agent_name)
+            else:
+                self._attach_candidates(agent_name)
+        return actions
+
+    def _reload_if_loaded(self, agent_name: str):
+        """Watcher callback: lazily loaded agents pick up new files on first use anyway"""
+        if agent_name == self.REGISTRY_WATCH_NAME:
+            self.sync_registry()
+        elif agent_name in self.agents.loaded():
+            self.reload_agent(agent_name)
+
+    def start_model_watcher(self):
+        """
+        Start polling the model directories if MODEL_WATCH_INTERVAL is set.
+        
+        model_metadata.json is watched too, so a promotion or candidate
+        change made through one worker reaches every worker.
+        """
+        if MODEL_WATCH_INTERVAL <= 0 or self._model_watcher is not None:
+            return
+        directories = [self.models_dir, "models", os.path.join("backend", "models")]
+        artifacts = {name: stems for name, stems in AGENT_ARTIFACTS.items() if name in self.agents}
+        self._model_watcher = ModelWatcher(
+            directories, artifacts, self._reload_if_loaded, MODEL_WATCH_INTERVAL,
+            files={self.REGISTRY_WATCH_NAME: (model_registry.metadata_path,)}
+        )
+        self._model_watcher.start()
+
+    def after_fork(self):
+        """Reset per-process state in a freshly forked worker"""
+        # Executor threads and locks do not survive fork; start from empty pools
+        self._executors = {}
+        self._executors_lock = threading.Lock()
+        self._fanout_executor = None
+        self._reload_lock = threading.Lock()
+        self._model_watcher = None
+        self.shadow.after_fork()
+        self.admission = AdmissionController(
+            self.admission.default_concurrency, self.admission.max_queue, self.admission.limits
+        )
+
+    def _executor_for(self, agent_name: str) -> ThreadPoolExecutor:
+        """Get (creating on first use) the bounded worker pool for an agent"""
+        executor = self._executors.get(agent_name)
+        if executor is None:
+            with self._executors_lock:
+                executor = self._executors.get(agent_name)
+                if executor is None:
+                    # Sized to the admission limit, so admitted calls never queue here
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.admission.concurrency_for(agent_name),
+                        thread_name_prefix=f"agent-{agent_name}"
+                    )
+                    self._executors[agent_name] = executor
+        return executor
+
+    def _call_agent(self, agent_name: str, agent: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Invoke an agent's query interface and time it"""
+        with metrics.time_agent(agent_name):
+            if hasattr(agent, 'process_query'):
+                return agent.process_query(payload['text'], payload)
+            # Fallback for older agent interface
+            return agent.predict(payload)
+
+    def _admitted_call(self, gate, agent_name: str, agent: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an admitted agent call, releasing its slot when the work really ends"""
+        start = time.perf_counter()
+        try:
+            return self._call_agent(agent_name, agent, payload)
+        finally:
+            gate.release(time.perf_counter() - start)
+
+    def _run_agent(self, agent_name: str, agent: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run agent inference on the agent's worker pool with a deadline.
+        
+        The call first passes the agent's admission gate, which raises
+        AgentOverloaded when the agent's queue is full. If the agent has not
+        answered within agent_timeout seconds (time spent queued counts),
+        the pending call is cancelled where possible and the agent's
+        heuristic path answers instead. Such results are flagged as degraded.
+        """
+        gate = self.admission.gate(agent_name)
+        bounded = bool(self.agent_timeout and self.agent_timeout > 0)
+        deadline = time.perf_counter() + self.agent_timeout if bounded else None
+        try:
+            gate.acquire(timeout=self.agent_timeout if bounded else None)
+        except AgentOverloaded:
+            metrics.rejected_requests.inc(agent=agent_name)
+            raise
+        
+        if not bounded:
+            return self._admitted_call(gate, agent_name, agent, payload)
+        
+        future = self._executor_for(agent_name).submit(self._admitted_call, gate, agent_name, agent, payload)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeoutError:
+            # Only a call still waiting for a worker can be cancelled; a running
+            # one finishes in the background and its result is discarded
+            if future.cancel():
+                gate.release()
+            logger.warning(f"Agent {agent_name} exceeded {self.agent_timeout}s deadline, using heuristic fallback")
+            
+            if hasattr(agent, 'heuristic_predict'):
+                result = agent.heuristic_predict(payload)
+            else:
+                result = {'success': False, 'error': f"Agent {agent_name} timed out"}
+            result['degraded'] = True
+            result['degraded_reason'] = f"Agent exceeded the {self.agent_timeout}s deadline"
+            return result
+
     def _handle_general_query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Handle general queries that don't fit specific intents"""
         text = payload['text'].lower()
@@ -430,7 +1215,7 @@ class Orchestrator:
             'intent': intent,
             'confidence': confidence,
             'agent_used': agent_result.get('agent_used'),
-            'parameters': parameters,
+            'parameters': self._public_parameters(parameters),
             'result': agent_result,
             'timestamp': self._get_timestamp()
         }
@@ -451,12 +1236,21 @@ class Orchestrator:
         if 'suggestions' in agent_result:
             response['suggestions'] = agent_result['suggestions']
         
+        # Flag answers that came from a fallback path instead of the model
+        if agent_result.get('degraded'):
+            response['degraded'] = True
+        
         # Add confidence warning for low confidence predictions
         if confidence < 0.6:
             response['warning'] = "I'm not very confident about this classification. Please verify the results or rephrase your question."
         
         return response
 
+    @staticmethod
+    def _public_parameters(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Parameters safe to return; image payloads (base64 strings or raw buffers) are never echoed"""
+        return {k: v for k, v in parameters.items() if k not in ('image_data', 'image')}
+
     def _generate_error_response(self, error_message: str, language: str) -> Dict[str, Any]:
         """Generate error response"""
         return {
@@ -503,49 +1297,40 @@ class Orchestrator:
     def update_cache(self, key: str, value: Any):
         """Update cache with new value"""
         try:
-            with open(self.cache_file, "r+") as f:
-                data = json.load(f)
-                data[key] = value
-                f.seek(0)
-                json.dump(data, f, indent=2)
-                f.truncate()
+            self.cache_store.set(key, value)
         except Exception as e:
             logger.error(f"Error updating cache: {e}")
 
     def read_cache(self, key: str) -> Any:
         """Read value from cache"""
         try:
-            with open(self.cache_file, "r") as f:
-                data = json.load(f)
-            return data.get(key)
+            return self.cache_store.get(key)
         except Exception as e:
             logger.error(f"Error reading cache: {e}")
             return None
 
     def clear_cache(self):
-        """Clear all cache data"""
+        """Clear all cache data, including cached query responses"""
+        self.response_cache.invalidate()
         try:
-            with open(self.cache_file, "w") as f:
-                json.dump({}, f)
+            self.cache_store.clear()
             logger.info("Cache cleared successfully")
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
 
     def get_agent_status(self) -> Dict[str, Any]:
-        """Get status of all loaded agents"""
+        """Get load state and admission stats of all registered agents, without loading any"""
         status = {}
-        for agent_name, agent in self.agents.items():
-            try:
-                status[agent_name] = {
-                    'loaded': True,
-                    'name': getattr(agent, 'name', agent_name),
-                    'model_loaded': hasattr(agent, 'model') and agent.model is not None
-                }
-            except Exception as e:
-                status[agent_name] = {
-                    'loaded': False,
-                    'error': str(e)
-                }
+        loaded = self.agents.loaded()
+        for agent_name in self.agents:
+            agent = loaded.get(agent_name)
+            status[agent_name] = {
+                'loaded': agent is not None,
+                **self.agents.get_status(agent_name),
+                'name': getattr(agent, 'name', agent_name),
+                'model_loaded': agent is not None and getattr(agent, 'model', None) is not None,
+                'admission': self.admission.get_stats(agent_name)
+            }
         return status
 
 
@@ -0,0 +1,192 @@
+"""
+Single-pass parameter extraction for user queries.
+
+The query is lowercased once and scanned once for number spans: a number
+with the unit that follows it. Each span also looks at the keyword just
+before it, so pH, NPK, temperature, humidity, rainfall, area, quantity,
+money and timeframes all resolve from that one stream of spans instead of
+a separate regex search per parameter. Every pattern is compiled at import.
+"""
+import re
+from typing import Any, Dict, Optional
+
+NUMBER = r'\d+(?:,\d+)*(?:\.\d+)?'
+
+# Keyword immediately before a number (one "is"/"of"/"="/":" may sit between) -> parameter
+KEYWORDS = {
+    'ph': 'ph', 'acidity': 'ph', 'alkalinity': 'ph',
+    'nitrogen': 'N', 'n': 'N', 'nitrate': 'N', 'ammonia': 'N',
+    'phosphorus': 'P', 'p': 'P', 'phosphate': 'P',
+    'potassium': 'K', 'k': 'K', 'potash': 'K',
+    'temperature': 'temperature',
+    'humidity': 'humidity',
+    'rainfall': 'rainfall', 'precipitation': 'rainfall',
+    'rs': 'amount', 'rupee': 'amount', 'rupees': 'amount', '₹': 'amount'
+}
+
+# Unit immediately after a number -> (parameter, multiplier); whitespace inside units is dropped
+UNITS = {
+    'acre': ('area_acres', 1), 'acres': ('area_acres', 1),
+    'hectare': ('area_hectares', 1), 'hectares': ('area_hectares', 1), 'ha': ('area_hectares', 1),
+    'sqft': ('area_sqft', 1), 'squarefeet': ('area_sqft', 1), 'squarefoot': ('area_sqft', 1),
+    'sqm': ('area_sqm', 1), 'squaremeter': ('area_sqm', 1), 'squaremeters': ('area_sqm', 1),
+    'squaremetre': ('area_sqm', 1), 'squaremetres': ('area_sqm', 1),
+    'ton': ('quantity_tons', 1), 'tons': ('quantity_tons', 1),
+    'tonne': ('quantity_tons', 1), 'tonnes': ('quantity_tons', 1),
+    'quintal': ('quantity_quintals', 1), 'quintals': ('quantity_quintals', 1), 'qtl': ('quantity_quintals', 1),
+    'kg': ('quantity_kg', 1), 'kgs': ('quantity_kg', 1),
+    'kilogram': ('quantity_kg', 1), 'kilograms': ('quantity_kg', 1),
+    'bag': ('quantity_bags', 1), 'bags': ('quantity_bags', 1),
+    'sack': ('quantity_sacks', 1), 'sacks': ('quantity_sacks', 1),
+    'rs': ('amount', 1), 'rupee': ('amount', 1), 'rupees': ('amount', 1),
+    'lakh': ('amount', 100000), 'lakhs': ('amount', 100000),
+    'crore': ('amount', 10000000), 'crores': ('amount', 10000000)
+}
+
+TIME_UNITS = {
+    'day': 'days', 'days': 'days',
+    'week': 'weeks', 'weeks': 'weeks',
+    'month': 'months', 'months': 'months'
+}
+
+# Relative timeframes, used when no "<n> days/weeks/months" span is present
+TIME_PHRASES = {
+    'nextweek': 'weeks', 'nextmonth': 'months',
+    'thisseason': 'seasons', 'nextseason': 'seasons'
+}
+
+_UNIT_ALTERNATION = '|'.join(sorted(
+    (re.escape(unit) for unit in list(UNITS) + list(TIME_UNITS)), key=len, reverse=True
+)).replace('sqft', r'sq\s*ft').replace('sqm', r'sq\s*m').replace('square', r'square\s*')
+
+# Scanned over the lowercased query: a number and the unit after it. Every
+# match starts at a digit, so the scan skips straight from number to number.
+NUMBER_SPAN = re.compile(
+    r'(?P<number>' + NUMBER + r')\s*'
+    r'(?:(?:°|degrees?\b)\s*(?P<scale>celsius|fahrenheit|c|f)\b'
+    r'|(?:mm|millimeters?|inch(?:es)?|in)\s*(?P<rain>rainfall|rain)\b'
+    r'|(?P<unit>' + _UNIT_ALTERNATION + r')\b)?'
+)
+
+# Words allowed between a keyword and its number ("ph is 6.5", "nitrogen of 40"); "=" and ":" are dropped
+CONNECTORS = frozenset(('is', 'of'))
+# Characters before a number that are searched for its keyword: the longest keyword plus a connector
+KEYWORD_WINDOW = 24
+KEYWORD_PUNCTUATION = '.,;()[]"\''
+
+TIME_PHRASE = re.compile(r'\b(next\s+(?:week|month|season)|this\s+season)\b')
+
+# Place names are matched on the original casing ("in Punjab", "Nashik district")
+PLACE_AFTER = re.compile(r'(?:in|at|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b')
+PLACE_BEFORE = re.compile(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:area|region|district|state)')
+REGION_WORDS = ('area', 'region', 'district', 'state')
+
+SOIL_FACTS = ('ph', 'N', 'P', 'K')
+CLIMATE_FACTS = ('temperature', 'humidity', 'rainfall')
+AREA_FACTS = ('area_acres', 'area_hectares', 'area_sqft', 'area_sqm')
+QUANTITY_FACTS = ('quantity_tons', 'quantity_quintals', 'quantity_kg', 'quantity_bags', 'quantity_sacks')
+
+# Only the first area and the first quantity in a query are reported
+_GROUPS = {key: 'area' for key in AREA_FACTS}
+_GROUPS.update({key: 'quantity' for key in QUANTITY_FACTS})
+
+def extract_location(query: str, query_lower: Optional[str] = None) -> Optional[str]:
+    """Capitalized place name after in/at/near/around, or before area/region/district/state"""
+    if query_lower is None:
+        query_lower = query.lower()
+    # Without a capital letter there is no place name to find; lowercase queries skip both scans
+    if query == query_lower:
+        return None
+    for match in PLACE_AFTER.finditer(query):
+        # The preposition has to be a whole word: "within Punjab" is not "in Punjab"
+        if match.start() == 0 or not query[match.start() - 1].isalnum():
+            return match.group(1).strip()
+    if any(word in query_lower for word in REGION_WORDS):
+        match = PLACE_BEFORE.search(query)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def keyword_before(query_lower: str, start: int) -> Optional[str]:
+    """Parameter named by the word just before position start, skipping one connector"""
+    words = query_lower[max(0, start - KEYWORD_WINDOW):start].replace('=', ' ').replace(':', ' ').split()
+    if words and words[-1] in CONNECTORS:
+        words.pop()
+    if not words:
+        return None
+    return KEYWORDS.get(words[-1].strip(KEYWORD_PUNCTUATION))
+
+
+class ParameterExtractor:
+    """
+    Resolves numeric query parameters from one scan of NUMBER_SPAN.
+
+    A number takes its parameter from the unit after it ("2 acres",
+    "28°C", "2.5 lakh") and from the keyword before it ("pH 6.5",
+    "nitrogen is 40"). When both name the same parameter the unit wins, so
+    "temperature 80 °F" is converted and "rs 5 lakh" is multiplied. The
+    first value found for a parameter is kept.
+    """
+
+    def extract(self, query: str, query_lower: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Every numeric fact in the query, plus 'numbers' (all numbers in
+        order) and 'location'. Keys are only present when found; pass
+        query_lower if the caller already has it.
+        """
+        if query_lower is None:
+            query_lower = query.lower()
+        facts: Dict[str, Any] = {}
+        groups = set()
+        numbers = []
+
+        def put(key: str, value: Any):
+            group = _GROUPS.get(key)
+            if key in facts or (group and group in groups):
+                return
+            facts[key] = value
+            if group:
+                groups.add(group)
+
+        for match in NUMBER_SPAN.finditer(query_lower):
+            value = float(match.group('number').replace(',', ''))
+            numbers.append(value)
+
+            unit_key = None
+            scale, rain, unit = match.group('scale', 'rain', 'unit')
+            if scale:
+                unit_key = 'temperature'
+                put(unit_key, value if scale[0] == 'c' else (value - 32) * 5 / 9)
+            elif rain:
+                unit_key = 'rainfall'
+                put(unit_key, value)
+            elif unit:
+                unit = ''.join(unit.split())
+                if unit in TIME_UNITS:
+                    unit_key = 'timeframe'
+                    put(unit_key, {'value': int(value) if value.is_integer() else value,
+                                   'unit': TIME_UNITS[unit]})
+                else:
+                    unit_key, multiplier = UNITS[unit]
+                    put(unit_key, value * multiplier)
+
+            keyword_key = keyword_before(query_lower, match.start())
+            if keyword_key and keyword_key != unit_key:
+                put(keyword_key, value)
+
+        # Substring checks first: the regex is only run when a phrase can be there
+        if 'timeframe' not in facts and ('next' in query_lower or 'this' in query_lower):
+            phrase = TIME_PHRASE.search(query_lower)
+            if phrase:
+                facts['timeframe'] = {'value': 1, 'unit': TIME_PHRASES[''.join(phrase.group(1).split())]}
+        if numbers:
+            facts['numbers'] = numbers
+        location = extract_location(query, query_lower)
+        if location:
+            facts['location'] = location
+        return facts
+
+
+# Shared extractor; it holds no per-query state
+parameter_extractor = ParameterExtractor()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Production pre-fork server for the Demeter backend.
+
+The master process imports the app once, which builds the Orchestrator with
+every agent, the intent classifier and the translation model. It then
+runs the warm-up pass, freezes the garbage collector and forks the workers,
+so the model memory is shared copy-on-write instead of being loaded again in
+each worker, and every worker answers /ready as soon as it starts.
+
+Each worker is a separate process with its own metrics, response cache and
+coalescing state. Workers publish their metrics to a directory the master
+creates, so /metrics on any worker reports the sum over all of them (other
+workers' values lag by up to METRICS_FLUSH_INTERVAL seconds). The JSON stats
+from /agent-status are still those of the worker that answered, which is
+named by its worker_pid field.
+
+Usage:
+    python serve.py                      # SERVER_WORKERS workers on FLASK_HOST:FLASK_PORT
+    SERVER_WORKERS=8 python serve.py
+
+POSIX only (uses os.fork); use main.py for local development.
+"""
+import gc
+
+# Keep the collector from touching (and so un-sharing) objects while the
+# models load; it is re-enabled in each worker after the fork.
+gc.disable()
+
+import os
+import sys
+import time
+import shutil
+import signal
+import socket
+import logging
+import tempfile
+
+from werkzeug.serving import make_server
+
+from config import FLASK_HOST, FLASK_PORT, SERVER_WORKERS, METRICS_FLUSH_INTERVAL
+from main import app, orch
+from utils.metrics import metrics
+
+logger = logging.getLogger("serve")
+
+
+def read_memory(pid: int) -> dict:
+    """Read RSS, PSS and shared/private page totals for a process, in kB"""
+    fields = {
+        'Rss': 'rss', 'Pss': 'pss',
+        'Shared_Clean': 'shared_clean', 'Shared_Dirty': 'shared_dirty',
+        'Private_Clean': 'private_clean', 'Private_Dirty': 'private_dirty'
+    }
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(':')
+                if key in fields:
+                    memory[fields[key]] = int(parts[1])
+    except OSError:
+        # Kernels without smaps_rollup only give us the resident set size
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        memory['rss'] = int(line.split()[1])
+        except OSError:
+            pass
+    return memory
+
+
+def memory_report(master_pid: int, worker_pids: list) -> str:
+    """Format per-process RSS against shared and private pages, in MB"""
+    lines = [f"{'process':<16}{'rss':>10}{'pss':>10}{'shared':>10}{'private':>10}"]
+    for label, pid in [("master", master_pid)] + [(f"worker {pid}", pid) for pid in worker_pids]:
+        memory = read_memory(pid)
+        shared = memory.get('shared_clean', 0) + memory.get('shared_dirty', 0)
+        private = memory.get('private_clean', 0) + memory.get('private_dirty', 0)
+        lines.append(
+            f"{label:<16}{memory.get('rss', 0) / 1024:>10.1f}{memory.get('pss', 0) / 1024:>10.1f}"
+            f"{shared / 1024:>10.1f}{private / 1024:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def run_worker(listener: socket.socket, metrics_dir: str):
+    """Serve requests on the inherited listening socket until terminated"""
+    gc.enable()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    # Thread pools and locks must not be inherited from the master
+    orch.after_fork()
+    orch.start_model_watcher()
+    metrics.enable_shared(metrics_dir, METRICS_FLUSH_INTERVAL)
+
+    server = make_server(FLASK_HOST, FLASK_PORT, app, threaded=True, fd=listener.fileno())
+    try:
+        server.serve_forever()
+    finally:
+        # os._exit skips atexit handlers, so flush explicitly
+        try:
+            orch.flush_feedback()
+            metrics.flush()
+        finally:
+            os._exit(0)
+
+
+def spawn_worker(listener: socket.socket, metrics_dir: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(listener, metrics_dir)
+    return pid
+
+
+def main():
+    if orch is None:
+        logger.error("Orchestrator failed to initialize, refusing to start workers")
+        return 1
+
+    # Warm every model path once here, so each worker starts ready and shares
+    # the pages the warm-up touched
+    orch.warm_up()
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((FLASK_HOST, FLASK_PORT))
+    listener.listen(128)
+    listener.set_inheritable(True)
+
+    # Move everything loaded so far into the permanent generation so that
+    # collections in the workers never write to the shared pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Froze {gc.get_freeze_count()} objects before forking {SERVER_WORKERS} workers")
+
+    metrics_dir = tempfile.mkdtemp(prefix="demeter-metrics-")
+    workers = {spawn_worker(listener, metrics_dir) for _ in range(SERVER_WORKERS)}
+    logger.info(f"Serving on {FLASK_HOST}:{FLASK_PORT} with workers {sorted(workers)}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    time.sleep(1)
+    logger.info("Startup memory report (MB):\n" + memory_report(os.getpid(), sorted(workers)))
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            logger.warning(f"Worker {pid} exited with status {status}, restarting")
+            workers.add(spawn_worker(listener, metrics_dir))
+
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""
+Shared pytest fixtures for the backend tests
+"""
+
+import sys
+import os
+import tempfile
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.orchestrator import Orchestrator
+
+
+def make_orchestrator():
+    """Orchestrator over an empty models directory, so agents fall back to the default models"""
+    return Orchestrator(models_dir=tempfile.mkdtemp())
+
+
+@pytest.fixture
+def orch():
+    return make_orchestrator()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for admin token checks on the model management endpoints
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+ADMIN_REQUESTS = [
+    ("post", "/admin/reload-models", {}),
+    ("get", "/admin/models", None),
+    ("post", "/admin/models/crop_model/candidate", {"version": None}),
+    ("post", "/admin/models/crop_model/promote", {"version": "1"}),
+    ("post", "/feedback", {"text": "can i get money to buy a tractor", "intent": "finance_agent"}),
+]
+
+
+def request(method, url, body, headers=None):
+    client = main.app.test_client()
+    return getattr(client, method)(url, json=body, headers=headers or {})
+
+
+def test_admin_endpoints_are_closed_without_a_token():
+    main.ADMIN_TOKEN, token = None, main.ADMIN_TOKEN
+    try:
+        for method, url, body in ADMIN_REQUESTS:
+            response = request(method, url, body, {"X-Admin-Token": ""})
+            assert response.status_code == 403, url
+    finally:
+        main.ADMIN_TOKEN = token
+
+
+def test_admin_endpoints_need_the_configured_token():
+    main.ADMIN_TOKEN, token = "s3cret", main.ADMIN_TOKEN
+    try:
+        for method, url, body in ADMIN_REQUESTS:
+            assert request(method, url, body).status_code == 403, url
+            assert request(method, url, body, {"X-Admin-Token": "wrong"}).status_code == 403, url
+        assert request("get", "/admin/models", None, {"X-Admin-Token": "s3cret"}).status_code == 200
+    finally:
+        main.ADMIN_TOKEN = token
+
+
+if __name__ == "__main__":
+    test_admin_endpoints_are_closed_without_a_token()
+    test_admin_endpoints_need_the_configured_token()
+    print("✅ Admin endpoint tests passed")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy and parallel agent loading
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.registry import AgentRegistry
+from agents.crop_agent import CropAgent
+
+
+def test_lazy_registry_loads_on_first_lookup():
+    agents = AgentRegistry(tempfile.mkdtemp())
+
+    assert set(agents) == {"crop", "market_yield", "risk", "finance", "pest"}
+    assert "risk" in agents
+    assert agents.loaded() == {}
+    assert agents.get_status("crop")['state'] == "not_loaded"
+
+    crop = agents["crop"]
+    assert isinstance(crop, CropAgent)
+    assert agents["crop"] is crop
+    assert list(agents.loaded()) == ["crop"]
+
+    status = agents.get_status("crop")
+    assert status['state'] == "loaded"
+    assert status['load_time'] is not None
+    assert agents.get_status("risk")['state'] == "not_loaded"
+
+
+def test_load_all_builds_every_agent():
+    agents = AgentRegistry(tempfile.mkdtemp())
+    loaded = agents.load_all(max_workers=5)
+
+    assert set(loaded) == set(agents)
+    assert all(agents.get_status(name)['state'] == "loaded" for name in agents)
+
+
+def test_failed_load_is_reported():
+    agents = AgentRegistry(tempfile.mkdtemp(), {"broken": ("no_such_agent", "NoSuchAgent")})
+    loaded = agents.load_all()
+
+    assert loaded == {}
+    status = agents.get_status("broken")
+    assert status['state'] == "failed"
+    assert status['error']
+
+
+if __name__ == "__main__":
+    test_lazy_registry_loads_on_first_lookup()
+    test_load_all_builds_every_agent()
+    test_failed_load_is_reported()
+    print("✅ Agent registry tests passed")
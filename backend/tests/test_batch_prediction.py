@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test script for batch scoring through BaseAgent.predict_many
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from agents.crop_agent import CropAgent
+from agents.market_yield_agent import MarketYieldAgent
+from agents.risk_agent import RiskAgent
+from agents.finance_agent import FinanceAgent
+
+
+class CountingModel:
+    """Wraps a fitted classifier and counts model calls"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+class RejectsFirstFeatureAbove(CountingModel):
+    """Raises for any batch containing a row whose first feature exceeds limit"""
+
+    def __init__(self, model, limit):
+        super().__init__(model)
+        self.limit = limit
+
+    def _check(self, X):
+        self.calls += 1
+        if (np.asarray(X)[:, 0] > self.limit).any():
+            raise ValueError("first feature out of range")
+
+    def predict(self, X):
+        self._check(X)
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        self._check(X)
+        return self.model.predict_proba(X)
+
+
+def _classifier(n_features, classes):
+    rng = np.random.RandomState(0)
+    return RandomForestClassifier(n_estimators=5, random_state=0).fit(
+        rng.rand(200, n_features) * 10, rng.choice(classes, 200)
+    )
+
+
+def _crop_model():
+    rng = np.random.RandomState(42)
+    X = rng.rand(200, 7) * 100
+    y = rng.choice(['rice', 'wheat', 'maize'], 200)
+    return RandomForestClassifier(n_estimators=5, random_state=42).fit(X, y)
+
+
+def test_crop_batch_matches_single_predictions():
+    agent = CropAgent()
+    agent.model = CountingModel(_crop_model())
+
+    payloads = [
+        {"context": {"N": 90, "P": 42, "K": 43, "temperature": 20, "humidity": 82, "ph": 6.5, "rainfall": 200}},
+        {"context": {"N": 20, "P": 60, "K": 10, "temperature": 30, "humidity": 40, "ph": 7.5, "rainfall": 50}},
+        {"context": {}},
+    ]
+
+    batch = agent.predict_many(payloads)
+    assert agent.model.calls == 1
+    assert len(batch) == len(payloads)
+
+    for payload, result in zip(payloads, batch):
+        single = agent.predict(payload)
+        assert result["top_crop"] == single["top_crop"]
+        assert result["confidence_scores"] == single["confidence_scores"]
+
+
+def test_row_errors_do_not_fail_the_batch():
+    agent = MarketYieldAgent()
+    results = agent.predict_many([
+        {"context": {"crop": "rice", "area": 2}},
+        {"context": {"crop": "wheat", "area": "not a number"}},
+    ])
+
+    assert results[0]["success"] is True
+    assert results[1]["success"] is False
+    assert "error" in results[1]
+
+
+def test_crop_rows_that_do_not_parse_fail_alone():
+    agent = CropAgent()
+    agent.model = CountingModel(_crop_model())
+    results = agent.predict_many([
+        {"context": {"N": 90, "P": 42, "K": 43}},
+        {"context": None},
+        "not a payload",
+        {"context": {"ph": 6.5}},
+    ])
+
+    assert [r["success"] for r in results] == [True, False, False, True]
+    assert agent.model.calls == 1
+
+
+def test_crop_model_error_is_isolated_to_its_row():
+    class RejectsHighNitrogen(CountingModel):
+        def predict_proba(self, X):
+            self.calls += 1
+            if (np.asarray(X)[:, 0] > 100).any():
+                raise ValueError("nitrogen out of range")
+            return self.model.predict_proba(X)
+
+        predict = predict_proba
+
+    agent = CropAgent()
+    agent.model = RejectsHighNitrogen(_crop_model())
+    results = agent.predict_many([{"context": {"N": 90}}, {"context": {"N": 500}}, {"context": {"N": 20}}])
+
+    assert [r["success"] for r in results] == [True, False, True]
+    assert "nitrogen out of range" in results[1]["error"]
+
+
+def test_risk_model_error_is_isolated_to_its_row():
+    agent = RiskAgent()
+    agent.model = RejectsFirstFeatureAbove(_classifier(6, ['low', 'medium', 'high']), 60)
+    results = agent.predict_many([{"context": {"temperature": 30}}, {"context": {"temperature": 95}},
+                                  {"context": {"temperature": 20}}])
+
+    assert [r["success"] for r in results] == [True, False, True]
+    assert results[1]["error"] == "Risk assessment failed: first feature out of range"
+
+
+def test_finance_model_and_build_errors_are_isolated_to_their_rows():
+    agent = FinanceAgent()
+    agent.model = RejectsFirstFeatureAbove(_classifier(5, ['eligible', 'not_eligible']), 10)
+    tips = agent._get_financial_tips
+    agent._get_financial_tips = lambda profile: tips(profile) if profile["land_size_acres"] < 100 else 1 / 0
+    results = agent.predict_many([{"context": {"income": 200000}}, {"context": {"income": 5000000}},
+                                  {"context": {"land_size": 500}}, {"context": {}}])
+
+    assert [r["success"] for r in results] == [True, False, False, True]
+    assert "first feature out of range" in results[1]["error"]
+    assert "division by zero" in results[2]["error"]
+
+
+def test_market_model_error_is_isolated_to_its_row():
+    class Yields:
+        classes_ = None
+
+        def predict(self, X):
+            return np.full(len(X), 3.0)
+
+    agent = MarketYieldAgent()
+    agent.price_model = None
+    agent.yield_model = RejectsFirstFeatureAbove(Yields(), 200)
+    results = agent.predict_many([{"context": {"N": 50}}, {"context": {"N": 900}}, {"context": {"N": 80}}])
+
+    assert [r["success"] for r in results] == [True, False, True]
+    assert results[1]["error"].startswith("Market/yield prediction failed:")
+    # One batch call that raised, then one call per row
+    assert agent.yield_model.calls == 4
+
+
+def test_risk_heuristic_batch():
+    agent = RiskAgent()
+    results = agent.predict_many([
+        {"context": {"location": "Punjab", "temperature": 40, "rainfall": 10}},
+        {"context": {"location": "Kerala"}},
+    ])
+
+    assert [r["success"] for r in results] == [True, True]
+    assert results[0]["overall_risk_level"] in ("medium", "high")
+
+
+if __name__ == "__main__":
+    test_crop_batch_matches_single_predictions()
+    test_row_errors_do_not_fail_the_batch()
+    test_crop_rows_that_do_not_parse_fail_alone()
+    test_crop_model_error_is_isolated_to_its_row()
+    test_risk_model_error_is_isolated_to_its_row()
+    test_finance_model_and_build_errors_are_isolated_to_their_rows()
+    test_market_model_error_is_isolated_to_its_row()
+    test_risk_heuristic_batch()
+    print("✅ Batch prediction tests passed")
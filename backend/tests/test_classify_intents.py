@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for batch intent classification
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_classifier import intent_classifier, AdvancedIntentClassifier
+
+QUERIES = [
+    ("What crop should I plant in sandy soil with pH 6.5?", None),
+    ("Wheat price forecast for next month", {"location": "Punjab"}),
+    ("Is there drought risk this season?", {"location": "Rajasthan"}),
+    ("My tomato leaves have yellow spots", {"image_data": "abc"}),
+    ("Need a crop loan for seeds and fertilizer", {}),
+    ("hi", None),
+    ("", None),
+    ("Weather looks bad and pests are everywhere", {"weather_data": {"temp": 35}, "location": "Bihar"}),
+    ("Recommend the best crop for my soil", {"soil_data": {"ph": 6.8}}),
+    ("tell me something", {"financial_context": True}),
+]
+
+
+def test_batch_matches_single_queries():
+    texts = [text for text, _ in QUERIES]
+    contexts = [context for _, context in QUERIES]
+    expected = [intent_classifier.classify_intent(text, context) for text, context in QUERIES]
+    assert intent_classifier.classify_intents(texts, contexts) == expected
+
+    # Without contexts
+    assert intent_classifier.classify_intents(texts) == [intent_classifier.classify_intent(text) for text in texts]
+    assert intent_classifier.classify_intents([]) == []
+
+
+def test_batch_without_model_uses_fallback():
+    classifier = AdvancedIntentClassifier()
+    classifier.pipeline = None
+    texts = [text for text, _ in QUERIES]
+    assert classifier.classify_intents(texts) == [classifier.classify_intent(text) for text in texts]
+
+
+def test_batch_rejects_mismatched_contexts():
+    try:
+        intent_classifier.classify_intents(["wheat price"], [None, None])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_batch_is_faster_than_a_loop():
+    texts = [text for text, _ in QUERIES if len(text) >= 3] * 50
+    intent_classifier.classify_intents(texts[:5])
+
+    start = time.perf_counter()
+    single = [intent_classifier.classify_intent(text) for text in texts]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = intent_classifier.classify_intents(texts)
+    batch_seconds = time.perf_counter() - start
+
+    assert batch == single
+    assert batch_seconds < loop_seconds
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_queries()
+    test_batch_without_model_uses_fallback()
+    test_batch_rejects_mismatched_contexts()
+    test_batch_is_faster_than_a_loop()
+    print("✅ Batch intent classification tests passed")
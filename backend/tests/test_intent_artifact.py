@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the persisted intent classification pipeline
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_classifier import AdvancedIntentClassifier
+from utils.intent_artifact import load_intent_pipeline
+
+
+def make_path():
+    return os.path.join(tempfile.mkdtemp(), "intent_pipeline.joblib")
+
+
+def no_training(self):
+    raise AssertionError("the pipeline should have been loaded, not trained")
+
+
+def test_construction_does_not_train():
+    path = make_path()
+    classifier = AdvancedIntentClassifier(artifact_path=path)
+    classifier._train_model = lambda: no_training(classifier)
+
+    assert not os.path.exists(path)
+    # Short queries never reach the model
+    assert classifier.classify_intent("hi") == ('general', 0.3)
+
+
+def test_first_use_trains_once_and_later_instances_load():
+    path = make_path()
+    first = AdvancedIntentClassifier(artifact_path=path)
+    first.cascade = False  # the keyword cascade would answer without the model
+    intent, confidence = first.classify_intent("What will be the price of wheat next month?")
+    assert intent == 'market_yield'
+    assert os.path.exists(path)
+
+    second = AdvancedIntentClassifier(artifact_path=path)
+    second._train_model = lambda: no_training(second)
+    second.cascade = False
+    assert second.classify_intent("What will be the price of wheat next month?") == (intent, confidence)
+
+
+def test_changed_training_data_retrains():
+    path = make_path()
+    AdvancedIntentClassifier(artifact_path=path).pipeline
+
+    changed = AdvancedIntentClassifier(artifact_path=path)
+    changed.intent_examples['finance_agent'].append("Tractor financing interest rates")
+    changed.training_hash = 'changed'
+    trained = []
+    original = changed._train_model
+    changed._train_model = lambda: (trained.append(1), original())
+
+    assert changed.pipeline is not None
+    assert trained == [1]
+    assert load_intent_pipeline(path, 'changed') is not None
+
+
+if __name__ == "__main__":
+    test_construction_does_not_train()
+    test_first_use_trains_once_and_later_instances_load()
+    test_changed_training_data_retrains()
+    print("✅ Intent artifact tests passed")
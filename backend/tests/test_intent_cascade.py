@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the keyword cascade in front of the intent model
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_classifier import intent_classifier, AdvancedIntentClassifier
+from utils.metrics import metrics
+from config import INTENT_CASCADE_PRECISION
+
+
+class CountingPipeline:
+    """Wraps the fitted pipeline and counts predict_proba calls"""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.classes_ = pipeline.classes_
+        self.calls = 0
+
+    def predict_proba(self, texts):
+        self.calls += 1
+        return self.pipeline.predict_proba(texts)
+
+
+def counting_classifier():
+    classifier = AdvancedIntentClassifier()
+    classifier.pipeline = CountingPipeline(intent_classifier.pipeline)
+    classifier.cascade = True
+    return classifier
+
+
+def keyword_count() -> float:
+    return metrics.intent_classifications._values.get(('keyword',), 0)
+
+
+def test_threshold_is_calibrated_on_the_examples():
+    classifier = AdvancedIntentClassifier()
+    threshold, precision = classifier._calibrate_cascade(0.9)
+    assert 0 < threshold < 1 and precision >= 0.9
+    assert (classifier.cascade_threshold, classifier.cascade_precision) == \
+        classifier._calibrate_cascade(INTENT_CASCADE_PRECISION)
+
+    # A stricter target needs a wider margin; an impossible one turns the cascade off
+    assert classifier._calibrate_cascade(0.99)[0] >= threshold
+    assert classifier._calibrate_cascade(1.01) == (float('inf'), 0.0)
+
+
+def test_decisive_keywords_skip_the_model():
+    classifier = counting_classifier()
+    classifier.cascade_threshold, classifier.cascade_precision = classifier._calibrate_cascade(0.9)
+    before = keyword_count()
+
+    intent, confidence = classifier.classify_intent("Need a loan and credit from the bank")
+    assert intent == 'finance_agent' and confidence >= classifier.cascade_precision
+    assert classifier.pipeline.calls == 0
+    assert keyword_count() == before + 1
+    assert classifier.rank_intents("Need a loan and credit from the bank", top_k=2) == [(intent, confidence)]
+
+    # No keywords, or keywords for two intents, still go to the model
+    classifier.classify_intent("Tell me what to do this week")
+    classifier.classify_intent("Price of crop insurance")
+    assert classifier.pipeline.calls == 2
+
+
+def test_cascade_can_be_turned_off():
+    classifier = counting_classifier()
+    classifier.cascade = False
+    intent, _ = classifier.classify_intent("Need a loan and credit from the bank")
+    assert intent == 'finance_agent'
+    assert classifier.pipeline.calls == 1
+
+
+def test_batch_uses_the_cascade():
+    classifier = counting_classifier()
+    texts = ["Need a loan and credit from the bank", "Tell me what to do this week"]
+    assert classifier.classify_intents(texts) == [classifier.classify_intent(text) for text in texts]
+    # One batch call for the undecided text, one single call for it in the loop above
+    assert classifier.pipeline.calls == 2
+
+
+if __name__ == "__main__":
+    test_threshold_is_calibrated_on_the_examples()
+    test_decisive_keywords_skip_the_model()
+    test_cascade_can_be_turned_off()
+    test_batch_uses_the_cascade()
+    print("✅ Intent cascade tests passed")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the hashing intent backend and online learning from feedback
+"""
+
+import sys
+import os
+import time
+import tempfile
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_classifier import AdvancedIntentClassifier
+from orchestrator.orchestrator import Orchestrator
+
+# No keyword the cascade or the examples know, so only feedback can teach it
+QUERY = "can i get money to buy a tractor"
+
+
+def hashing_classifier(path=None):
+    classifier = AdvancedIntentClassifier(
+        artifact_path=path or os.path.join(tempfile.mkdtemp(), "intent_online.joblib"), backend='hashing'
+    )
+    classifier.cascade = False
+    return classifier
+
+
+def test_hashing_backend_classifies():
+    classifier = hashing_classifier()
+    assert 'hashing' in classifier.pipeline.named_steps
+    assert classifier.classify_intent("What will be the price of wheat next month?")[0] == 'market_yield'
+    assert os.path.exists(classifier.artifact_path)
+
+
+def test_feedback_is_learned_and_checkpointed():
+    classifier = hashing_classifier()
+    assert classifier.classify_intent(QUERY)[0] != 'finance_agent'
+
+    result = classifier.learn([QUERY] * 3, ['finance_agent'] * 3)
+    assert result == {'learned': 3, 'feedback_count': 3, 'checkpointed': False}
+    assert classifier.classify_intent(QUERY)[0] == 'finance_agent'
+
+    # Not on disk until a checkpoint
+    assert hashing_classifier(classifier.artifact_path).classify_intent(QUERY)[0] != 'finance_agent'
+    assert classifier.checkpoint() is True
+    assert classifier.checkpoint() is False
+    assert hashing_classifier(classifier.artifact_path).classify_intent(QUERY)[0] == 'finance_agent'
+
+
+def test_updates_never_touch_the_serving_model():
+    classifier = hashing_classifier()
+    serving = classifier.pipeline
+    weights = serving.named_steps['classifier'].coef_.copy()
+
+    classifier.learn([QUERY], ['finance_agent'])
+
+    # A query already holding the old pipeline finishes on unchanged weights
+    assert (serving.named_steps['classifier'].coef_ == weights).all()
+    assert classifier.pipeline is not serving
+    assert classifier.pipeline.named_steps['hashing'] is serving.named_steps['hashing']
+
+
+def test_enough_feedback_checkpoints_itself():
+    classifier = hashing_classifier()
+    assert classifier.learn([QUERY] * 100, ['finance_agent'] * 100)['checkpointed'] is True
+    assert classifier.checkpoint() is False
+
+
+def test_pending_feedback_is_flushed_by_the_timer():
+    classifier = hashing_classifier()
+    classifier.checkpoint_interval = 0.05
+    classifier.learn([QUERY] * 3, ['finance_agent'] * 3)
+
+    deadline = time.monotonic() + 5
+    while classifier._pending_feedback and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert hashing_classifier(classifier.artifact_path).classify_intent(QUERY)[0] == 'finance_agent'
+
+
+def test_pending_feedback_is_flushed_at_exit():
+    path = os.path.join(tempfile.mkdtemp(), "intent_online.joblib")
+    script = (
+        "import sys; sys.path.insert(0, {backend!r}); sys.path.insert(0, {tests!r})\n"
+        "from test_intent_feedback import hashing_classifier, QUERY\n"
+        "hashing_classifier({path!r}).learn([QUERY] * 3, ['finance_agent'] * 3)\n"
+    ).format(backend=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+             tests=os.path.dirname(os.path.abspath(__file__)), path=path)
+    subprocess.run([sys.executable, "-c", script], check=True)
+    assert hashing_classifier(path).classify_intent(QUERY)[0] == 'finance_agent'
+
+
+def test_invalid_feedback_is_rejected():
+    for texts, intents in (([QUERY], ['loans']), ([QUERY], []),):
+        try:
+            hashing_classifier().learn(texts, intents)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+
+    tfidf = AdvancedIntentClassifier(artifact_path=os.path.join(tempfile.mkdtemp(), "intent.joblib"), backend='tfidf')
+    assert not tfidf.supports_feedback
+    try:
+        tfidf.learn([QUERY], ['finance_agent'])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+    try:
+        AdvancedIntentClassifier(backend='bert')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_orchestrator_accepts_agent_names():
+    orch = Orchestrator(models_dir=tempfile.mkdtemp())
+    orch.intent_clf = hashing_classifier()
+    result = orch.record_feedback([{"text": QUERY, "intent": "finance"}, {"text": QUERY, "intent": "finance_agent"}])
+    assert result['learned'] == 2
+    assert orch.intent_clf.classify_intent(QUERY)[0] == 'finance_agent'
+
+    # Responses routed by the old model are not served again
+    orch.response_cache.put(orch.response_cache.key(QUERY, {}), {'success': True, 'intent': 'market_yield'})
+    orch.record_feedback([{"text": QUERY, "intent": "finance"}])
+    assert orch.response_cache.get(orch.response_cache.key(QUERY, {})) is None
+
+    # What serve.py workers call on shutdown
+    assert orch.flush_feedback() is True
+    assert hashing_classifier(orch.intent_clf.artifact_path).classify_intent(QUERY)[0] == 'finance_agent'
+
+    try:
+        orch.record_feedback([{"intent": "finance"}])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_hashing_backend_classifies()
+    test_feedback_is_learned_and_checkpointed()
+    test_updates_never_touch_the_serving_model()
+    test_enough_feedback_checkpoints_itself()
+    test_pending_feedback_is_flushed_by_the_timer()
+    test_pending_feedback_is_flushed_at_exit()
+    test_invalid_feedback_is_rejected()
+    test_orchestrator_accepts_agent_names()
+    print("✅ Intent feedback tests passed")
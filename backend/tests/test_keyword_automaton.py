@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the keyword automaton behind dictionary lookups
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.keyword_automaton import KeywordAutomaton, invert
+from orchestrator.intent_classifier import intent_classifier
+
+
+def test_whole_words_with_inflections():
+    automaton = KeywordAutomaton({'crops': {'pea': 'pea', 'chickpea': 'chickpea', 'tomato': 'tomato'}})
+    assert automaton.scan("i want peace, not chickpeas") == {'crops': {'chickpea': 'chickpea'}}
+    assert automaton.scan("peas and tomatoes. pea again") == {'crops': {'pea': 'pea', 'tomato': 'tomato'}}
+    assert automaton.scan("nothing here") == {}
+
+
+def test_every_dictionary_in_one_scan():
+    automaton = KeywordAutomaton({
+        'crops': {'potato': 'potato', 'sweet potato': 'sweet potato'},
+        'loan_types': {'crop loan': 'crop loan'},
+        'boosters': invert({'finance_agent': ['loan', 'credit'], 'market_yield': ['price']}),
+        'risk_types': invert({'market': ['price'], 'financial': ['loan']})
+    })
+    hits = automaton.scan("crop loan for sweet potatoes at a good price")
+    assert hits['crops'] == {'sweet potato': 'sweet potato', 'potato': 'potato'}
+    assert hits['loan_types'] == {'crop loan': 'crop loan'}
+    assert hits['boosters'] == {'loan': ('finance_agent',), 'price': ('market_yield',)}
+    assert hits['risk_types'] == {'loan': ('financial',), 'price': ('market',)}
+
+    # Multi-word keywords do not match across punctuation
+    assert 'loan_types' not in automaton.scan("which crop, loan or grant?")
+
+
+def test_large_vocabulary():
+    varieties = {f"variety{i:05d}": i for i in range(5000)}
+    automaton = KeywordAutomaton({'crops': varieties})
+    assert automaton.scan("price of variety04999 and variety00007") == {
+        'crops': {'variety04999': 4999, 'variety00007': 7}
+    }
+
+
+def test_classifier_lookups():
+    params = intent_classifier.extract_parameters(
+        "My tomato plants have yellowing leaves and brown spots", 'pest_detection'
+    )
+    assert params['crop_type'] == 'tomato'
+    assert params['symptoms'] == ['yellowing', 'spots']
+    assert params['affected_parts'] == ['leaves']
+
+    params = intent_classifier.extract_parameters("Drought and pest risk on my peas", 'risk_assessment')
+    assert params['risk_types'] == ['drought', 'pest']
+
+    assert intent_classifier._fallback_classification("need a loan from the bank")[0] == 'finance_agent'
+    assert intent_classifier._fallback_classification("hello there") == ('general', 0.4)
+    assert intent_classifier._apply_contextual_boosting("loan and credit", 'finance_agent', 0.5) == 0.6
+
+
+if __name__ == "__main__":
+    test_whole_words_with_inflections()
+    test_every_dictionary_in_one_scan()
+    test_large_vocabulary()
+    test_classifier_lookups()
+    print("✅ Keyword automaton tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite-backed daily cache
+"""
+
+import sys
+import os
+import json
+import tempfile
+import multiprocessing
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.orchestrator import Orchestrator
+from utils.kv_store import KVStore
+
+
+def write_keys(path, worker, count):
+    store = KVStore(path)
+    for i in range(count):
+        store.set(f"{worker}:{i}", {"worker": worker, "i": i})
+
+
+def test_set_get_delete_and_clear():
+    store = KVStore(os.path.join(tempfile.mkdtemp(), "cache.sqlite3"))
+    store.set("prices", {"wheat": 2150.0})
+    store.set("prices", {"wheat": 2200.0})
+
+    assert store.get("prices") == {"wheat": 2200.0}
+    assert store.get("missing", "default") == "default"
+    assert len(store) == 1
+
+    store.delete("prices")
+    assert store.get("prices") is None
+    store.set("a", 1)
+    store.clear()
+    assert len(store) == 0
+
+
+def test_migrates_legacy_json_once():
+    directory = tempfile.mkdtemp()
+    legacy = os.path.join(directory, "daily_cache.json")
+    with open(legacy, "w") as f:
+        json.dump({"weather": {"Punjab": 31}, "sync_date": "2024-06-01"}, f, indent=2)
+
+    store = KVStore(os.path.join(directory, "daily_cache.sqlite3"), legacy_json=legacy)
+
+    assert store.items() == {"weather": {"Punjab": 31}, "sync_date": "2024-06-01"}
+    # The source file is left untouched
+    assert os.path.exists(legacy)
+    assert not os.path.exists(legacy + ".migrated")
+    # Reopening does not import anything again, even keys deleted since
+    store.set("sync_date", "2024-06-02")
+    store.delete("weather")
+    reopened = KVStore(os.path.join(directory, "daily_cache.sqlite3"), legacy_json=legacy)
+    assert reopened.items() == {"sync_date": "2024-06-02"}
+
+
+def test_concurrent_writers_in_separate_processes():
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+    KVStore(path)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=write_keys, args=(path, w, 50)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    store = KVStore(path)
+    assert len(store) == 200
+    assert store.get("3:49") == {"worker": 3, "i": 49}
+
+
+def test_orchestrator_cache_uses_store():
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, "daily_cache.json"), "w") as f:
+        json.dump({"last_sync": "yesterday"}, f)
+
+    orch = Orchestrator(models_dir=directory)
+    assert orch.read_cache("last_sync") == "yesterday"
+
+    orch.update_cache("last_sync", "today")
+    assert Orchestrator(models_dir=directory).read_cache("last_sync") == "today"
+
+    orch.clear_cache()
+    assert orch.read_cache("last_sync") is None
+
+
+if __name__ == "__main__":
+    test_set_get_delete_and_clear()
+    test_migrates_legacy_json_once()
+    test_concurrent_writers_in_separate_processes()
+    test_orchestrator_cache_uses_store()
+    print("✅ Daily cache store tests passed")
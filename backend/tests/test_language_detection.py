@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for script-based language detection
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.language_detection as language_detection
+from utils.language_detection import detect_language, script_language
+from utils.translation import translation_service
+from orchestrator.orchestrator import Orchestrator
+
+
+def test_served_scripts_are_detected_without_langdetect():
+    samples = {
+        'ta': "எந்த பயிரை நடவு செய்ய வேண்டும்?",
+        'te': "ఏ పంట వేయాలి?",
+        'kn': "ಯಾವ ಬೆಳೆ ಬೆಳೆಯಬೇಕು?",
+        'ml': "ഏത് വിള നടണം?",
+        'hi': "मुझे कौन सी फसल लगानी चाहिए?",
+        'ru': "Какую культуру мне посадить?",
+    }
+    original = language_detection.langdetect_detect
+    language_detection.langdetect_detect = None
+    try:
+        for language, text in samples.items():
+            assert script_language(text) == language
+            assert detect_language(text) == language
+    finally:
+        language_detection.langdetect_detect = original
+
+
+def test_latin_text_uses_seeded_cached_langdetect():
+    assert script_language("What crop should I plant?") is None
+    # Mostly-English text with a local crop name stays English
+    assert script_language("price of ராகி in Salem market today") is None
+
+    language_detection._detect_latin.cache_clear()
+    results = {detect_language("Quel est le prix du blé à Paris aujourd'hui?") for _ in range(5)}
+    assert results == {'fr'}
+    assert language_detection._detect_latin.cache_info().hits == 4
+    # Short queries that langdetect places outside our Latin languages fall back to English
+    assert detect_language("wheat price") == 'en'
+    assert detect_language("   ") == 'en'
+
+
+def test_query_pipeline_detects_language_once():
+    orch = Orchestrator(models_dir=tempfile.mkdtemp())
+    calls = []
+    original = language_detection.script_language
+
+    def counting(text):
+        calls.append(text)
+        return original(text)
+
+    language_detection.script_language = counting
+    try:
+        response = orch.handle_query("எந்த பயிரை நடவு செய்ய வேண்டும்?", {})
+        assert response['language'] == 'ta'
+        translation_service.translate_text("Check the soil", 'ta', 'en')
+    finally:
+        language_detection.script_language = original
+
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    test_served_scripts_are_detected_without_langdetect()
+    test_latin_text_uses_seeded_cached_langdetect()
+    test_query_pipeline_detects_language_once()
+    print("✅ Language detection tests passed")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for memory-mapped forest artifacts
+"""
+
+import sys
+import os
+import tempfile
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.model_artifacts import (export_forest, load_mapped, load_model, artifact_exists,
+                                   mapped_path, MappedForestClassifier)
+
+
+def make_data():
+    rng = np.random.RandomState(0)
+    X = rng.rand(500, 7) * 100
+    return rng, X
+
+
+def test_mapped_classifier_matches_sklearn():
+    rng, X = make_data()
+    y = rng.choice(['low', 'medium', 'high'], 500)
+    model = RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y)
+    mapped = load_mapped(export_forest(model, tempfile.mkdtemp()))
+
+    X_test = rng.rand(100, 7) * 100
+    assert isinstance(mapped.value, np.memmap)
+    assert list(mapped.classes_) == list(model.classes_)
+    assert np.array_equal(mapped.predict(X_test), model.predict(X_test))
+    assert np.allclose(mapped.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-12)
+
+
+def test_mapped_regressor_matches_sklearn():
+    rng, X = make_data()
+    y = rng.rand(500) * 50
+    model = RandomForestRegressor(n_estimators=10, random_state=42).fit(X, y)
+    mapped = load_mapped(export_forest(model, tempfile.mkdtemp()))
+
+    X_test = rng.rand(50, 7) * 100
+    assert np.allclose(mapped.predict(X_test), model.predict(X_test), rtol=0, atol=1e-12)
+
+
+def test_missing_values_follow_sklearn_routing():
+    rng, X = make_data()
+    y = rng.choice(['low', 'medium', 'high'], 500)
+    X_train = X.copy()
+    X_train[rng.rand(*X.shape) < 0.1] = np.nan
+    X_test = rng.rand(100, 7) * 100
+    X_test[rng.rand(*X_test.shape) < 0.2] = np.nan
+
+    # Trained with and without NaN: sklearn learns a side per split, or sends
+    # NaN to the child that saw more samples
+    for train in (X_train, X):
+        model = RandomForestClassifier(n_estimators=20, random_state=42).fit(train, y)
+        mapped = load_mapped(export_forest(model, tempfile.mkdtemp()))
+        assert np.array_equal(mapped.apply(X_test), _global_leaves(model, X_test))
+        assert np.allclose(mapped.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-12)
+
+    model = RandomForestRegressor(n_estimators=10, random_state=42).fit(X_train, rng.rand(500))
+    mapped = load_mapped(export_forest(model, tempfile.mkdtemp()))
+    assert np.allclose(mapped.predict(X_test), model.predict(X_test), rtol=0, atol=1e-12)
+
+
+def _global_leaves(model, X):
+    """sklearn's per-tree leaf ids shifted by each tree's offset in the mapped arrays"""
+    offsets = np.cumsum([0] + [tree.tree_.node_count for tree in model.estimators_[:-1]])
+    return model.apply(X) + offsets
+
+
+def test_load_model_prefers_mapped_artifact():
+    rng, X = make_data()
+    model = RandomForestClassifier(n_estimators=5, random_state=42).fit(X, rng.choice(['a', 'b'], 500))
+    path = os.path.join(tempfile.mkdtemp(), "risk_model.pkl")
+    assert not artifact_exists(path)
+
+    joblib.dump(model, path)
+    assert isinstance(load_model(path), RandomForestClassifier)
+
+    export_forest(model, mapped_path(path))
+    os.remove(path)
+    assert artifact_exists(path)
+    assert isinstance(load_model(path), MappedForestClassifier)
+
+
+def test_retrained_pickle_wins_over_stale_mapped_artifact():
+    rng, X = make_data()
+    path = os.path.join(tempfile.mkdtemp(), "crop_model.pkl")
+    old = RandomForestClassifier(n_estimators=5, random_state=42).fit(X, rng.choice(['a', 'b'], 500))
+    joblib.dump(old, path)
+    export_forest(old, mapped_path(path))
+    assert isinstance(load_model(path), MappedForestClassifier)
+
+    # Touching the pickle without changing it keeps the artifact
+    meta_time = os.path.getmtime(os.path.join(mapped_path(path), "meta.json"))
+    os.utime(path, (meta_time + 10, meta_time + 10))
+    assert isinstance(load_model(path), MappedForestClassifier)
+
+    new = RandomForestClassifier(n_estimators=7, random_state=1).fit(X, rng.choice(['c', 'd'], 500))
+    joblib.dump(new, path)
+    os.utime(path, (meta_time + 20, meta_time + 20))
+    loaded = load_model(path)
+    assert isinstance(loaded, RandomForestClassifier) and list(loaded.classes_) == ['c', 'd']
+
+    export_forest(new, mapped_path(path))
+    assert list(load_model(path).classes_) == ['c', 'd']
+    assert isinstance(load_model(path), MappedForestClassifier)
+
+
+def test_non_forest_is_rejected():
+    _, X = make_data()
+    for model in (LinearRegression(), GradientBoostingRegressor(n_estimators=5)):
+        try:
+            export_forest(model.fit(X, X[:, 0]), tempfile.mkdtemp())
+        except TypeError:
+            continue
+        raise AssertionError(f"export_forest accepted {type(model).__name__}")
+
+
+if __name__ == "__main__":
+    test_mapped_classifier_matches_sklearn()
+    test_mapped_regressor_matches_sklearn()
+    test_missing_values_follow_sklearn_routing()
+    test_load_model_prefers_mapped_artifact()
+    test_retrained_pickle_wins_over_stale_mapped_artifact()
+    test_non_forest_is_rejected()
+    print("✅ Model artifact tests passed")
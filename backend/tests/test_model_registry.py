@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned model registry and shadow evaluation
+"""
+
+import sys
+import os
+import tempfile
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents.base_agent
+import orchestrator.orchestrator as orchestrator_module
+from orchestrator.orchestrator import Orchestrator
+from utils.model_registry import ModelRegistry
+from utils.shadow import ShadowEvaluator, ShadowedModel
+
+
+def make_risk_model(path, n_estimators, seed):
+    rng = np.random.RandomState(seed)
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed)
+    model.fit(rng.rand(300, 6) * 100, rng.choice(['low', 'medium', 'high'], 300))
+    joblib.dump(model, path)
+    return model
+
+
+def make_registry():
+    base = tempfile.mkdtemp()
+    registry = ModelRegistry(os.path.join(base, "model_metadata.json"))
+    make_risk_model(os.path.join(base, "v1.pkl"), 5, 0)
+    make_risk_model(os.path.join(base, "v2.pkl"), 20, 1)
+    registry.register("risk_model", os.path.join(base, "v1.pkl"))
+    registry.register("risk_model", os.path.join(base, "v2.pkl"))
+    return registry
+
+
+def test_register_records_version_details():
+    registry = make_registry()
+    entry = registry.get("risk_model")
+
+    assert entry["live"] == "1"
+    assert set(entry["versions"]) == {"1", "2"}
+    record = entry["versions"]["2"]
+    assert record["hash"].startswith("sha256:")
+    assert record["size_bytes"] > 0
+    assert record["n_features"] == 6
+    assert record["classes"] == ["high", "low", "medium"]
+    assert record["latency_ms"]["p50"] > 0
+    assert registry.verify("risk_model", "2")
+
+    registry.promote("risk_model", "2")
+    assert registry.resolve("risk_model").endswith(os.path.join("versions", "risk_model", "2.pkl"))
+
+
+def test_concurrent_processes_register_distinct_versions():
+    registry = make_registry()
+    source = os.path.join(registry.base_dir, "v1.pkl")
+
+    # Forked processes each hold their own thread lock, only the file lock serializes them
+    pids = []
+    for _ in range(4):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ModelRegistry(registry.metadata_path).register("risk_model", source)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    assert set(registry.get("risk_model")["versions"]) == {"1", "2", "3", "4", "5", "6"}
+
+
+def test_shadow_evaluator_compares_candidate_off_path():
+    rng = np.random.RandomState(0)
+    X = rng.rand(300, 6)
+    y = rng.choice(['low', 'high'], 300)
+    live = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+
+    evaluator = ShadowEvaluator(sample_rate=1.0)
+    model = evaluator.wrap("risk_model", live, live, "1", "1")
+    for _ in range(3):
+        proba = model.predict_proba(X[:10])
+        assert np.array_equal(proba, live.predict_proba(X[:10]))
+    evaluator.drain()
+
+    report = evaluator.get_report()["risk_model"]
+    assert report["samples"] == 3 and report["rows"] == 30
+    assert report["agreement"] == 1.0
+    assert report["candidate_ms"] is not None
+
+
+def test_orchestrator_shadows_candidate_and_promotes():
+    registry = make_registry()
+    original = (agents.base_agent.model_registry, orchestrator_module.model_registry)
+    agents.base_agent.model_registry = orchestrator_module.model_registry = registry
+    try:
+        registry.set_candidate("risk_model", "2")
+        orch = Orchestrator(models_dir=tempfile.mkdtemp())
+        orch.shadow.sample_rate = 1.0
+
+        risk = orch.agents['risk']
+        assert isinstance(risk.model, ShadowedModel)
+        assert len(risk.model.live.estimators_) == 5
+
+        orch.dispatch("risk", {"location": "Punjab", "temperature": 35})
+        orch.shadow.drain()
+        report = orch.get_model_report()['shadow']['risk_model']
+        assert report['samples'] == 1 and report['candidate_version'] == "2"
+
+        orch.promote_model("risk_model", "2")
+        promoted = orch.agents['risk'].model
+        assert not isinstance(promoted, ShadowedModel)
+        assert len(promoted.estimators_) == 20
+        assert registry.get("risk_model")["candidate"] is None
+    finally:
+        agents.base_agent.model_registry, orchestrator_module.model_registry = original
+
+
+def test_failed_promotion_leaves_pointers_unchanged():
+    registry = make_registry()
+    registry.register("unserved_model", os.path.join(registry.base_dir, "v1.pkl"))
+    registry.register("unserved_model", os.path.join(registry.base_dir, "v2.pkl"))
+    original = (agents.base_agent.model_registry, orchestrator_module.model_registry)
+    agents.base_agent.model_registry = orchestrator_module.model_registry = registry
+    try:
+        orch = Orchestrator(models_dir=tempfile.mkdtemp())
+        try:
+            orch.promote_model("unserved_model", "2")
+            raise AssertionError("promoted a model no agent serves")
+        except KeyError:
+            pass
+        assert registry.get("unserved_model")["live"] == "1"
+
+        # Any reload failure, not only a rejected smoke test, rolls back
+        registry.set_candidate("risk_model", "2")
+        def broken_reload(agent_name):
+            raise RuntimeError("disk full")
+        orch.reload_agent = broken_reload
+        try:
+            orch.promote_model("risk_model", "2")
+            raise AssertionError("promotion survived a failed reload")
+        except RuntimeError:
+            pass
+        entry = registry.get("risk_model")
+        assert (entry["live"], entry["candidate"]) == ("1", "2")
+    finally:
+        agents.base_agent.model_registry, orchestrator_module.model_registry = original
+
+
+def test_other_workers_follow_registry_changes():
+    registry = make_registry()
+    original = (agents.base_agent.model_registry, orchestrator_module.model_registry)
+    agents.base_agent.model_registry = orchestrator_module.model_registry = registry
+    try:
+        # Two orchestrators stand in for two forked workers sharing the file
+        worker, other = Orchestrator(models_dir=tempfile.mkdtemp()), Orchestrator(models_dir=tempfile.mkdtemp())
+        for orch in (worker, other):
+            orch.agents['risk']
+
+        worker.set_model_candidate("risk_model", "2")
+        assert other.sync_registry() == {'risk': 'candidates'}
+        assert isinstance(other.agents['risk'].model, ShadowedModel)
+
+        worker.promote_model("risk_model", "2")
+        assert worker.sync_registry() == {}
+        assert other.sync_registry() == {'risk': 'reload'}
+        assert len(other.agents['risk'].model.estimators_) == 20
+    finally:
+        agents.base_agent.model_registry, orchestrator_module.model_registry = original
+
+
+if __name__ == "__main__":
+    test_register_records_version_details()
+    test_concurrent_processes_register_distinct_versions()
+    test_shadow_evaluator_compares_candidate_off_path()
+    test_orchestrator_shadows_candidate_and_promotes()
+    test_failed_promotion_leaves_pointers_unchanged()
+    test_other_workers_follow_registry_changes()
+    print("✅ Model registry tests passed")
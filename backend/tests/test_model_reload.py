@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for hot model reload
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.orchestrator import ModelReloadError
+from conftest import make_orchestrator
+from utils.model_watcher import ModelWatcher
+
+
+def test_reload_swaps_agent_and_bumps_version(orch):
+    old = orch.agents['risk']
+    version = orch.agents.version('risk')
+
+    result = orch.reload_agent('risk')
+
+    assert result['version'] == version + 1
+    assert orch.agents['risk'] is not old
+    assert orch.get_agent_status()['risk']['version'] == version + 1
+    # A request that already holds the old instance still completes on it
+    assert old.predict({"context": {"location": "Punjab"}})['overall_risk_level']
+
+
+def test_failed_smoke_test_keeps_live_model(orch):
+    live = orch.agents['risk']
+    broken = orch.agents.build('risk')
+    broken.predict = lambda payload: {"success": False, "error": "corrupt model"}
+    orch.agents.build = lambda name: broken
+
+    try:
+        orch.reload_agent('risk')
+    except ModelReloadError as e:
+        assert "corrupt model" in str(e)
+    else:
+        raise AssertionError("a failing candidate was swapped in")
+
+    assert orch.agents['risk'] is live
+    results = orch.reload_models(['risk', 'weather'])
+    assert results['risk']['ok'] is False and results['weather']['ok'] is False
+
+
+def test_watcher_reports_settled_changes_only():
+    models_dir = tempfile.mkdtemp()
+    path = os.path.join(models_dir, "risk_model.pkl")
+    watcher = ModelWatcher([models_dir], {"risk": ("risk_model",), "crop": ("crop_model",)},
+                           on_change=lambda name: None, interval=1)
+    assert watcher.poll() == []
+
+    with open(path, "wb") as f:
+        f.write(b"first")
+    assert watcher.poll() == []
+    assert watcher.poll() == ["risk"]
+    assert watcher.poll() == []
+
+    with open(path, "wb") as f:
+        f.write(b"second write")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1000))
+    assert watcher.poll() == []
+    assert watcher.poll() == ["risk"]
+
+
+def test_watcher_reports_explicit_files_by_name():
+    metadata_path = os.path.join(tempfile.mkdtemp(), "model_metadata.json")
+    watcher = ModelWatcher([], {}, on_change=lambda name: None, interval=1,
+                           files={"model_registry": (metadata_path,)})
+    with open(metadata_path, "w") as f:
+        f.write("{}")
+    assert watcher.poll() == []
+    assert watcher.poll() == ["model_registry"]
+
+
+if __name__ == "__main__":
+    test_reload_swaps_agent_and_bumps_version(make_orchestrator())
+    test_failed_smoke_test_keeps_live_model(make_orchestrator())
+    test_watcher_reports_settled_changes_only()
+    test_watcher_reports_explicit_files_by_name()
+    print("✅ Model reload tests passed")
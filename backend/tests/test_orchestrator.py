@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Test script for the orchestrator's request paths
+"""
+
+import sys
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conftest import make_orchestrator
+from orchestrator.intent_classifier import AdvancedIntentClassifier
+from utils.metrics import metrics, MetricsRegistry, StageTimings
+from utils.admission import AdmissionController, AgentOverloaded
+
+
+def test_dispatch_skips_classification(orch):
+
+    def fail(*args, **kwargs):
+        raise AssertionError("dispatch must not classify or detect language")
+
+    orch.detect_language = fail
+    orch.intent_clf.classify_intent, original = fail, orch.intent_clf.classify_intent
+    try:
+        response = orch.dispatch("risk", {"location": "Punjab", "crop": "wheat"})
+    finally:
+        orch.intent_clf.classify_intent = original
+
+    assert response['success'] is True
+    assert response['intent'] == 'risk_assessment'
+    assert response['agent_used'] == 'risk'
+    assert response['result']['location'] == 'Punjab'
+
+
+def test_dispatch_unknown_agent(orch):
+    response = orch.dispatch("weather", {})
+    assert response['success'] is False
+
+
+def test_handle_query_records_stage_timings(orch):
+    timings = StageTimings()
+    orch.handle_query("What will be the price of wheat next month?", {}, timings=timings)
+
+    stages = [name for name, _ in timings.stages]
+    assert stages == ['detect_language', 'to_en', 'classify_intent', 'extract_parameters',
+                      'route_to_agent', 'generate_natural_response', 'generate_response']
+    assert timings.server_timing_header().startswith('detect_language;dur=')
+
+    exposition = metrics.render_prometheus()
+    assert 'demeter_stage_duration_seconds_bucket{stage="classify_intent"' in exposition
+    assert 'demeter_agent_predict_duration_seconds_count{agent=' in exposition
+
+
+def test_metrics_are_summed_over_workers():
+    shared_dir = tempfile.mkdtemp()
+    # Another worker's published snapshot
+    other = MetricsRegistry()
+    other.rejected_requests.inc(agent='risk')
+    other.agent_predict_duration.observe(0.002, agent='risk')
+    other.shared_dir = shared_dir
+    other.flush()
+    os.replace(os.path.join(shared_dir, f"{os.getpid()}.json"), os.path.join(shared_dir, "1.json"))
+
+    worker = MetricsRegistry()
+    worker.rejected_requests.inc(2, agent='risk')
+    worker.enable_shared(shared_dir, interval=0)
+    exposition = worker.render_prometheus()
+
+    assert exposition.startswith(f"# Demeter metrics from worker pids 1,{os.getpid()}\n")
+    assert 'demeter_rejected_requests_total{agent="risk"} 3' in exposition
+    assert 'demeter_agent_predict_duration_seconds_count{agent="risk"} 1' in exposition
+
+
+def test_agent_deadline_falls_back_to_heuristic(orch):
+    orch.agent_timeout = 0.2
+    risk = orch.agents['risk']
+    original = risk.process_query
+
+    def slow_query(text, payload):
+        time.sleep(1.0)
+        return original(text, payload)
+
+    risk.process_query = slow_query
+    started = time.perf_counter()
+    response = orch.dispatch("risk", {"location": "Punjab", "temperature": 40})
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.9
+    assert response['degraded'] is True
+    assert response['result']['overall_risk_level'] in ('low', 'medium', 'high')
+
+
+def test_query_stream_event_order(orch):
+    events = list(orch.handle_query_stream("What will be the price of wheat next month?", {}))
+
+    assert [event['event'] for event in events] == ['intent', 'result', 'answer']
+    assert events[0]['intent'] == events[2]['intent']
+    assert events[1]['result'] == events[2]['result']
+
+
+def test_identical_concurrent_requests_are_coalesced(orch):
+    risk = orch.agents['risk']
+    original = risk.process_query
+    calls = []
+
+    def slow_query(text, payload):
+        calls.append(1)
+        time.sleep(0.3)
+        return original(text, payload)
+
+    risk.process_query = slow_query
+    params = {"location": "Punjab", "crop": "wheat"}
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        responses = list(pool.map(lambda _: orch.dispatch("risk", dict(params)), range(5)))
+
+    assert len(calls) == 1
+    assert all(r['result'] == responses[0]['result'] for r in responses)
+    assert orch.get_coalescing_stats()['coalesced'] == 4
+
+
+def test_full_agent_queue_sheds_load(orch):
+    orch.admission = AdmissionController(default_concurrency=1, max_queue=0)
+    risk = orch.agents['risk']
+    original = risk.process_query
+
+    def slow_query(text, payload):
+        time.sleep(0.5)
+        return original(text, payload)
+
+    risk.process_query = slow_query
+
+    def call(i):
+        try:
+            return orch.dispatch("risk", {"location": f"District {i}"})
+        except AgentOverloaded as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        outcomes = list(pool.map(call, range(3)))
+
+    rejected = [o for o in outcomes if isinstance(o, AgentOverloaded)]
+    assert len(rejected) == 2
+    assert all(e.retry_after >= 1 for e in rejected)
+
+    stats = orch.get_agent_status()['risk']['admission']
+    assert stats['admitted'] == 1 and stats['rejected'] == 2
+    assert stats['in_flight'] == 0 and stats['avg_service_time'] >= 0.5
+
+
+def test_warm_up_exercises_every_agent_before_ready(orch):
+    assert orch.is_ready() is False
+
+    report = orch.warm_up()
+
+    assert orch.is_ready() is True
+    assert set(report['agents']) == set(orch.agents)
+    assert report['intent_classifier'] is not None
+    assert report['errors'] == {}
+
+
+def test_warm_up_loads_the_intent_pipeline(orch):
+    orch.intent_clf = AdvancedIntentClassifier(artifact_path=os.path.join(tempfile.mkdtemp(), "intent.joblib"))
+    orch.intent_clf.cascade = True
+    # Decided by keywords alone, so classifying it never needs the model
+    assert orch.intent_clf._cascade_intent(orch.WARMUP_QUERY) is not None
+
+    orch.warm_up()
+    assert orch.intent_clf._pipeline_ready and orch.intent_clf._pipeline is not None
+
+
+def test_compound_query_fans_out_to_agents_concurrently(orch):
+    orch.multi_intent = True
+    calls = []
+
+    for name in ('market_yield', 'risk'):
+        agent = orch.agents[name]
+
+        def slow_query(text, payload, original=agent.process_query, name=name):
+            calls.append(name)
+            time.sleep(0.4)
+            return original(text, payload)
+
+        agent.process_query = slow_query
+
+    started = time.perf_counter()
+    events = list(orch.handle_query_stream("Predict wheat prices and the pest risk", {}))
+    elapsed = time.perf_counter() - started
+
+    assert sorted(calls) == ['market_yield', 'risk']
+    assert elapsed < 0.75
+    assert [event['event'] for event in events] == ['intent', 'result', 'result', 'answer']
+    assert [i['intent'] for i in events[0]['intents']] == ['market_yield', 'risk_assessment']
+
+    response = events[-1]
+    assert response['intent'] == 'market_yield' and response['agent_used'] == 'market_yield'
+    assert [extra['agent_used'] for extra in response['additional_results']] == ['risk']
+    assert response['answer'].count("\n\n") == 1
+
+
+def test_single_intent_query_is_not_fanned_out(orch):
+    orch.multi_intent = True
+    response = orch.handle_query("What will be the price of wheat next month?", {})
+
+    assert response['intent'] == 'market_yield'
+    assert 'additional_results' not in response
+
+
+def test_low_margin_query_runs_top_two_agents_speculatively(orch):
+    orch.speculative_execution = True
+    calls = []
+
+    for name in ('market_yield', 'finance'):
+        agent = orch.agents[name]
+
+        def slow_query(text, payload, original=agent.process_query, name=name):
+            calls.append(name)
+            time.sleep(0.4)
+            return original(text, payload)
+
+        agent.process_query = slow_query
+
+    # "loan" alone would decide the intent in the keyword cascade, with no runner-up
+    orch.intent_clf.cascade, cascade = False, orch.intent_clf.cascade
+    try:
+        started = time.perf_counter()
+        response = orch.handle_query("crop loan for wheat seeds", {})
+        elapsed = time.perf_counter() - started
+    finally:
+        orch.intent_clf.cascade = cascade
+
+    assert sorted(calls) == ['finance', 'market_yield']
+    assert elapsed < 0.75
+    # The classifier prefers market_yield, but the query fills finance's parameters better
+    assert response['speculative'] is True
+    assert response['intent'] == 'finance_agent' and response['agent_used'] == 'finance'
+    assert response['parameters']['loan_type'] == 'crop loan'
+    assert response['alternative']['intent'] == 'market_yield'
+    assert response['alternative']['agent_used'] == 'market_yield'
+
+
+def test_confident_query_is_not_run_speculatively(orch):
+    orch.speculative_execution = True
+    response = orch.handle_query("What will be the price of wheat next month?", {})
+
+    assert response['intent'] == 'market_yield'
+    assert 'alternative' not in response
+
+
+if __name__ == "__main__":
+    test_dispatch_skips_classification(make_orchestrator())
+    test_dispatch_unknown_agent(make_orchestrator())
+    test_handle_query_records_stage_timings(make_orchestrator())
+    test_metrics_are_summed_over_workers()
+    test_agent_deadline_falls_back_to_heuristic(make_orchestrator())
+    test_query_stream_event_order(make_orchestrator())
+    test_identical_concurrent_requests_are_coalesced(make_orchestrator())
+    test_full_agent_queue_sheds_load(make_orchestrator())
+    test_warm_up_exercises_every_agent_before_ready(make_orchestrator())
+    test_warm_up_loads_the_intent_pipeline(make_orchestrator())
+    test_compound_query_fans_out_to_agents_concurrently(make_orchestrator())
+    test_single_intent_query_is_not_fanned_out(make_orchestrator())
+    test_low_margin_query_runs_top_two_agents_speculatively(make_orchestrator())
+    test_confident_query_is_not_run_speculatively(make_orchestrator())
+    print("✅ Orchestrator tests passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for single-pass parameter extraction
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.parameter_extraction import parameter_extractor, extract_location
+from orchestrator.intent_classifier import intent_classifier
+
+
+def test_soil_and_climate_values():
+    facts = parameter_extractor.extract(
+        "I have soil with pH 7.2, nitrogen 45, phosphorus 23, potassium 67, "
+        "temperature 28°C, humidity 75%, rainfall 120mm"
+    )
+    assert {key: facts[key] for key in ('ph', 'N', 'P', 'K', 'temperature', 'humidity', 'rainfall')} == {
+        'ph': 7.2, 'N': 45.0, 'P': 23.0, 'K': 67.0, 'temperature': 28.0, 'humidity': 75.0, 'rainfall': 120.0
+    }
+    assert parameter_extractor.extract("ph6.5 n90 p:40 k = 30") == {
+        'ph': 6.5, 'N': 90.0, 'P': 40.0, 'K': 30.0, 'numbers': [6.5, 90.0, 40.0, 30.0]
+    }
+    # Single-letter nutrients only count as whole words
+    assert 'N' not in parameter_extractor.extract("plant in 5 acres")
+
+
+def test_units_win_over_keywords():
+    facts = parameter_extractor.extract("temperature is 86 degrees fahrenheit on 2 hectares")
+    assert facts['temperature'] == 30.0
+    assert facts['area_hectares'] == 2.0
+    assert parameter_extractor.extract("rs 2.5 lakh")['amount'] == 250000.0
+    assert parameter_extractor.extract("Rs.50,000 for seeds")['amount'] == 50000.0
+    assert parameter_extractor.extract("200 mm rain expected")['rainfall'] == 200.0
+
+
+def test_first_area_quantity_and_timeframe():
+    facts = parameter_extractor.extract("50 square meters and 3 acres, 20 bags or 2 tonnes in 10 days next week")
+    assert facts['area_sqm'] == 50.0 and 'area_acres' not in facts
+    assert facts['quantity_bags'] == 20.0 and 'quantity_tons' not in facts
+    assert facts['timeframe'] == {'value': 10, 'unit': 'days'}
+    assert parameter_extractor.extract("prices next month")['timeframe'] == {'value': 1, 'unit': 'months'}
+
+
+def test_location():
+    assert extract_location("Predict wheat prices in Punjab with 500 quintals") == "Punjab"
+    assert extract_location("Flood risk near Cuttack district") == "Cuttack"
+    assert extract_location("Nashik district onion prices") == "Nashik"
+    assert extract_location("within Punjab") is None
+    assert extract_location("wheat prices in punjab") is None
+
+
+def test_extract_parameters_keeps_intent_keys():
+    query = "Predict wheat prices for next 3 months in Punjab with 500 quintals, ph 6"
+    params = intent_classifier.extract_parameters(query, 'market_yield')
+    assert params['crop'] == 'wheat'
+    assert params['timeframe'] == {'value': 3, 'unit': 'months'}
+    assert params['quantity_quintals'] == 500.0
+    assert params['location'] == 'Punjab'
+    assert 'ph' not in params
+
+    # A location from the caller is not replaced by one read from the text
+    params = intent_classifier.extract_parameters(query, 'market_yield', {'location': 'Haryana'})
+    assert params['location'] == 'Haryana'
+
+    params = intent_classifier.extract_parameters("Need a crop loan of 2.5 lakh rupees for seeds", 'finance_agent')
+    assert (params['amount'], params['loan_type'], params['purpose']) == (250000.0, 'crop loan', 'seeds')
+
+
+if __name__ == "__main__":
+    test_soil_and_climate_values()
+    test_units_win_over_keywords()
+    test_first_area_quantity_and_timeframe()
+    test_location()
+    test_extract_parameters_keeps_intent_keys()
+    print("✅ Parameter extraction tests passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the image body types accepted by /pest-detection
+"""
+
+import sys
+import os
+import io
+import base64
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+IMAGE = bytes(range(256)) * 16
+
+
+def client():
+    return main.app.test_client()
+
+
+def detect_json(image=IMAGE):
+    return client().post("/pest-detection", json={"image": base64.b64encode(image).decode("ascii"), "crop_type": "wheat"})
+
+
+def detect_multipart(image=IMAGE):
+    return client().post("/pest-detection", content_type="multipart/form-data",
+                         data={"image": (io.BytesIO(image), "leaf.jpg"), "crop_type": "wheat"})
+
+
+def detect_octet_stream(image=IMAGE):
+    return client().post("/pest-detection?crop_type=wheat", data=image,
+                         content_type="application/octet-stream")
+
+
+def test_every_body_type_is_accepted():
+    results = [detect_json(), detect_multipart(), detect_octet_stream()]
+    for response in results:
+        assert response.status_code == 200, response.get_json()
+        assert response.get_json()["ok"] is True
+
+    # The agent sees the same image whichever way it was sent
+    answers = [response.get_json()["answer"] for response in results]
+    assert answers[0] == answers[1] == answers[2]
+
+
+def test_oversize_images_are_rejected():
+    image = b"x" * (main.MAX_IMAGE_SIZE + 1)
+    assert detect_multipart(image).status_code == 413
+    assert detect_octet_stream(image).status_code == 413
+
+
+def test_request_without_an_image_is_rejected():
+    responses = [
+        client().post("/pest-detection", json={"crop_type": "wheat"}),
+        client().post("/pest-detection", content_type="multipart/form-data", data={"crop_type": "wheat"}),
+        client().post("/pest-detection", data=b"", content_type="application/octet-stream"),
+    ]
+    for response in responses:
+        assert response.status_code == 400
+        assert "multipart/form-data" in response.get_json()["accepted_content_types"]
+
+
+def test_stream_is_read_into_one_buffer_of_the_declared_length():
+    with main.app.test_request_context("/pest-detection", method="POST", data=IMAGE,
+                                       content_type="application/octet-stream"):
+        image = main._read_image_stream(main.request.stream, main.MAX_IMAGE_SIZE)
+        assert image.tobytes() == IMAGE
+        assert image.base.nbytes == len(IMAGE)
+
+
+if __name__ == "__main__":
+    test_every_body_type_is_accepted()
+    test_oversize_images_are_rejected()
+    test_request_without_an_image_is_rejected()
+    test_stream_is_read_into_one_buffer_of_the_declared_length()
+    print("✅ Pest upload tests passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the query response cache
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conftest import make_orchestrator
+from utils.response_cache import ResponseCache, canonical_query
+
+
+def response(intent, payload="x", **extra):
+    return {'success': True, 'intent': intent, 'answer': payload, **extra}
+
+
+def test_canonical_query_normalizes_whitespace_and_numbers():
+    assert canonical_query("  What crop for pH 6.50?") == canonical_query("What  crop for pH 6.5")
+    assert canonical_query("Temperature 025.0") == "Temperature 25"
+    # Digit-grouped amounts keep their grouping
+    assert canonical_query("Loan of Rs 1,00,000") == "Loan of Rs 1,00,000"
+    assert canonical_query("wheat price") != canonical_query("rice price")
+    # Case decides whether a place name is recognized
+    assert canonical_query("Drought risk in Punjab") != canonical_query("drought risk in punjab")
+
+
+def test_context_is_part_of_the_key():
+    cache = ResponseCache(1024 * 1024, {}, 60)
+    assert cache.key("Wheat price", {"location": "Punjab", "crop": "wheat"}) == \
+        cache.key("Wheat price ", {"crop": "wheat", "location": "Punjab"})
+    assert cache.key("wheat price", {"location": "Punjab"}) != cache.key("wheat price", {"location": "Bihar"})
+
+
+def test_entries_expire_after_their_intent_ttl():
+    cache = ResponseCache(1024 * 1024, {'market_yield': 0.05, 'crop_recommendation': 60}, 60)
+    cache.put("market", response('market_yield'))
+    cache.put("crop", response('crop_recommendation'))
+    cache.put("failed", {'success': False, 'intent': 'crop_recommendation'})
+    time.sleep(0.1)
+
+    assert cache.get("market") is None
+    assert cache.get("crop")['cached'] is True
+    assert cache.get("failed") is None
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['expired'] == 1
+
+
+def test_least_recently_used_entries_are_evicted_under_the_byte_budget():
+    size = len('{"success": true, "intent": "crop_recommendation", "answer": "' + "a" * 100 + '"}')
+    cache = ResponseCache(size * 2, {}, 60)
+    cache.put("first", response('crop_recommendation', "a" * 100))
+    cache.put("second", response('crop_recommendation', "b" * 100))
+    cache.get("first")
+    cache.put("third", response('crop_recommendation', "c" * 100))
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None and cache.get("third") is not None
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.get_stats()['bytes'] <= size * 2
+
+
+def test_repeated_query_is_served_from_cache(orch):
+    risk = orch.agents['risk']
+    original = risk.process_query
+    calls = []
+
+    def counting_query(text, payload):
+        calls.append(1)
+        return original(text, payload)
+
+    risk.process_query = counting_query
+    first = orch.handle_query("What are the drought risks for my crops this season?", {"location": "Punjab"})
+    second = orch.handle_query("What are the drought risks for my crops  this season", {"location": "Punjab"})
+
+    assert len(calls) == 1
+    assert second['cached'] is True and 'cached' not in first
+    assert second['result'] == first['result']
+    assert orch.response_cache.get_stats()['hits'] == 1
+
+
+def test_place_names_are_not_answered_from_lowercase_queries(orch):
+    lower = orch.handle_query("What is the drought risk in punjab", {})
+    capitalized = orch.handle_query("What is the drought risk in Punjab", {})
+
+    assert 'cached' not in capitalized
+    assert lower['parameters'].get('location') is None
+    assert capitalized['parameters']['location'] == 'Punjab'
+
+
+def test_model_reload_invalidates_its_intent(orch):
+    orch.handle_query("What are the drought risks for my crops this season?", {})
+    orch.handle_query("What will be the price of wheat next month?", {})
+    assert orch.response_cache.get_stats()['entries'] == 2
+
+    orch.reload_agent('risk')
+
+    assert orch.response_cache.get_stats()['entries'] == 1
+    assert 'cached' not in orch.handle_query("What are the drought risks for my crops this season?", {})
+    assert orch.handle_query("What will be the price of wheat next month?", {})['cached'] is True
+
+
+def test_query_rejects_a_context_that_is_not_an_object():
+    import main
+    client = main.app.test_client()
+    for url in ("/query", "/query/stream"):
+        for context in ("Punjab", ["Punjab"], 5):
+            response = client.post(url, json={"text": "What will be the price of wheat next month?", "context": context})
+            assert response.status_code == 400, (url, context)
+            assert response.get_json()["error"] == "context must be a JSON object"
+
+
+if __name__ == "__main__":
+    test_canonical_query_normalizes_whitespace_and_numbers()
+    test_context_is_part_of_the_key()
+    test_entries_expire_after_their_intent_ttl()
+    test_least_recently_used_entries_are_evicted_under_the_byte_budget()
+    test_repeated_query_is_served_from_cache(make_orchestrator())
+    test_place_names_are_not_answered_from_lowercase_queries(make_orchestrator())
+    test_model_reload_invalidates_its_intent(make_orchestrator())
+    test_query_rejects_a_context_that_is_not_an_object()
+    print("✅ Response cache tests passed")
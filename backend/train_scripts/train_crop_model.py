@@ -9,6 +9,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
 from pathlib import Path
 import os
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.model_artifacts import export_forest, mapped_path
 
 def main():
     # 1. Load dataset
@@ -61,6 +65,10 @@ def main():
     joblib.dump(model, model_path)
     print(f"📂 Model saved to {model_path}")
     
+    # Memory-mapped copy that the agents load in preference to the pickle
+    mapped_dir = export_forest(model, mapped_path(model_path))
+    print(f"📂 Memory-mapped artifact saved to {mapped_dir}")
+    
     # Also save to cloud models directory for consistency
     cloud_models_dir = models_dir / "cloud"
     cloud_models_dir.mkdir(exist_ok=True)
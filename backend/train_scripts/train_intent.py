@@ -322,4 +322,17 @@ print(f"\nTraining completed! Final accuracy: {best_score:.1%}")
 if best_score >= 0.80:
     print("🎉 SUCCESS: Achieved 80%+ accuracy target!")
 else:
-    print(f"📈 Current: {best_score:.1%}, Target: 80%+")
\ No newline at end of file
+    print(f"📈 Current: {best_score:.1%}, Target: 80%+")
+
+# Rebuild the runtime intent pipeline artifact that the API loads lazily, so
+# workers never have to fit it on their first query
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+from orchestrator.intent_classifier import AdvancedIntentClassifier
+
+runtime_classifier = AdvancedIntentClassifier()
+runtime_classifier.train()
+print(f"\nRuntime intent pipeline saved to {runtime_classifier.artifact_path} "
+      f"(training data {runtime_classifier.training_hash[:12]})")
+print(f"Keyword cascade threshold {runtime_classifier.cascade_threshold:.4f} "
+      f"(keyword precision {runtime_classifier.cascade_precision:.1%} on the intent examples)")
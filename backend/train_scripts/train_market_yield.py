@@ -9,8 +9,12 @@ from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.preprocessing import StandardScaler
 import pickle
 import logging
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.model_artifacts import export_forest, mapped_path
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -140,6 +144,13 @@ def save_model(model, model_path, model_name):
         
         logger.info(f"{model_name} model saved to {model_path}")
         
+        # Memory-mapped copy shared by all workers; boosted models stay pickle-only
+        try:
+            mapped_dir = export_forest(model, mapped_path(model_path))
+            logger.info(f"{model_name} memory-mapped artifact saved to {mapped_dir}")
+        except TypeError as e:
+            logger.info(f"No memory-mapped artifact for {model_name} model: {e}")
+        
     except Exception as e:
         logger.error(f"Error saving {model_name} model: {e}")
 
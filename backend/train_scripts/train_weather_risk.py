@@ -9,8 +9,12 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix
 import pickle
 import logging
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.model_artifacts import export_forest
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -157,6 +161,11 @@ def save_model(model_package, model_path):
         
         logger.info(f"Weather risk model saved to {model_path}")
         
+        # The pickle holds the scaler and columns too, so the forest gets its own
+        # artifact name: a weather_risk.mmap would be loaded in place of the package
+        mapped_dir = export_forest(model_package['model'], str(model_path.with_name("weather_risk_forest.mmap")))
+        logger.info(f"Weather risk forest memory-mapped artifact saved to {mapped_dir}")
+        
     except Exception as e:
         logger.error(f"Error saving model: {e}")
 
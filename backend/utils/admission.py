@@ -0,0 +1,127 @@
+"""
+Admission control: per-agent concurrency limits with bounded wait queues
+"""
+import math
+import threading
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AgentOverloaded(Exception):
+    """Raised when an agent's queue is full or a queued request waited too long"""
+
+    def __init__(self, agent: str, retry_after: int):
+        super().__init__(f"Agent {agent} is overloaded, retry after {retry_after}s")
+        self.agent = agent
+        self.retry_after = retry_after
+
+
+class AgentGate:
+    """Limits how many requests one agent serves at once and how many may wait"""
+
+    # Weight of the newest sample in the service time moving average
+    SMOOTHING = 0.2
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.service_time: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Take a slot, waiting in the queue if the agent is busy.
+
+        Raises AgentOverloaded when the queue is already full or no slot
+        frees up within timeout seconds.
+        """
+        with self._cond:
+            if self.in_flight < self.max_concurrency and self.queued == 0:
+                self.in_flight += 1
+                self.admitted += 1
+                return
+
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise AgentOverloaded(self.name, self._retry_after())
+
+            self.queued += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self.in_flight < self.max_concurrency, timeout)
+            finally:
+                self.queued -= 1
+
+            if not admitted:
+                self.rejected += 1
+                raise AgentOverloaded(self.name, self._retry_after())
+            self.in_flight += 1
+            self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None):
+        """Free a slot, folding the observed service time into the average"""
+        with self._cond:
+            self.in_flight -= 1
+            if service_time is not None:
+                if self.service_time is None:
+                    self.service_time = service_time
+                else:
+                    self.service_time += self.SMOOTHING * (service_time - self.service_time)
+            self._cond.notify()
+
+    def reset_service_time(self):
+        """Forget the observed service time, e.g. after the agent's model changed"""
+        with self._cond:
+            self.service_time = None
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained (caller holds the lock)"""
+        service_time = self.service_time if self.service_time is not None else 1.0
+        backlog = self.in_flight + self.queued + 1
+        return max(1, math.ceil(service_time * backlog / self.max_concurrency))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'in_flight': self.in_flight,
+                'queue_depth': self.queued,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_service_time': round(self.service_time, 4) if self.service_time is not None else None
+            }
+
+
+class AdmissionController:
+    """Holds one gate per agent, created on first use"""
+
+    def __init__(self, default_concurrency: int, max_queue: int,
+                 limits: Optional[Dict[str, int]] = None):
+        self.default_concurrency = default_concurrency
+        self.max_queue = max_queue
+        self.limits = limits or {}
+        self._gates: Dict[str, AgentGate] = {}
+        self._lock = threading.Lock()
+
+    def concurrency_for(self, agent_name: str) -> int:
+        return self.limits.get(agent_name, self.default_concurrency)
+
+    def gate(self, agent_name: str) -> AgentGate:
+        gate = self._gates.get(agent_name)
+        if gate is None:
+            with self._lock:
+                gate = self._gates.get(agent_name)
+                if gate is None:
+                    gate = AgentGate(agent_name, self.concurrency_for(agent_name), self.max_queue)
+                    self._gates[agent_name] = gate
+        return gate
+
+    def get_stats(self, agent_name: str) -> Dict[str, Any]:
+        return self.gate(agent_name).get_stats()
@@ -0,0 +1,73 @@
+"""
+Versioned on-disk artifact for the intent classification pipeline.
+
+The artifact records the hash of the training examples and pipeline
+configuration it was fitted on, so callers can tell whether it is still
+current without refitting. It is written by the runtime classifier on a
+cache miss and by train_scripts/train_intent.py ahead of deployment.
+"""
+import os
+import json
+import time
+import hashlib
+import joblib
+import sklearn
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+
+
+def training_hash(examples: Dict[str, List[str]], pipeline: Any) -> str:
+    """sha256 over the labelled examples and the pipeline's configuration"""
+    content = json.dumps({'examples': examples, 'pipeline': str(pipeline)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def save_intent_pipeline(pipeline: Any, path: str, data_hash: str, **metadata) -> str:
+    """Write a fitted pipeline with its training hash; readers never see a partial file"""
+    path = str(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    artifact = {
+        'version': ARTIFACT_VERSION,
+        'training_hash': data_hash,
+        'sklearn_version': sklearn.__version__,
+        'classes': [str(c) for c in pipeline.classes_],
+        'trained_at': time.time(),
+        'pipeline': pipeline,
+        **metadata
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved intent pipeline to {path}")
+    return path
+
+
+def load_intent_pipeline(path: str, data_hash: str) -> Optional[Any]:
+    """
+    The stored pipeline if it was fitted on exactly this training data.
+
+    Returns None when the file is missing, unreadable, from another
+    artifact or scikit-learn version, or fitted on different examples.
+    """
+    path = str(path)
+    if not os.path.exists(path):
+        return None
+    try:
+        artifact = joblib.load(path)
+    except Exception as e:
+        logger.warning(f"Could not read intent pipeline {path}: {e}")
+        return None
+    if not isinstance(artifact, dict) or artifact.get('version') != ARTIFACT_VERSION:
+        logger.info(f"Intent pipeline {path} has an old format, retraining")
+        return None
+    if artifact.get('sklearn_version') != sklearn.__version__:
+        logger.info(f"Intent pipeline {path} was built with scikit-learn {artifact.get('sklearn_version')}, retraining")
+        return None
+    if artifact.get('training_hash') != data_hash:
+        logger.info(f"Intent training data changed since {path} was built, retraining")
+        return None
+    return artifact['pipeline']
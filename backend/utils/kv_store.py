@@ -0,0 +1,117 @@
+"""
+Small persistent key-value store on SQLite, shared safely by worker processes
+"""
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KVStore:
+    """
+    JSON values keyed by string in a single SQLite table.
+
+    The database runs in WAL mode, so readers never block the writer and
+    every get or set touches one row instead of rewriting the whole store.
+    Each thread of each process opens its own connection; SQLite's locking
+    keeps concurrent writers from several serve.py workers consistent.
+    """
+
+    def __init__(self, path: str, legacy_json: Optional[str] = None, timeout: float = 30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        # Store bookkeeping, kept out of kv so it never shows up as a cache entry
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if legacy_json:
+            self._migrate(str(legacy_json))
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, reopened after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            # WAL is durable across application crashes at NORMAL; only an OS crash can lose the last commits
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _migrate(self, json_path: str):
+        """
+        Import a JSON object file written by the old cache, once.
+
+        Runs inside a write transaction so concurrent workers do not both
+        import it; existing keys win. The file itself is left in place (it
+        may be under version control) and the import is recorded in the
+        meta table instead.
+        """
+        if not os.path.exists(json_path):
+            return
+        marker = f"migrated:{os.path.basename(json_path)}"
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+                # Imported before, possibly by another worker while this one waited for the lock
+                conn.execute("ROLLBACK")
+                return
+            try:
+                with open(json_path) as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                conn.execute("ROLLBACK")
+                return
+            except ValueError as e:
+                logger.error(f"Could not migrate {json_path}: {e}")
+                conn.execute("ROLLBACK")
+                return
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO kv (key, value, updated_at) VALUES (?, ?, ?)",
+                [(str(key), json.dumps(value), now) for key, value in (data or {}).items()]
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (marker, json.dumps(now)))
+            conn.execute("COMMIT")
+            logger.info(f"Migrated {len(data or {})} cache entries from {json_path} to {self.path}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._connection().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO kv (key, value, updated_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time())
+        )
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM kv")
+
+    def items(self) -> Dict[str, Any]:
+        """Every key and value; for inspection and export, not the hot path"""
+        rows = self._connection().execute("SELECT key, value FROM kv").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM kv").fetchone()[0]
@@ -0,0 +1,82 @@
+"""
+Language detection: Unicode script first, langdetect only for ambiguous Latin text
+"""
+from functools import lru_cache
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from langdetect import DetectorFactory, detect as langdetect_detect
+    from langdetect.lang_detect_exception import LangDetectException
+    # langdetect is random by default; a fixed seed makes the same text always get the same answer
+    DetectorFactory.seed = 0
+except ImportError as e:
+    logger.warning(f"langdetect not available: {e}. Latin-script text will be treated as English.")
+    langdetect_detect = None
+    LangDetectException = Exception
+
+# Unicode blocks of the non-Latin scripts we serve, by code point >> 7 (each block is 128-aligned)
+SCRIPT_BLOCKS = {
+    0x0400 >> 7: 'ru',  # Cyrillic U+0400-047F
+    0x0480 >> 7: 'ru',  # Cyrillic U+0480-04FF
+    0x0900 >> 7: 'hi',  # Devanagari U+0900-097F
+    0x0B80 >> 7: 'ta',  # Tamil U+0B80-0BFF
+    0x0C00 >> 7: 'te',  # Telugu U+0C00-0C7F
+    0x0C80 >> 7: 'kn',  # Kannada U+0C80-0CFF
+    0x0D00 >> 7: 'ml',  # Malayalam U+0D00-0D7F
+}
+
+# Languages langdetect may answer for Latin-script text; anything else it says is taken as English
+LATIN_LANGUAGES = frozenset({'en', 'fr', 'es'})
+DEFAULT_LANGUAGE = 'en'
+
+
+def script_language(text: str) -> Optional[str]:
+    """
+    Language implied by the script of the text, in one pass over it.
+
+    Returns the language whose script has the most letters when those
+    outnumber Latin letters, and None for Latin (or other) text.
+    """
+    counts = {}
+    latin = 0
+    for ch in text:
+        code = ord(ch)
+        if code < 0x80:
+            if ch.isalpha():
+                latin += 1
+            continue
+        language = SCRIPT_BLOCKS.get(code >> 7)
+        if language is not None:
+            counts[language] = counts.get(language, 0) + 1
+    if not counts:
+        return None
+    language = max(counts, key=counts.get)
+    return language if counts[language] > latin else None
+
+
+@lru_cache(maxsize=4096)
+def _detect_latin(text: str) -> str:
+    """Seeded langdetect, limited to the Latin-script languages we serve"""
+    if langdetect_detect is None:
+        return DEFAULT_LANGUAGE
+    try:
+        language = langdetect_detect(text)
+    except LangDetectException:
+        return DEFAULT_LANGUAGE
+    return language if language in LATIN_LANGUAGES else DEFAULT_LANGUAGE
+
+
+def detect_language(text: str) -> str:
+    """
+    Detect the language code of a query.
+
+    Tamil, Telugu, Kannada, Malayalam, Hindi (Devanagari) and Russian
+    (Cyrillic) are recognised from their Unicode blocks without a model.
+    Only the remaining text goes to langdetect, whose answers are cached.
+    """
+    if not text or not text.strip():
+        return DEFAULT_LANGUAGE
+    return script_language(text) or _detect_latin(text.strip())
@@ -0,0 +1,298 @@
+"""
+In-process latency metrics with Prometheus text exposition
+
+Under serve.py every worker keeps its own metrics. With ``enable_shared``
+each worker also publishes a snapshot to ``<directory>/<pid>.json``, and
+/metrics renders the sum over all workers' snapshots.
+"""
+import os
+import bisect
+import glob
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond regex work up to mT5 generation
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape_label(value: Any) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """Record one observation"""
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> List[Any]:
+        """[labels, bucket counts, sum, count] per series"""
+        with self._lock:
+            return [[list(key), list(series[0]), series[1], series[2]] for key, series in self._series.items()]
+
+    def merge(self, snapshot: List[Any]):
+        """Add another process's snapshot into this histogram"""
+        with self._lock:
+            for key, counts, total, count in snapshot:
+                series = self._series.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+
+    def render(self) -> List[str]:
+        """Render the histogram in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1], series[2])
+                        for key, series in sorted(self._series.items())]
+
+        for key, counts, total, count in snapshot:
+            label_text = ','.join(f'{name}="{_escape_label(value)}"'
+                                  for name, value in zip(self.label_names, key))
+            prefix = f"{label_text}," if label_text else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the counter for the given labels"""
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> List[Any]:
+        """[labels, value] per series"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, snapshot: List[Any]):
+        """Add another process's snapshot into this counter"""
+        with self._lock:
+            for key, value in snapshot:
+                self._values[tuple(key)] = self._values.get(tuple(key), 0) + value
+
+    def render(self) -> List[str]:
+        """Render the counter in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for key, count in snapshot:
+            label_text = ','.join(f'{name}="{_escape_label(value)}"'
+                                  for name, value in zip(self.label_names, key))
+            lines.append(f"{self.name}{{{label_text}}} {count}")
+        return lines
+
+
+class StageTimings:
+    """Durations of the pipeline stages of a single request, in order"""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of code as the named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def record(self, name: str, seconds: float):
+        """Add a stage measured elsewhere"""
+        self.stages.append((name, seconds))
+
+    def total(self) -> float:
+        """Seconds since the timings object was created"""
+        return time.perf_counter() - self.started
+
+    def server_timing_header(self) -> str:
+        """Format the stages as a Server-Timing header value (milliseconds)"""
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages]
+        entries.append(f"total;dur={self.total() * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class MetricsRegistry:
+    """Holds the process-wide histograms and renders them for /metrics"""
+
+    def __init__(self):
+        self.shared_dir: Optional[str] = None
+        self._flusher = None
+        self.stage_duration = Histogram(
+            "demeter_stage_duration_seconds",
+            "Duration of each query pipeline stage",
+            ("stage", "intent", "agent", "language")
+        )
+        self.query_duration = Histogram(
+            "demeter_query_duration_seconds",
+            "End-to-end duration of orchestrated queries",
+            ("intent", "agent", "language")
+        )
+        self.agent_predict_duration = Histogram(
+            "demeter_agent_predict_duration_seconds",
+            "Duration of agent predict calls",
+            ("agent",)
+        )
+        self.coalesced_requests = Counter(
+            "demeter_coalesced_requests_total",
+            "Requests answered by waiting on an identical in-flight request",
+            ("kind",)
+        )
+        self.rejected_requests = Counter(
+            "demeter_rejected_requests_total",
+            "Requests shed because an agent's queue was full",
+            ("agent",)
+        )
+        self.model_reloads = Counter(
+            "demeter_model_reloads_total",
+            "Hot model reload attempts by outcome",
+            ("agent", "outcome")
+        )
+        self.response_cache = Counter(
+            "demeter_response_cache_lookups_total",
+            "Query response cache lookups by outcome",
+            ("outcome",)
+        )
+        self.intent_classifications = Counter(
+            "demeter_intent_classifications_total",
+            "Intent classifications by the path that decided them",
+            ("path",)
+        )
+        self._histograms = [self.stage_duration, self.query_duration, self.agent_predict_duration]
+        self._counters = [self.coalesced_requests, self.rejected_requests, self.model_reloads,
+                          self.response_cache, self.intent_classifications]
+
+    def record_stages(self, timings: StageTimings, intent: Optional[str],
+                      agent: Optional[str], language: Optional[str]):
+        """Record every stage of a finished request under its final labels"""
+        labels = {'intent': intent or 'unknown', 'agent': agent or 'none', 'language': language or 'unknown'}
+        for stage, seconds in timings.stages:
+            self.stage_duration.observe(seconds, stage=stage, **labels)
+        self.query_duration.observe(timings.total(), **labels)
+
+    @contextmanager
+    def time_agent(self, agent: str):
+        """Time an agent predict call"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.agent_predict_duration.observe(time.perf_counter() - start, agent=agent)
+
+    def _metrics(self) -> list:
+        return self._histograms + self._counters
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every series of every metric, keyed by metric name"""
+        return {metric.name: metric.snapshot() for metric in self._metrics()}
+
+    def enable_shared(self, directory: str, interval: float):
+        """
+        Publish this process's metrics to directory every interval seconds.
+
+        Called in each serve.py worker. Snapshots of workers that exited are
+        kept, so totals never go backwards when a worker is restarted.
+        """
+        self.shared_dir = directory
+        self.flush()
+        if self._flusher is None and interval > 0:
+            stop = threading.Event()
+
+            def run():
+                while not stop.wait(interval):
+                    try:
+                        self.flush()
+                    except OSError as e:
+                        logger.warning(f"Could not publish metrics: {e}")
+
+            self._flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+            self._flusher.start()
+
+    def flush(self):
+        """Write this process's snapshot to the shared directory"""
+        if not self.shared_dir:
+            return
+        path = os.path.join(self.shared_dir, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+    def _aggregate(self) -> Tuple["MetricsRegistry", List[int]]:
+        """A registry holding the sum of every worker's published snapshot, and those workers' pids"""
+        self.flush()
+        total = MetricsRegistry()
+        pids = []
+        for path in sorted(glob.glob(os.path.join(self.shared_dir, "*.json"))):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            pids.append(int(os.path.basename(path)[:-len(".json")]))
+            for metric in total._metrics():
+                metric.merge(snapshot.get(metric.name, []))
+        return total, pids
+
+    def render_prometheus(self) -> str:
+        """
+        Render all histograms and counters in Prometheus text exposition format.
+
+        With a shared directory the values are summed over every worker;
+        other workers' contributions are at most one flush interval old.
+        """
+        source, pids = self, [os.getpid()]
+        if self.shared_dir:
+            source, pids = self._aggregate()
+        lines = [f"# Demeter metrics from worker pids {','.join(map(str, sorted(pids)))}"]
+        for metric in source._metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics instance
+metrics = MetricsRegistry()
@@ -0,0 +1,270 @@
+"""
+Memory-mapped model artifacts for tree ensembles.
+
+scikit-learn copies every tree's node arrays onto the heap when a forest is
+unpickled, even with joblib's mmap_mode, so each worker process ends up with
+its own copy. This module stores a fitted forest as flat, uncompressed .npy
+arrays (all trees concatenated) in a ``<name>.mmap`` directory next to the
+pickle. The arrays are opened read-only memory-mapped and the forest is
+evaluated with numpy, so every process on a machine shares one page-cache
+copy and loading costs almost nothing.
+
+Usage:
+    python utils/model_artifacts.py models/crop_model.pkl [more.pkl ...]
+"""
+import os
+import sys
+import json
+import hashlib
+import joblib
+import numpy as np
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from ..config import USE_MAPPED_MODELS
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import USE_MAPPED_MODELS
+
+ARTIFACT_SUFFIX = ".mmap"
+FORMAT_VERSION = 2
+_ARRAYS = ("feature", "threshold", "children_left", "children_right", "missing_go_to_left", "value", "roots")
+
+
+def mapped_path(path: str) -> str:
+    """Artifact directory that sits next to a pickle: models/crop_model.pkl -> models/crop_model.mmap"""
+    return os.path.splitext(str(path))[0] + ARTIFACT_SUFFIX
+
+
+def source_path(directory: str) -> str:
+    """Pickle a mapped artifact is exported from: models/crop_model.mmap -> models/crop_model.pkl"""
+    return os.path.splitext(str(directory))[0] + ".pkl"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_forest(model: Any, directory: str) -> str:
+    """
+    Write a fitted single-output random forest / extra-trees model as a mapped artifact.
+
+    When the pickle next to the artifact exists, its hash is recorded so
+    load_model can tell when the pickle is later replaced.
+    Raises TypeError for anything that is not a tree ensemble.
+    """
+    estimators = getattr(model, "estimators_", None)
+    # Gradient boosting keeps a 2-D array of trees and is not supported
+    if estimators is None or len(estimators) == 0 or not all(hasattr(tree, "tree_") for tree in estimators):
+        raise TypeError(f"{type(model).__name__} is not a fitted tree ensemble")
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise TypeError("Only single-output forests can be exported")
+
+    is_classifier = hasattr(model, "classes_")
+    features, thresholds, lefts, rights, missing_left, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        leaf = tree.children_left == -1
+
+        # Leaves keep -1 children; their feature index is pointed at column 0
+        # so traversal can index X without a mask
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(leaf, -1, tree.children_left + offset).astype(np.int64))
+        rights.append(np.where(leaf, -1, tree.children_right + offset).astype(np.int64))
+        # Side each node sends NaN to; scikit-learn versions without
+        # missing-value support reject NaN before reaching the trees
+        missing = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(np.zeros(tree.node_count, dtype=bool) if missing is None
+                            else np.asarray(missing).astype(bool))
+
+        if is_classifier:
+            # Leaf class distributions normalized the way DecisionTreeClassifier.predict_proba does
+            value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+        else:
+            values.append(tree.value[:, 0, :1].astype(np.float64))
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, "meta.json")
+    if os.path.exists(meta_path):
+        # Readers fall back to the pickle while the arrays are replaced
+        os.remove(meta_path)
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "children_left": np.concatenate(lefts),
+        "children_right": np.concatenate(rights),
+        "missing_go_to_left": np.concatenate(missing_left),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int64)
+    }
+    for name, array in arrays.items():
+        # Write a new file and rename it into place: truncating a file that
+        # running workers have mapped would crash them with SIGBUS
+        target = os.path.join(directory, f"{name}.npy")
+        with open(target + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(target + ".tmp", target)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "kind": "classifier" if is_classifier else "regressor",
+        "model_class": type(model).__name__,
+        "n_features_in": int(model.n_features_in_),
+        "n_estimators": len(estimators),
+        "max_depth": int(max(estimator.tree_.max_depth for estimator in estimators)),
+        "classes": np.asarray(model.classes_).tolist() if is_classifier else None,
+        "source_sha256": _file_sha256(source_path(directory)) if os.path.exists(source_path(directory)) else None
+    }
+    # meta.json is written last so a half-written artifact is never picked up
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+    return directory
+
+
+class MappedForest:
+    """Read-only forest evaluated with numpy over memory-mapped node arrays"""
+
+    def __init__(self, directory: str, meta: dict):
+        self.directory = directory
+        self.n_features_in_ = meta["n_features_in"]
+        self.n_estimators = meta["n_estimators"]
+        self.max_depth = meta["max_depth"]
+        for name in _ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+
+    def apply(self, X) -> np.ndarray:
+        """Global leaf index reached by each sample in each tree, shape (n_samples, n_estimators)"""
+        # Trees compare float32 features against float64 thresholds, as in scikit-learn
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input with {self.n_features_in_} features, got shape {X.shape}")
+
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.tile(np.asarray(self.roots), (X.shape[0], 1))
+        for _ in range(self.max_depth):
+            left = self.children_left[node]
+            internal = left != -1
+            if not internal.any():
+                break
+            values = X[rows, self.feature[node]]
+            # NaN follows the side recorded at training time, as in scikit-learn
+            go_left = np.where(np.isnan(values), self.missing_go_to_left[node], values <= self.threshold[node])
+            node = np.where(internal, np.where(go_left, left, self.children_right[node]), node)
+        return node
+
+    def _mean_leaf_values(self, X) -> np.ndarray:
+        """Average leaf values over trees, accumulated in tree order like the sklearn forests"""
+        leaves = self.apply(X)
+        total = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        for t in range(self.n_estimators):
+            total += self.value[leaves[:, t]]
+        total /= self.n_estimators
+        return total
+
+
+class MappedForestClassifier(MappedForest):
+
+    def __init__(self, directory: str, meta: dict):
+        super().__init__(directory, meta)
+        self.classes_ = np.asarray(meta["classes"])
+        self.n_classes_ = len(self.classes_)
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self._mean_leaf_values(X)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class MappedForestRegressor(MappedForest):
+
+    def predict(self, X) -> np.ndarray:
+        return self._mean_leaf_values(X)[:, 0]
+
+
+def load_mapped(directory: str) -> MappedForest:
+    """Open a mapped artifact directory"""
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {meta.get('format_version')} in {directory}")
+    if meta["kind"] == "classifier":
+        return MappedForestClassifier(directory, meta)
+    return MappedForestRegressor(directory, meta)
+
+
+def artifact_exists(path: str) -> bool:
+    """True if a pickle or its mapped artifact exists"""
+    return os.path.exists(path) or os.path.exists(os.path.join(mapped_path(path), "meta.json"))
+
+
+def mapped_is_stale(path: str) -> bool:
+    """
+    True when the pickle was replaced after its mapped artifact was exported.
+
+    Only a pickle newer than the artifact's meta.json is hashed, and it is
+    stale only if the hash differs from the one recorded at export (copies
+    and checkouts touch mtimes without changing the model). Artifacts
+    exported without a hash are stale whenever the pickle is newer.
+    """
+    meta_path = os.path.join(mapped_path(path), "meta.json")
+    if not os.path.exists(path) or os.path.getmtime(path) <= os.path.getmtime(meta_path):
+        return False
+    with open(meta_path) as f:
+        recorded = json.load(f).get("source_sha256")
+    return recorded is None or recorded != _file_sha256(path)
+
+
+def load_model(path: str) -> Optional[Any]:
+    """
+    Load a model, preferring the memory-mapped artifact next to the pickle.
+
+    Falls back to joblib.load when there is no artifact, it cannot be read,
+    it is older than a retrained pickle, or USE_MAPPED_MODELS is off.
+    Returns None if neither exists.
+    """
+    directory = mapped_path(path)
+    if USE_MAPPED_MODELS and os.path.exists(os.path.join(directory, "meta.json")):
+        try:
+            if not mapped_is_stale(path):
+                return load_mapped(directory)
+            logger.warning(f"{path} is newer than its mapped artifact {directory}, loading the pickle; "
+                           f"re-export it with: python utils/model_artifacts.py {path}")
+        except Exception as e:
+            logger.warning(f"Could not open mapped artifact {directory}, loading pickle: {e}")
+    if os.path.exists(path):
+        return joblib.load(path)
+    return None
+
+
+def main(paths) -> int:
+    """Convert pickled forests to mapped artifacts next to them"""
+    failures = 0
+    for path in paths:
+        try:
+            directory = export_forest(joblib.load(path), mapped_path(path))
+            print(f"✓ {path} -> {directory}")
+        except Exception as e:
+            failures += 1
+            print(f"✗ {path}: {e}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,247 @@
+"""
+Versioned model registry stored in models/model_metadata.json.
+
+Each model entry keeps its existing descriptive fields (features, classes,
+description) and gains a ``versions`` map plus ``live`` and ``candidate``
+pointers. A registered version records its artifact path, content hash,
+feature schema, size on disk and measured single-row inference latency.
+Registered artifacts are copied under ``versions/<model>/`` so a version
+never changes after registration.
+
+Usage:
+    python utils/model_registry.py list
+    python utils/model_registry.py register crop_model models/crop_model.pkl [--candidate]
+    python utils/model_registry.py candidate crop_model 2
+    python utils/model_registry.py promote crop_model 2
+"""
+import os
+import sys
+import json
+import fcntl
+import time
+import shutil
+import hashlib
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from ..config import MODELS_DIR
+    from .model_artifacts import load_model, load_mapped, ARTIFACT_SUFFIX
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import MODELS_DIR
+    from utils.model_artifacts import load_model, load_mapped, ARTIFACT_SUFFIX
+
+# Single-row predictions timed per registered version
+LATENCY_RUNS = 25
+
+
+def content_hash(path: str) -> str:
+    """sha256 of a pickle, or of every file (name and bytes) in a mapped artifact directory"""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(os.listdir(path))
+    else:
+        files = [None]
+    for name in files:
+        file_path = os.path.join(path, name) if name else path
+        if name:
+            digest.update(name.encode("utf-8"))
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return "sha256:" + digest.hexdigest()
+
+
+def disk_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def measure_latency(model: Any, n_features: int, runs: int = LATENCY_RUNS) -> Dict[str, float]:
+    """p50/p95 milliseconds of single-row predictions on synthetic input"""
+    row = np.random.RandomState(0).rand(1, n_features)
+    predict = getattr(model, "predict_proba", None) or model.predict
+    predict(row)  # first call pays for lazy initialization
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict(row)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50": round(float(np.percentile(samples, 50)), 4),
+        "p95": round(float(np.percentile(samples, 95)), 4)
+    }
+
+
+class ModelRegistry:
+    """
+    Reads and writes model versions in the metadata file.
+
+    The file is re-read on every call and replaced atomically on every
+    write, so separate worker processes always see the latest promotion.
+    Read-modify-write sequences hold an exclusive lock on a ``.lock`` file
+    next to it, so registrations and promotions from different processes
+    never overwrite each other.
+    """
+
+    def __init__(self, metadata_path: str):
+        self.metadata_path = str(metadata_path)
+        self.base_dir = os.path.dirname(self.metadata_path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the in-process lock and the cross-process file lock"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        with self._lock, open(self.metadata_path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.metadata_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, metadata: Dict[str, Any]):
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = self.metadata_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, self.metadata_path)
+
+    def get(self, name: str) -> Dict[str, Any]:
+        return self._read().get(name, {})
+
+    def list_models(self) -> Dict[str, Any]:
+        """Every model entry with its versions and live/candidate pointers"""
+        return self._read()
+
+    def resolve(self, name: str, role: str = "live") -> Optional[str]:
+        """Absolute artifact path of the live or candidate version, None if not registered"""
+        entry = self.get(name)
+        version = entry.get(role)
+        if version is None or version not in entry.get("versions", {}):
+            return None
+        return os.path.join(self.base_dir, entry["versions"][version]["path"])
+
+    def register(self, name: str, source_path: str, description: Optional[str] = None,
+                 features: Optional[List[str]] = None) -> str:
+        """
+        Copy an artifact into the registry as the next version of a model.
+
+        Records hash, size, feature schema and measured latency. The first
+        version of a model becomes live; later ones only become live when
+        promoted.
+        """
+        model = load_mapped(source_path) if os.path.isdir(source_path) else load_model(source_path)
+        if model is None:
+            raise FileNotFoundError(source_path)
+
+        with self._locked():
+            metadata = self._read()
+            entry = metadata.setdefault(name, {})
+            versions = entry.setdefault("versions", {})
+            version = str(max((int(v) for v in versions), default=0) + 1)
+
+            extension = ARTIFACT_SUFFIX if os.path.isdir(source_path) else os.path.splitext(source_path)[1]
+            relative_path = os.path.join("versions", name, f"{version}{extension}")
+            target = os.path.join(self.base_dir, relative_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.isdir(source_path):
+                shutil.copytree(source_path, target)
+            else:
+                shutil.copy2(source_path, target)
+
+            n_features = getattr(model, "n_features_in_", None)
+            classes = getattr(model, "classes_", None)
+            record = {
+                "path": relative_path,
+                "hash": content_hash(target),
+                "size_bytes": disk_size(target),
+                "model_class": type(model).__name__,
+                "n_features": int(n_features) if n_features is not None else None,
+                "features": features or entry.get("features"),
+                "classes": np.asarray(classes).tolist() if classes is not None else None,
+                "latency_ms": measure_latency(model, int(n_features)) if n_features is not None else None,
+                "registered_at": time.time()
+            }
+            versions[version] = record
+            if description:
+                entry["description"] = description
+            if entry.get("live") is None:
+                entry["live"] = version
+            self._write(metadata)
+
+        logger.info(f"Registered {name} version {version} ({record['size_bytes']} bytes)")
+        return version
+
+    def _set_pointer(self, name: str, role: str, version: Optional[str]):
+        with self._locked():
+            metadata = self._read()
+            entry = metadata.get(name)
+            if entry is None or (version is not None and version not in entry.get("versions", {})):
+                raise KeyError(f"{name} has no version {version}")
+            entry[role] = version
+            if role == "live" and entry.get("candidate") == version:
+                entry["candidate"] = None
+            self._write(metadata)
+
+    def set_candidate(self, name: str, version: Optional[str]):
+        """Mark a version for shadow evaluation; None clears the candidate"""
+        self._set_pointer(name, "candidate", version)
+
+    def promote(self, name: str, version: str):
+        """Make a version live"""
+        self._set_pointer(name, "live", version)
+
+    def verify(self, name: str, version: str) -> bool:
+        """True if the artifact on disk still matches its recorded hash"""
+        record = self.get(name).get("versions", {}).get(version)
+        if record is None:
+            return False
+        return content_hash(os.path.join(self.base_dir, record["path"])) == record["hash"]
+
+
+# Global registry instance
+model_registry = ModelRegistry(MODELS_DIR / "model_metadata.json")
+
+
+def main(argv) -> int:
+    if not argv or argv[0] == "list":
+        for name, entry in model_registry.list_models().items():
+            versions = ", ".join(entry.get("versions", {})) or "-"
+            print(f"{name}: live={entry.get('live')} candidate={entry.get('candidate')} versions=[{versions}]")
+        return 0
+
+    command, name = argv[0], argv[1]
+    if command == "register":
+        version = model_registry.register(name, argv[2])
+        if "--candidate" in argv:
+            model_registry.set_candidate(name, version)
+        print(f"✓ Registered {name} version {version}")
+    elif command == "candidate":
+        model_registry.set_candidate(name, argv[2])
+        print(f"✓ {name} version {argv[2]} is the shadow candidate")
+    elif command == "promote":
+        model_registry.promote(name, argv[2])
+        print(f"✓ {name} version {argv[2]} is live")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
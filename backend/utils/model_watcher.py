@@ -0,0 +1,94 @@
+"""
+Polls model directories and reports agents whose model files changed
+"""
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Watches ``<stem>.pkl`` and ``<stem>.mmap/meta.json`` for each agent,
+    plus any explicit ``files`` under their own names (the model registry
+    metadata, for instance).
+
+    A change is only reported once the files have stayed the same for one
+    full poll interval, so a training script that is still writing does not
+    trigger a reload of a half-written artifact.
+    """
+
+    def __init__(self, directories: Iterable[str], artifacts: Dict[str, Tuple[str, ...]],
+                 on_change: Callable[[str], None], interval: float,
+                 files: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.directories = [d for d in dict.fromkeys(directories) if d]
+        self.artifacts = artifacts
+        self.files = files or {}
+        self.on_change = on_change
+        self.interval = interval
+        self._seen = {name: self._signature(name) for name in self._names()}
+        self._pending = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _names(self) -> List[str]:
+        return list(self.artifacts) + [name for name in self.files if name not in self.artifacts]
+
+    def _paths(self, name: str) -> List[str]:
+        """Every file watched for a name: the agent's model files, or its explicit files"""
+        if name in self.files:
+            return list(self.files[name])
+        return [
+            path
+            for directory in self.directories
+            for stem in self.artifacts[name]
+            for path in (os.path.join(directory, f"{stem}.pkl"),
+                         os.path.join(directory, f"{stem}.mmap", "meta.json"))
+        ]
+
+    def _signature(self, name: str) -> tuple:
+        """(path, mtime, size) of every watched file that exists"""
+        signature = []
+        for path in self._paths(name):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def poll(self) -> List[str]:
+        """Check once; return the names whose files changed and have settled"""
+        changed = []
+        for name in self._names():
+            signature = self._signature(name)
+            if signature == self._seen[name]:
+                self._pending.pop(name, None)
+                continue
+            if self._pending.get(name) == signature:
+                # Unchanged since the last poll: the write has finished
+                self._seen[name] = signature
+                del self._pending[name]
+                changed.append(name)
+            else:
+                self._pending[name] = signature
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for name in self.poll():
+                try:
+                    self.on_change(name)
+                except Exception as e:
+                    logger.error(f"Reload of {name} after model file change failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Watching {self.directories} for model changes every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
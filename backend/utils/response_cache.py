@@ -0,0 +1,173 @@
+"""
+Full-response cache for natural-language queries
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+try:
+    from .singleflight import fingerprint
+except ImportError:
+    from utils.singleflight import fingerprint
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+# Digit-grouped amounts such as 1,00,000 are left alone
+_NUMBER = re.compile(r'(?<![\d.,])\d+(?:\.\d+)?(?![\d.,])')
+_TRAILING_PUNCTUATION = re.compile(r'[\s?!.।]+$')
+
+
+def _canonical_number(match) -> str:
+    """06 -> 6, 6.50 -> 6.5, 25.0 -> 25: forms every parameter extractor reads as the same value"""
+    whole, _, fraction = match.group(0).partition('.')
+    whole = whole.lstrip('0') or '0'
+    fraction = fraction.rstrip('0')
+    return f"{whole}.{fraction}" if fraction else whole
+
+
+def canonical_query(text: str) -> str:
+    """
+    Query text reduced to the form used in cache keys.
+
+    Runs of whitespace, trailing punctuation and the spelling of numbers
+    are normalized, which parameter extraction reads the same either way.
+    Case is kept: place names are only recognized when capitalized, so
+    "in Punjab" and "in punjab" extract different locations.
+    """
+    text = _WHITESPACE.sub(' ', text or '').strip()
+    text = _NUMBER.sub(_canonical_number, text)
+    return _TRAILING_PUNCTUATION.sub('', text)
+
+
+class _Entry:
+    """One cached response"""
+
+    __slots__ = ('response', 'intents', 'expires_at', 'size')
+
+    def __init__(self, response: Dict[str, Any], intents: frozenset, expires_at: float, size: int):
+        self.response = response
+        self.intents = intents
+        self.expires_at = expires_at
+        self.size = size
+
+
+class ResponseCache:
+    """
+    LRU cache of query responses bounded by total serialized size.
+
+    Each entry expires after the TTL of the intents it answers (the
+    shortest one for multi-intent responses). Failed and degraded
+    responses are never stored. Every invalidation bumps ``generation``,
+    so a response computed before it can be recognised and not stored.
+    """
+
+    def __init__(self, max_bytes: int, ttls: Dict[str, int], default_ttl: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.generation = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, text: str, context: Optional[Dict[str, Any]]) -> str:
+        """Canonical query text plus a stable hash of the context"""
+        return fingerprint('query', canonical_query(text), context or {})
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """A copy of the fresh response for key, marked as cached, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        response = dict(entry.response)
+        response['cached'] = True
+        return response
+
+    def put(self, key: str, response: Dict[str, Any], generation: Optional[int] = None):
+        """Store a response unless it failed, was degraded or predates an invalidation"""
+        if not self.enabled or not response.get('success') or response.get('degraded'):
+            return
+        intents = frozenset(self._intents_of(response))
+        ttl = min((self.ttls.get(intent, self.default_ttl) for intent in intents), default=self.default_ttl)
+        if ttl <= 0:
+            return
+        try:
+            size = len(json.dumps(response, default=str))
+        except (TypeError, ValueError):
+            return
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = _Entry(response, intents, time.monotonic() + ttl, size)
+            self._bytes += size
+
+    @staticmethod
+    def _intents_of(response: Dict[str, Any]) -> Iterable[str]:
+        """Every intent a response answers, including fanned-out and speculative ones"""
+        if response.get('intent'):
+            yield response['intent']
+        for extra in response.get('additional_results', []):
+            yield extra['intent']
+        if response.get('alternative'):
+            yield response['alternative']['intent']
+
+    def _remove(self, key: str):
+        self._bytes -= self._entries.pop(key).size
+
+    def invalidate(self, intent: Optional[str] = None) -> int:
+        """Drop entries answering intent, or every entry; returns how many were dropped"""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key, entry in self._entries.items() if intent is None or intent in entry.intents]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached responses for {intent or 'all intents'}")
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
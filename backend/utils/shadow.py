@@ -0,0 +1,189 @@
+"""
+Shadow evaluation: score a candidate model on sampled live traffic, off the request path
+"""
+import queue
+import random
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowedModel:
+    """
+    Stands in for a live model and forwards every call to it.
+
+    A sample of the inputs, with the live outputs, is handed to the
+    evaluator, which runs the candidate later on its own thread. Attributes
+    such as classes_ and n_features_in_ come from the live model.
+    """
+
+    def __init__(self, name: str, live: Any, candidate: Any, evaluator: "ShadowEvaluator"):
+        self.shadow_name = name
+        self.live = live
+        self.candidate = candidate
+        self.evaluator = evaluator
+
+    def _call(self, method: str, X):
+        start = time.perf_counter()
+        output = getattr(self.live, method)(X)
+        self.evaluator.submit(self, method, X, output, time.perf_counter() - start)
+        return output
+
+    def predict(self, X):
+        return self._call("predict", X)
+
+    def predict_proba(self, X):
+        return self._call("predict_proba", X)
+
+    def __getattr__(self, name):
+        return getattr(self.live, name)
+
+
+class _Comparison:
+    """Running comparison of one candidate against live"""
+
+    def __init__(self, live_version: Optional[str], candidate_version: Optional[str]):
+        self.live_version = live_version
+        self.candidate_version = candidate_version
+        self.samples = 0
+        self.rows = 0
+        self.agreements = 0
+        self.abs_diff_sum = 0.0
+        self.live_seconds = 0.0
+        self.candidate_seconds = 0.0
+        self.errors = 0
+        self.dropped = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'live_version': self.live_version,
+            'candidate_version': self.candidate_version,
+            'samples': self.samples,
+            'rows': self.rows,
+            'agreement': round(self.agreements / self.rows, 4) if self.rows else None,
+            'mean_abs_diff': round(self.abs_diff_sum / self.rows, 6) if self.rows else None,
+            'live_ms': round(self.live_seconds / self.samples * 1000, 4) if self.samples else None,
+            'candidate_ms': round(self.candidate_seconds / self.samples * 1000, 4) if self.samples else None,
+            'errors': self.errors,
+            'dropped': self.dropped
+        }
+
+
+class ShadowEvaluator:
+    """
+    Runs candidate models on a background thread against sampled live inputs.
+
+    Requests only pay for a random draw and, when sampled, a copy of the
+    feature matrix; when the queue is full the sample is dropped rather
+    than delaying the request.
+    """
+
+    def __init__(self, sample_rate: float, max_queue: int = 256):
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self._comparisons: Dict[str, _Comparison] = {}
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+
+    def wrap(self, name: str, live: Any, candidate: Any, live_version: Optional[str] = None,
+             candidate_version: Optional[str] = None) -> ShadowedModel:
+        """Start comparing a candidate with a live model; resets earlier results for name"""
+        if isinstance(live, ShadowedModel):
+            live = live.live
+        with self._lock:
+            self._comparisons[name] = _Comparison(live_version, candidate_version)
+        return ShadowedModel(name, live, candidate, self)
+
+    def stop(self, name: str):
+        with self._lock:
+            self._comparisons.pop(name, None)
+
+    def submit(self, model: ShadowedModel, method: str, X, live_output, live_seconds: float):
+        name = model.shadow_name
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            comparison = self._comparisons.get(name)
+            if comparison is None:
+                return
+            if self._thread is None:
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._thread = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((model, method, np.array(X, copy=True), live_output, live_seconds))
+        except queue.Full:
+            with self._lock:
+                comparison.dropped += 1
+
+    def _run(self):
+        while True:
+            model, method, X, live_output, live_seconds = self._queue.get()
+            try:
+                self._compare(model, method, X, live_output, live_seconds)
+            except Exception as e:
+                logger.debug(f"Shadow comparison for {model.shadow_name} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, model: ShadowedModel, method: str, X, live_output, live_seconds: float):
+        name = model.shadow_name
+        start = time.perf_counter()
+        try:
+            candidate_output = getattr(model.candidate, method)(X)
+        except Exception:
+            with self._lock:
+                comparison = self._comparisons.get(name)
+                if comparison is not None:
+                    comparison.errors += 1
+            raise
+        candidate_seconds = time.perf_counter() - start
+
+        live_output = np.asarray(live_output)
+        candidate_output = np.asarray(candidate_output)
+        if method == "predict_proba":
+            # Compare the labels the two models would return, and the largest probability shift
+            live_classes = np.asarray(model.live.classes_)
+            candidate_classes = np.asarray(model.candidate.classes_)
+            agreements = int((live_classes[live_output.argmax(axis=1)] ==
+                              candidate_classes[candidate_output.argmax(axis=1)]).sum())
+            same_classes = np.array_equal(live_classes, candidate_classes)
+            abs_diff = float(np.abs(live_output - candidate_output).max(axis=1).sum()) if same_classes else 0.0
+        elif np.issubdtype(live_output.dtype, np.number) and np.issubdtype(candidate_output.dtype, np.number):
+            agreements = int(np.isclose(live_output, candidate_output).sum())
+            abs_diff = float(np.abs(live_output - candidate_output).sum())
+        else:
+            agreements = int((live_output == candidate_output).sum())
+            abs_diff = 0.0
+
+        with self._lock:
+            comparison = self._comparisons.get(name)
+            if comparison is None:
+                return
+            comparison.samples += 1
+            comparison.rows += len(live_output)
+            comparison.agreements += agreements
+            comparison.abs_diff_sum += abs_diff
+            comparison.live_seconds += live_seconds
+            comparison.candidate_seconds += candidate_seconds
+
+    def drain(self, timeout: float = 5.0):
+        """Wait until queued comparisons have run (for tests and shutdown)"""
+        deadline = time.perf_counter() + timeout
+        while self._queue is not None and self._queue.unfinished_tasks and time.perf_counter() < deadline:
+            time.sleep(0.01)
+
+    def get_report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: comparison.as_dict() for name, comparison in self._comparisons.items()}
+
+    def after_fork(self):
+        """The evaluator thread does not survive fork; start a new one on the next sample"""
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
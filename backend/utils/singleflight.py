@@ -0,0 +1,107 @@
+"""
+Request coalescing: concurrent calls with the same key share one execution
+"""
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _canonical_default(obj: Any) -> Any:
+    """JSON fallback for values in request contexts"""
+    if isinstance(obj, (bytes, bytearray, memoryview)) or hasattr(obj, '__array_interface__'):
+        # Image buffers: fingerprint the content, not a truncated repr
+        try:
+            return 'sha256:' + hashlib.sha256(memoryview(obj)).hexdigest()
+        except (TypeError, ValueError):
+            pass
+    return str(obj)
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Stable hash of request inputs.
+
+    Strings have surrounding and repeated whitespace collapsed; dicts are
+    serialized with sorted keys so field order does not matter.
+    """
+    canonical = [
+        _WHITESPACE.sub(' ', part).strip() if isinstance(part, str) else part
+        for part in parts
+    ]
+    content = json.dumps(canonical, sort_keys=True, default=_canonical_default, ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    """One in-flight execution that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs a function once per key at a time; concurrent callers share the result"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn for key, or wait for the identical call already in flight.
+
+        Returns (result, shared) where shared is True when this caller
+        received another caller's result. Exceptions propagate to every
+        caller of the shared execution.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.followers:
+                logger.debug(f"Coalesced {call.followers} identical requests")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counts of executions, coalesced callers and calls currently in flight"""
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': in_flight
+        }
@@ -5,6 +5,7 @@ import os
 from typing import Dict, Any, Optional, List
 import logging
 import json
+import time
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -12,15 +13,18 @@ logger = logging.getLogger(__name__)
 # Import required libraries for mT5 translation
 try:
     from transformers import MT5ForConditionalGeneration, MT5Tokenizer
-    from langdetect import detect
     MT5_AVAILABLE = True
 except ImportError as e:
     logger.warning(f"Required libraries not available: {e}. Translation features will be limited.")
     MT5ForConditionalGeneration = None
     MT5Tokenizer = None
-    detect = None
     MT5_AVAILABLE = False
 
+try:
+    from .language_detection import detect_language as detect
+except ImportError:
+    from utils.language_detection import detect_language as detect
+
 # Fallback to googletrans if mT5 is not available
 try:
     from googletrans import Translator
@@ -66,13 +70,14 @@ class TranslationService:
         self.cache_file = Path(__file__).parent.parent / "data" / "translation_cache.json"
         self._load_cache()
     
-    def translate_with_mt5(self, text: str, target_lang: str = "en") -> str:
+    def translate_with_mt5(self, text: str, target_lang: str = "en", source_lang: Optional[str] = None) -> str:
         """
         Translate text to target language using mT5 model.
         
         Args:
             text: Text to translate
             target_lang: Target language code
+            source_lang: Source language code, detected when not given
             
         Returns:
             Translated text
@@ -82,8 +87,9 @@ class TranslationService:
             return text
         
         try:
-            # Detect source language
-            source_lang = self.detect_language(text)
+            # Detect source language unless the caller already did
+            if source_lang is None:
+                source_lang = self.detect_language(text)
             
             # Skip translation if already in target language
             if source_lang == target_lang:
@@ -124,7 +130,7 @@ class TranslationService:
 
     def detect_language(self, text: str) -> str:
         """
-        Detect the language of input text using langdetect.
+        Detect the language of input text by Unicode script, then langdetect.
         
         Args:
             text: Text to analyze
@@ -132,18 +138,10 @@ class TranslationService:
         Returns:
             Detected language code
         """
-        if not text or not text.strip():
-            return 'en'
-        
         try:
-            if detect is not None:
-                detected_lang = detect(text)
-                # Return detected language if supported, otherwise default to English
-                return detected_lang if detected_lang in self.supported_languages else 'en'
-            else:
-                logger.warning("Language detection not available, defaulting to English")
-                return 'en'
-            
+            detected_lang = detect(text)
+            # Return detected language if supported, otherwise default to English
+            return detected_lang if detected_lang in self.supported_languages else 'en'
         except Exception as e:
             logger.error(f"Language detection error: {e}")
             return 'en'
@@ -186,7 +184,7 @@ class TranslationService:
         try:
             # Try mT5 translation first
             if self.mt5_model and self.mt5_tokenizer:
-                translated_text = self.translate_with_mt5(text, target_language)
+                translated_text = self.translate_with_mt5(text, target_language, source_language)
                 logger.debug(f"Used mT5 for translation: {text[:50]}... -> {translated_text[:50]}...")
             
             # Fallback to googletrans if mT5 fails or is not available
@@ -266,13 +264,13 @@ class TranslationService:
                 return english_response
             
             # Use translation service (prioritize googletrans for speed)
-            return self.translate_text(english_response, target_language)
+            return self.translate_text(english_response, target_language, 'en')
                 
         except Exception as e:
             logger.error(f"Error generating natural response: {e}")
             # Fallback to translation
             english_fallback = agent_result.get('message', 'I have processed your request.')
-            return self.translate_text(english_fallback, target_language)
+            return self.translate_text(english_fallback, target_language, 'en')
 
     def translate_response(self, response: Dict[str, Any], target_language: str) -> Dict[str, Any]:
         """
@@ -337,6 +335,26 @@ class TranslationService:
     
 
     
+    def warm_up(self, text: str = "Check the soil moisture before sowing.") -> Dict[str, float]:
+        """
+        Run one mT5 translation into each supported language.
+
+        Goes straight to the model so that cached translations cannot skip
+        the graph setup. Returns seconds taken per language; empty when mT5
+        is not loaded (the googletrans fallback is remote and not warmed).
+        """
+        durations = {}
+        if not self.mt5_model or not self.mt5_tokenizer:
+            return durations
+
+        for lang in self.supported_languages:
+            if lang == 'en':
+                continue
+            start = time.perf_counter()
+            self.translate_with_mt5(text, lang, 'en')
+            durations[lang] = time.perf_counter() - start
+        return durations
+
     def get_supported_languages(self) -> Dict[str, str]:
         """Get dictionary of supported language codes and names"""
         return self.supported_languages.copy()